@@ -7,10 +7,20 @@ from dash import dcc, html, dash_table
 from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
 import os
+import sys
 import requests
 from datetime import datetime, timedelta
 import numpy as np
 
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage import artifact_path, launch_years, load_artifact
+from src.utils import load_config
+
+# The only wrangled columns the dashboard reads
+DASHBOARD_COLUMNS = ['Date', 'BoosterVersion', 'PayloadMass', 'Orbit', 'LaunchSite', 'class']
+
 # --- 1. Initialize  App ---
 app = dash.Dash(
     __name__, 
@@ -118,9 +128,38 @@ app.index_string = '''
 '''
 
 # --- 2. Data Loading ---
+def load_launches(config=None):
+    """
+    Loads the wrangled launches shown on the dashboard, reading only
+    DASHBOARD_COLUMNS and the launch years set under `dashboard` in config.yaml.
+
+    Returns:
+        tuple: (launches, launch site -> display name), or None if the
+               wrangled artifact has not been built yet.
+    """
+    config = config or load_config()
+    if not os.path.exists(artifact_path('wrangled_data', config)):
+        return None
+    settings = config['dashboard']
+    df = load_artifact('wrangled_data', columns=DASHBOARD_COLUMNS,
+                       years=launch_years(settings['first_year'], settings.get('last_year')), config=config)
+    # BoosterVersion holds the mission name; the date pickers compare against naive dates
+    df = df.assign(Mission=df['BoosterVersion'], Date=df['Date'].dt.tz_convert(None),
+                   PayloadMass=df['PayloadMass'].round())
+    sites = sorted(df['LaunchSite'].dropna().astype(str).unique())
+    return df, {site: site for site in sites}
+
 def load_and_prepare_data():
     """Load and prepare SpaceX data"""
-    # Sample  data
+    loaded = load_launches()
+    if loaded is not None:
+        df, launch_sites = loaded
+        df['PayloadMass'] = df['PayloadMass'].astype(int)
+        df['Launch Outcome'] = df['class'].apply(lambda x: 'Success' if x == 1 else 'Failure')
+        df['Year'] = df['Date'].dt.year
+        return df, launch_sites
+
+    # Sample data, until the pipeline has built the wrangled launches
     np.random.seed(42)
     
     # Realistic launch sites
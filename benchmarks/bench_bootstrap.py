@@ -0,0 +1,47 @@
+"""
+Times the vectorized bootstrap (src.eval.bootstrap_metrics), which scores
+every resample of every model as array operations, against resampling in a
+Python loop and calling compare_predictions once per resample, on a test
+set the size of the real one.
+
+Usage:
+    python -m benchmarks.bench_bootstrap [--models 4] [--samples 90] [--resamples 10000] [--loop-resamples 500]
+"""
+import argparse
+import time
+import numpy as np
+from src.eval import bootstrap_metrics, compare_predictions
+
+def loop_bootstrap(y_true, predictions, scores, n_resamples, random_state=42):
+    """One compare_predictions call per resample, on the same resamples as bootstrap_metrics."""
+    indices = np.random.default_rng(random_state).integers(0, len(y_true), (n_resamples, len(y_true)))
+    return [compare_predictions(y_true[index], {n: p[index] for n, p in predictions.items()},
+                                {n: s[index] for n, s in scores.items()}) for index in indices]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--models', type=int, default=4)
+    parser.add_argument('--samples', type=int, default=90)
+    parser.add_argument('--resamples', type=int, default=10_000)
+    parser.add_argument('--loop-resamples', type=int, default=500, help="Resamples timed for the loop; scaled up.")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    y_true = (rng.random(args.samples) < 0.7).astype(int)
+    scores = {f"model {i}": np.clip(y_true * 0.3 + rng.random(args.samples) * 0.7, 0, 1) for i in range(args.models)}
+    predictions = {name: (score > 0.5).astype(int) for name, score in scores.items()}
+
+    start = time.perf_counter()
+    distributions = bootstrap_metrics(y_true, predictions, scores, args.resamples)
+    vectorized_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tables = loop_bootstrap(y_true, predictions, scores, args.loop_resamples)
+    loop_seconds = (time.perf_counter() - start) * args.resamples / args.loop_resamples
+    worst = max(abs(table[metric].to_numpy() - values[:, r]).max()
+                for r, table in enumerate(tables) for metric, values in distributions.items())
+
+    print(f"{args.models} models x {args.samples} samples, {args.resamples:,} resamples, 7 metrics")
+    print(f"  Python loop over resamples (est.): {loop_seconds:8.2f} s")
+    print(f"  bootstrap_metrics, vectorized:     {vectorized_seconds:8.2f} s "
+          f"({loop_seconds / vectorized_seconds:.0f}x), largest difference {worst:.1e}")
@@ -0,0 +1,100 @@
+"""
+Compares compiled NumPy inference (src.compiled) with the scikit-learn
+pipelines it is exported from, on synthetic launches: per-row latency
+(one launch per call, as the online service sees them), batch latency,
+artifact size and load time, for DecisionTree, RandomForest and
+LogisticRegression. Also checks that the compiled models return identical
+probabilities and classes.
+
+Usage:
+    python -m benchmarks.bench_compiled [--rows 20000] [--batch 10000] [--calls 300]
+"""
+import argparse
+import os
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from benchmarks.bench_wrangle import make_synthetic_launches
+from src.compiled import compile_model, load_compiled
+from src.storage import compact_artifact
+from src.train import build_pipeline, prepare_training_data
+from src.wrangle import clean_api_data
+
+def per_call_ms(func, inputs):
+    """Median milliseconds of one call, over one call per input."""
+    times = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+def best_ms(func, repeat=5):
+    """Fastest of `repeat` calls, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000, help="Training launches.")
+    parser.add_argument('--batch', type=int, default=10_000, help="Launches per batch call.")
+    parser.add_argument('--calls', type=int, default=300, help="Single-launch calls timed per method.")
+    args = parser.parse_args()
+
+    raw, payload_map = make_synthetic_launches(args.rows)
+    launches = compact_artifact(clean_api_data(raw, payload_map), 'wrangled_data', verbose=False)
+    X, y = prepare_training_data(launches)
+    batch = X.sample(args.batch, replace=True, random_state=0)
+    singles = [X.iloc[[i]] for i in range(args.calls)]
+    dicts = [{k: None if v is pd.NA or v != v else v for k, v in X.iloc[i].items()} for i in range(args.calls)]
+
+    models = {
+        'DecisionTree': build_pipeline(DecisionTreeClassifier(max_depth=10, random_state=42), scaler='none'),
+        'RandomForest': build_pipeline(RandomForestClassifier(n_estimators=100, max_depth=12, random_state=42),
+                                       scaler='none'),
+        'LogisticRegression': build_pipeline(LogisticRegression(max_iter=1000))
+    }
+    latency, sizes = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, pipeline in models.items():
+            pipeline.fit(X, y)
+            compiled = compile_model(pipeline)
+            identical = (np.array_equal(compiled.predict_proba(batch), pipeline.predict_proba(batch))
+                         and np.array_equal(compiled.predict(batch), pipeline.predict(batch)))
+
+            latency.append({
+                'Model': name,
+                'Row predict (ms)': per_call_ms(pipeline.predict, singles),
+                'Row predict_proba (ms)': per_call_ms(pipeline.predict_proba, singles),
+                'Row compiled (ms)': per_call_ms(compiled.predict_proba, singles),
+                'Row compiled dict (ms)': per_call_ms(compiled.predict_proba, dicts),
+                f"Batch predict (ms)": best_ms(lambda: pipeline.predict(batch)),
+                f"Batch predict_proba (ms)": best_ms(lambda: pipeline.predict_proba(batch)),
+                f"Batch compiled (ms)": best_ms(lambda: compiled.predict_proba(batch)),
+                'Identical': identical
+            })
+
+            pickle_path, npz_path = os.path.join(tmp, f"{name}.joblib"), os.path.join(tmp, f"{name}.npz")
+            joblib.dump(pipeline, pickle_path)
+            compiled.save(npz_path)
+            sizes.append({
+                'Model': name,
+                'Pipeline (KB)': os.path.getsize(pickle_path) / 1024,
+                'Compiled (KB)': os.path.getsize(npz_path) / 1024,
+                'Pipeline load (ms)': best_ms(lambda: joblib.load(pickle_path)),
+                'Compiled load (ms)': best_ms(lambda: load_compiled(npz_path))
+            })
+
+    print(f"Per-row: median of {args.calls} single-launch calls. Batch: {args.batch:,} launches, best of 5.")
+    print(pd.DataFrame(latency).round(3).to_string(index=False))
+    print()
+    print(pd.DataFrame(sizes).round(1).to_string(index=False))
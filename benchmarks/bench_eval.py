@@ -0,0 +1,55 @@
+"""
+Compares the single-pass metrics engine (src.eval.compare_predictions) with
+calling scikit-learn's metric functions once per metric and model, on
+synthetic predictions from several models.
+
+Usage:
+    python -m benchmarks.bench_eval [--models 4] [--samples 100000] [--repeat 5]
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.metrics import (accuracy_score, f1_score, matthews_corrcoef, precision_score, recall_score,
+                             roc_auc_score)
+from src.eval import compare_predictions
+
+def per_metric_sklearn(y_true, predictions, scores):
+    """The metrics of every model, each from its own sklearn call."""
+    return {name: {
+        'Accuracy': accuracy_score(y_true, y_pred),
+        'Precision': precision_score(y_true, y_pred, zero_division=0),
+        'Recall': recall_score(y_true, y_pred),
+        'F1-Score': f1_score(y_true, y_pred),
+        'Specificity': recall_score(y_true, y_pred, pos_label=0),
+        'MCC': matthews_corrcoef(y_true, y_pred),
+        'ROC-AUC': roc_auc_score(y_true, scores[name])
+    } for name, y_pred in predictions.items()}
+
+def best_seconds(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--models', type=int, default=4)
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    y_true = (rng.random(args.samples) < 0.7).astype(int)
+    scores = {f"model {i}": np.clip(y_true * 0.3 + rng.random(args.samples) * 0.7, 0, 1) for i in range(args.models)}
+    predictions = {name: (score > 0.5).astype(int) for name, score in scores.items()}
+
+    sklearn_seconds, expected = best_seconds(lambda: per_metric_sklearn(y_true, predictions, scores), args.repeat)
+    engine_seconds, table = best_seconds(lambda: compare_predictions(y_true, predictions, scores), args.repeat)
+    worst = max(abs(table.loc[name, metric] - value) for name, metrics in expected.items()
+                for metric, value in metrics.items())
+    print(f"{args.models} models x {args.samples:,} samples, 7 metrics (best of {args.repeat})")
+    print(f"  sklearn, one call per metric and model: {sklearn_seconds * 1000:8.1f} ms")
+    print(f"  compare_predictions, one pass:          {engine_seconds * 1000:8.1f} ms "
+          f"({sklearn_seconds / engine_seconds:.1f}x), largest difference {worst:.1e}")
@@ -0,0 +1,46 @@
+"""
+Compares pd.get_dummies with CategoricalEncoder.transform on a wide
+synthetic category set.
+
+Usage:
+    python -m benchmarks.bench_features [--rows 100000] [--sites 500]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.features import CATEGORICAL_FEATURES, CategoricalEncoder
+
+def make_launches(n_rows, n_sites, seed=42):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Orbit': rng.choice([f"orbit-{i}" for i in range(50)], n_rows),
+        'LaunchSite': rng.choice([f"site-{i}" for i in range(n_sites)], n_rows),
+        'GridFins': rng.random(n_rows) < 0.7,
+        'Reused': rng.random(n_rows) < 0.5,
+        'Legs': rng.random(n_rows) < 0.7,
+        'PayloadMass': rng.normal(6000, 3000, n_rows),
+        'Flights': rng.integers(1, 20, n_rows)
+    })
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--sites', type=int, default=500)
+    args = parser.parse_args()
+
+    data = make_launches(args.rows, args.sites)
+    start = time.perf_counter()
+    dense = pd.get_dummies(data, columns=CATEGORICAL_FEATURES)
+    dummies_time = time.perf_counter() - start
+    dense_bytes = dense.memory_usage(index=False).sum()
+
+    encoder = CategoricalEncoder().fit(data)
+    start = time.perf_counter()
+    matrix = encoder.transform(data)
+    encoder_time = time.perf_counter() - start
+    sparse_bytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+    print(f"{args.rows:,} rows, {matrix.shape[1]:,} columns")
+    print(f"get_dummies   {dummies_time:6.2f} s  {dense_bytes / 2**20:9.1f} MiB")
+    print(f"encoder       {encoder_time:6.2f} s  {sparse_bytes / 2**20:9.1f} MiB")
@@ -0,0 +1,41 @@
+"""
+Times linkage.link_launches on synthetic API and Wikipedia launch histories of
+growing size, to check that it scales near-linearly.
+
+Usage:
+    python -m benchmarks.bench_linkage [--sizes 10000 40000 160000]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.linkage import link_launches
+
+def make_histories(n_launches, seed=42):
+    """Builds matching API and Wikipedia launches, several per day, with mission names reworded on the wiki side."""
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp('2000-01-01', tz='UTC') + pd.to_timedelta(np.sort(rng.integers(0, n_launches // 2, n_launches)), unit='D')
+    names = [f"Mission {i}" for i in range(n_launches)]
+    api = pd.DataFrame({'flight_number': np.arange(n_launches), 'Date': days, 'BoosterVersion': names})
+    wiki = pd.DataFrame({
+        'Flight No.': [str(i) for i in range(n_launches)],
+        'Date and time (UTC)': days.strftime('%d %B %Y %H:%M'),
+        'Version, Booster': 'F9 B5',
+        'Payload': [f"{name} (payload)" for name in names]
+    }).sample(frac=1, random_state=seed)
+    return api, wiki
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 40_000, 160_000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        api, wiki = make_histories(n)
+        start = time.perf_counter()
+        matches, report = link_launches(api, wiki)
+        elapsed = time.perf_counter() - start
+        correct = (matches['api_row'].map(api['BoosterVersion']) + ' (payload)'
+                   == matches['wiki_row'].map(wiki['Payload'])).mean()
+        print(f"{n:>9,} launches  {elapsed:7.2f} s  {elapsed / n * 1e6:6.1f} us/launch  "
+              f"coverage {report['api_coverage']:.1%}  correct {correct:.1%}")
@@ -0,0 +1,89 @@
+"""
+Measures batch scoring throughput (src.predict) on synthetic launches: rows
+per second and peak memory of the scoring process, for each input size and
+worker count. Each run is a separate `python -m src.predict` process, started
+from its own short-lived launcher, so the peak resident memory reported is the
+scoring run's own: that of its largest process, the parent or a worker. Peak
+memory comes from the `resource` module, so the benchmark runs on Unix only.
+
+Usage:
+    python -m benchmarks.bench_predict [--rows 10000 100000 1000000 10000000] [--workers 1 4] [--chunk-size 100000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.ensemble import RandomForestClassifier
+from benchmarks.bench_wrangle import make_synthetic_launches
+from src.storage import compact_artifact
+from src.train import build_pipeline, prepare_training_data
+from src.wrangle import clean_api_data
+
+def write_synthetic_input(launches, n_rows, path, seed=0):
+    """Writes `n_rows` launches resampled from `launches` to a Parquet file, in 1M-row row groups."""
+    rng = np.random.default_rng(seed)
+    writer = None
+    for start in range(0, n_rows, 1_000_000):
+        size = min(1_000_000, n_rows - start)
+        part = launches.iloc[rng.integers(0, len(launches), size)].reset_index(drop=True)
+        part['flight_number'] = np.arange(start + 1, start + size + 1)
+        table = pa.Table.from_pandas(part, preserve_index=False)
+        writer = writer or pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+# Runs a command and prints the largest ru_maxrss among its processes. The launcher
+# has no other children, so RUSAGE_CHILDREN is this one scoring run's peak alone.
+PEAK_RSS_LAUNCHER = ("import resource, subprocess, sys; subprocess.run(sys.argv[1:], check=True, stdout=subprocess.DEVNULL); "
+                     "print(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)")
+
+def run_scoring(model_path, input_path, output_path, chunk_size, workers):
+    """Runs the scoring CLI; returns its wall-clock seconds and peak RSS in MB."""
+    command = [sys.executable, '-W', 'ignore', '-m', 'src.predict', input_path, output_path,
+               '--model', model_path, '--chunk-size', str(chunk_size), '--workers', str(workers)]
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', PEAK_RSS_LAUNCHER, *command], capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"src.predict failed on {input_path}: {result.stderr}")
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak_kb = int(result.stdout.split()[-1]) / (1024 if sys.platform == 'darwin' else 1)
+    return seconds, peak_kb / 1024
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    args = parser.parse_args()
+
+    raw, payload_map = make_synthetic_launches(20_000)
+    launches = compact_artifact(clean_api_data(raw, payload_map), 'wrangled_data', verbose=False)
+    X, y = prepare_training_data(launches)
+    model = build_pipeline(RandomForestClassifier(n_estimators=100, max_depth=12, random_state=42), scaler='none')
+    model.fit(X, y)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.joblib')
+        joblib.dump(model, model_path, compress=0)
+        for n_rows in args.rows:
+            input_path = os.path.join(tmp, f"launches_{n_rows}.parquet")
+            write_synthetic_input(launches, n_rows, input_path)
+            for workers in args.workers:
+                output_path = os.path.join(tmp, f"scored_{n_rows}_{workers}.parquet")
+                seconds, peak_mb = run_scoring(model_path, input_path, output_path, args.chunk_size, workers)
+                rows.append({'Rows': n_rows, 'Workers': workers, 'Seconds': round(seconds, 2),
+                             'Rows/s': round(n_rows / seconds), 'Peak RSS (MB)': round(peak_mb)})
+                os.remove(output_path)
+            os.remove(input_path)
+
+    print(f"RandomForest (100 trees), chunks of {args.chunk_size:,} rows, {os.cpu_count()} CPU(s)")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,53 @@
+"""
+Compares incremental updates (src.retrain) with full retrains on synthetic
+launches: a RandomForest grown by --new-trees trees and an SGDClassifier
+updated with partial_fit, both checked on the latest launches.
+
+Usage:
+    python -m benchmarks.bench_retrain [--rows 20000] [--trees 300] [--new-trees 30]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from benchmarks.bench_wrangle import make_synthetic_launches
+from src.retrain import incremental_update, split_by_date, validation_gate
+from src.storage import compact_artifact
+from src.train import build_pipeline, prepare_training_data
+from src.wrangle import clean_api_data
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--trees', type=int, default=300)
+    parser.add_argument('--new-trees', type=int, default=30)
+    args = parser.parse_args()
+
+    raw, payload_map = make_synthetic_launches(args.rows)
+    launches = compact_artifact(clean_api_data(raw, payload_map), 'wrangled_data', verbose=False)
+    launches = launches.sort_values('Date', kind='stable')
+    # The last 10% are held out; the 10% before them are the new batch
+    new_since = launches['Date'].iloc[int(len(launches) * 0.8)].strftime('%Y-%m-%d')
+    seen, new, holdout = split_by_date(launches, new_since, len(launches) // 10)
+    (X_seen, y_seen), (X_new, y_new), (X_holdout, y_holdout) = (prepare_training_data(p) for p in (seen, new, holdout))
+    X_all, y_all = pd.concat([X_seen, X_new]), np.concatenate([y_seen, y_new])
+    print(f"{len(seen):,} seen launches, {len(new):,} new, {len(holdout):,} held out")
+
+    models = {
+        'RandomForest': build_pipeline(RandomForestClassifier(n_estimators=args.trees, random_state=42), scaler='none'),
+        'SGDClassifier': build_pipeline(SGDClassifier(loss='log_loss', random_state=42))
+    }
+    for name, pipeline in models.items():
+        production = pipeline.fit(X_seen, y_seen)
+        start = time.perf_counter()
+        updated = incremental_update(production, X_new, y_new, X_seen, y_seen, new_trees=args.new_trees)
+        update_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        retrained = clone(production).fit(X_all, y_all)
+        retrain_seconds = time.perf_counter() - start
+        gate = validation_gate(updated, retrained, X_holdout, y_holdout)
+        print(f"{name:<14} update {update_seconds:6.2f} s  F1 {gate['updated']:.4f} | "
+              f"retrain {retrain_seconds:6.2f} s  F1 {gate['retrained']:.4f} | gate {'passed' if gate['passed'] else 'failed'}")
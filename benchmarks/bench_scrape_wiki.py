@@ -0,0 +1,58 @@
+"""
+Compares the streaming lxml launch-table extractor with the original
+pandas.read_html path on a saved Wikipedia page.
+
+Usage:
+    python -m benchmarks.bench_scrape_wiki [--page data/raw/wiki_falcon9_page.html]
+
+Without --page, a synthetic page shaped like the Falcon 9 list (launch tables
+with description rows, plus unrelated tables) is generated.
+"""
+import argparse
+import time
+import tracemalloc
+from src.scrape_wiki import extract_launch_tables, scrape_launch_data_read_html
+
+def make_synthetic_page(n_launches=3000, n_other_tables=200):
+    """Builds an HTML page with launch tables of `n_launches` rows and unrelated tables."""
+    parts = ['<html><body>']
+    for t in range(n_other_tables):
+        parts.append('<table class="wikitable"><tr><th>Name</th><th>Value</th></tr>')
+        parts.extend(f'<tr><td>item {i}</td><td>{i * t}</td></tr>' for i in range(20))
+        parts.append('</table>')
+    per_table = 500
+    for start in range(0, n_launches, per_table):
+        parts.append('<table class="wikitable"><tr><th>Flight<br>No.</th><th>Date and time (UTC)</th>'
+                     '<th>Version, booster</th><th>Launch site</th><th>Payload</th><th>Payload mass</th>'
+                     '<th>Orbit</th><th>Customer</th><th>Launch outcome</th><th>Booster landing</th></tr>')
+        for n in range(start, min(start + per_table, n_launches)):
+            parts.append(f'<tr><th rowspan="2">{n}</th><td>1 January 2020</td><td>F9 B5 B10{n % 90}</td>'
+                         f'<td>CCSFS SLC-40</td><td>Starlink {n}<sup class="reference">[{n}]</sup></td>'
+                         f'<td>15,600 kg</td><td>LEO</td><td>SpaceX</td><td>Success</td><td>Success (drone ship)</td></tr>'
+                         f'<tr><td colspan="9">Launch {n} of a batch of satellites.</td></tr>')
+        parts.append('</table>')
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+def measure(label, func, html):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = func(html)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} {elapsed:8.3f} s   py-heap peak {peak / 2**20:8.1f} MiB   {len(df)} rows")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page', help="Saved HTML page to parse.")
+    args = parser.parse_args()
+
+    if args.page:
+        with open(args.page, 'rb') as f:
+            html = f.read()
+    else:
+        html = make_synthetic_page()
+    print(f"Page size: {len(html) / 2**20:.1f} MiB")
+    measure('read_html', scrape_launch_data_read_html, html)
+    measure('lxml stream', extract_launch_tables, html)
@@ -0,0 +1,106 @@
+"""
+Load-tests the online prediction service (src.serve) on this machine: starts
+it on a synthetic-launch RandomForest, then sends single-launch requests
+from 1, 8, 32 and 64 concurrent clients and reports throughput, the
+clients' p50/p99 latency, and the server's own latency counters and mean
+batch size. Run once with micro-batching off (--max-wait-ms 0) and once
+with the configured window to compare.
+
+Usage:
+    python -m benchmarks.bench_serving [--concurrency 1 8 32 64] [--requests 2000] [--max-wait-ms 0 2]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import requests
+from sklearn.ensemble import RandomForestClassifier
+from benchmarks.bench_wrangle import make_synthetic_launches
+from src.storage import compact_artifact
+from src.train import build_pipeline, prepare_training_data
+from src.wrangle import clean_api_data
+
+def start_service(model_path, port, max_wait_ms, max_batch_size):
+    """Starts `python -m src.serve` and waits until it answers /health."""
+    process = subprocess.Popen([sys.executable, '-W', 'ignore', '-m', 'src.serve', '--model', model_path,
+                                '--port', str(port), '--max-wait-ms', str(max_wait_ms),
+                                '--max-batch-size', str(max_batch_size)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            requests.get(f"{url}/health", timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("src.serve did not start")
+
+def load_test(url, launches, n_requests, concurrency):
+    """Sends `n_requests` single-launch requests from `concurrency` clients; returns seconds and latencies."""
+    local = threading.local()
+    latencies = np.empty(n_requests)
+
+    def call(i):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()  # One keep-alive connection per client
+        session = local.session
+        start = time.perf_counter()
+        response = session.post(f"{url}/predict", json=launches[i % len(launches)])
+        latencies[i] = time.perf_counter() - start
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(n_requests)))
+    return time.perf_counter() - start, latencies
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--max-wait-ms', type=float, nargs='+', default=[0, 2])
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--port', type=int, default=8061)
+    args = parser.parse_args()
+
+    raw, payload_map = make_synthetic_launches(20_000)
+    launches = compact_artifact(clean_api_data(raw, payload_map), 'wrangled_data', verbose=False)
+    X, y = prepare_training_data(launches)
+    model = build_pipeline(RandomForestClassifier(n_estimators=100, max_depth=12, random_state=42), scaler='none')
+    model.fit(X, y)
+    # Request bodies as clients send them: plain JSON values
+    bodies = [{k: (None if pd.isna(v) else v.item() if hasattr(v, 'item') else v) for k, v in row.items()}
+              for row in X.head(1000).to_dict('records')]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.joblib')
+        joblib.dump(model, model_path, compress=0)
+        for max_wait_ms in args.max_wait_ms:
+            process, url = start_service(model_path, args.port, max_wait_ms, args.max_batch_size)
+            try:
+                load_test(url, bodies, 100, 4)  # Warm-up
+                for concurrency in args.concurrency:
+                    requests.get(f"{url}/metrics", params={'reset': 1})
+                    seconds, latencies = load_test(url, bodies, args.requests, concurrency)
+                    server = requests.get(f"{url}/metrics").json()
+                    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+                    rows.append({'Window (ms)': max_wait_ms, 'Clients': concurrency,
+                                 'Requests/s': round(args.requests / seconds),
+                                 'Client p50 (ms)': round(p50, 1), 'Client p99 (ms)': round(p99, 1),
+                                 'Server p50 (ms)': server['p50_ms'], 'Server p99 (ms)': server['p99_ms'],
+                                 'Mean batch': server['mean_batch_size']})
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f"RandomForest (100 trees), {args.requests:,} requests per level, {os.cpu_count()} CPU(s)")
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,62 @@
+"""
+Compares loading a whole launches JSON document (json.load + json_normalize +
+clean_api_data) with the streaming NDJSON path (stream_ingest +
+clean_api_data_chunked) on a synthetic launch history.
+
+Usage:
+    python -m benchmarks.bench_stream_ingest [--rows 200000] [--chunk-size 20000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+from benchmarks.bench_wrangle import make_synthetic_launches
+from src.stream_ingest import read_ndjson_chunks, stream_launches
+from src.wrangle import clean_api_data, clean_api_data_chunked
+
+def write_launches_json(path, n_rows):
+    """Writes a launches array with inline payload documents, one record at a time."""
+    raw, payload_map = make_synthetic_launches(n_rows)
+    with open(path, 'w') as f:
+        f.write('[')
+        for i, record in enumerate(raw.to_dict(orient='records')):
+            record['payloads'] = [payload_map[pid] for pid in record['payloads']]
+            f.write((',' if i else '') + json.dumps(record))
+        f.write(']')
+
+def load_whole(path):
+    with open(path, 'r') as f:
+        return clean_api_data(pd.json_normalize(json.load(f)))
+
+def load_streamed(path, ndjson, chunk_size):
+    stream_launches(path, ndjson, chunk_size)
+    return clean_api_data_chunked(read_ndjson_chunks(ndjson, chunk_size))
+
+def measure(label, func, *args):
+    # Timed untraced first, since tracemalloc slows allocation-heavy JSON decoding
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {elapsed:8.2f} s   peak {peak / 2**20:8.1f} MiB")
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--chunk-size', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'launches.json')
+        write_launches_json(source, args.rows)
+        print(f"{args.rows:,} launches, {os.path.getsize(source) / 2**20:.1f} MiB of JSON")
+        whole = measure('whole', load_whole, source)
+        streamed = measure('streamed', load_streamed, source, os.path.join(tmp, 'launches.ndjson'), args.chunk_size)
+    pd.testing.assert_frame_equal(streamed, whole)
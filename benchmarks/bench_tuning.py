@@ -0,0 +1,44 @@
+"""
+Compares the grid, random and successive-halving search strategies of
+train.tune_model on the RandomForest grid from config/model_params.yaml.
+
+n_estimators is divided by --tree-scale so the exhaustive grid finishes in
+minutes; the strategies are still compared on the same grid.
+
+Usage:
+    python -m benchmarks.bench_tuning [--rows 1000] [--tree-scale 10] [--strategies grid random halving]
+"""
+import argparse
+import os
+import tempfile
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from src.train import load_search_log, tune_model
+from src.utils import load_config
+
+SEARCHES = {
+    'grid': {'strategy': 'grid'},
+    'random': {'strategy': 'random', 'max_fits': 100, 'random_state': 42},
+    'halving': {'strategy': 'halving', 'resource': 'n_estimators', 'factor': 3, 'random_state': 42}
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--tree-scale', type=int, default=10)
+    parser.add_argument('--strategies', nargs='+', default=list(SEARCHES), choices=list(SEARCHES))
+    args = parser.parse_args()
+
+    grid = dict(load_config('config/model_params.yaml')['RandomForest'])
+    grid['n_estimators'] = [max(1, n // args.tree_scale) for n in grid['n_estimators']]
+    X, y = make_classification(n_samples=args.rows, n_features=12, n_informative=6, random_state=42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'search_log.jsonl')
+        for strategy in args.strategies:
+            tune_model(RandomForestClassifier(random_state=42), grid, X, y, search=SEARCHES[strategy],
+                       name='RandomForest', log_path=log_path)
+        log = load_search_log(log_path)
+
+    print(f"\n{args.rows:,} rows, n_estimators {grid['n_estimators']}")
+    print(log[['strategy', 'candidates', 'fits', 'best_score', 'seconds']].to_string(index=False))
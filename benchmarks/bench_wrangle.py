@@ -0,0 +1,87 @@
+"""
+Compares the vectorized wrangle.clean_api_data with the row-wise
+clean_api_data_apply on a synthetic launch history, and times its one-pass
+flattening of the nested launch fields against pd.json_normalize and an Arrow
+conversion of the nested lists.
+
+Usage:
+    python -m benchmarks.bench_wrangle [--rows 1000000]
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.wrangle import CORE_FIELDS, _flatten_launches, clean_api_data, clean_api_data_apply
+
+def make_synthetic_launches(n_rows, n_payloads=5000, seed=42):
+    """Builds raw launches shaped like the /v4/launches response, plus a payload map."""
+    rng = np.random.default_rng(seed)
+    payload_ids = [f"payload-{i}" for i in range(n_payloads)]
+    payload_map = {
+        pid: {'mass_kg': float(m) if m > 0 else None, 'orbit': o}
+        for pid, m, o in zip(payload_ids, rng.normal(6000, 4000, n_payloads).round(),
+                             rng.choice(['LEO', 'GTO', 'ISS', 'SSO', 'PO'], n_payloads))
+    }
+    picks = rng.integers(0, n_payloads, n_rows)
+    landing = rng.choice([True, False, None], n_rows, p=[0.8, 0.1, 0.1])
+    flights = rng.integers(1, 20, n_rows)
+    flags = rng.random((n_rows, 3)) < 0.7
+    raw = pd.DataFrame({
+        'flight_number': np.arange(1, n_rows + 1),
+        'name': [f"Mission {i}" for i in range(n_rows)],
+        'date_utc': pd.date_range('2006-01-01', periods=n_rows, freq='min').strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'launchpad': ['5e9e4501f509094ba4566f84'] * n_rows,
+        'payloads': [[payload_ids[p]] for p in picks],
+        'cores': [[{'flight': int(f), 'gridfins': bool(g), 'legs': bool(l), 'reused': bool(r), 'landing_success': s}]
+                  for f, (g, l, r), s in zip(flights, flags, landing)]
+    })
+    return raw, payload_map
+
+def flatten_one_pass(raw):
+    return _flatten_launches(raw['launchpad'].to_numpy(dtype=object), raw['payloads'].to_numpy(dtype=object),
+                             raw['cores'].to_numpy(dtype=object))
+
+def flatten_json_normalize(raw):
+    """The first payload and the first core's fields, with pd.json_normalize."""
+    first_cores = raw['cores'].str[0]
+    cores = pd.json_normalize(first_cores.where(first_cores.map(type) == dict, {}).tolist())
+    return raw['payloads'].str[0], cores.reindex(columns=list(CORE_FIELDS.values()))
+
+def _first_items(lists):
+    # The first value of every non-empty list, read through the list offsets
+    has_items = pc.greater(pc.fill_null(pc.list_value_length(lists), 0), 0)
+    return lists.values.take(pc.if_else(has_items, lists.offsets[:-1], None))
+
+def flatten_arrow(raw):
+    """The first payload and the first core's fields, from Arrow list arrays."""
+    payloads = _first_items(pa.array(raw['payloads'].to_numpy(dtype=object), from_pandas=True))
+    cores = _first_items(pa.array(raw['cores'].to_numpy(dtype=object), from_pandas=True))
+    fields = [f for f in CORE_FIELDS.values() if f in cores.type.names]
+    return payloads.to_pandas(), {f: pc.struct_field(cores, f).to_pandas() for f in fields}
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    raw, payload_map = make_synthetic_launches(args.rows)
+    vectorized, vectorized_time = timed(clean_api_data, raw, payload_map=payload_map)
+    row_wise, row_wise_time = timed(clean_api_data_apply, raw, payload_map=payload_map)
+    pd.testing.assert_frame_equal(vectorized, row_wise)
+
+    print(f"{args.rows:,} launches")
+    print(f"apply      {row_wise_time:8.2f} s")
+    print(f"vectorized {vectorized_time:8.2f} s   ({row_wise_time / vectorized_time:.1f}x faster)")
+
+    print("Flattening the launchpad, first payload and first core")
+    for name, flatten in [('one pass', flatten_one_pass), ('json_normalize', flatten_json_normalize),
+                          ('arrow', flatten_arrow)]:
+        _, seconds = timed(flatten, raw)
+        print(f"{name:<15}{seconds:8.2f} s")
@@ -5,9 +5,9 @@
 echo "--- Activating virtual environment ---"
 source venv/bin/activate
 
-echo "--- STEP 1: Running Data Collection ---"
-python3 src/fetch_api.py
-python3 src/scrape_wiki.py
+echo "--- STEP 1: Running Data Collection and Wrangling ---"
+# Stages whose inputs have not changed since the last run are skipped
+python3 -m src.pipeline fetch_api scrape_wiki wrangle
 
 # NOTE: For this project, the wrangling, training, and evaluation logic
 # is orchestrated via notebooks. For a fully automated pipeline, you would
@@ -0,0 +1,137 @@
+import asyncio
+import functools
+import pandas as pd
+from src.http_client import request_json
+
+SPACEX_API_BASE = "https://api.spacexdata.com/v4"
+ENDPOINTS = ('launches', 'payloads', 'launchpads', 'cores', 'rockets')
+
+# Columns kept from each reference endpoint, indexed by the record 'id'
+LOOKUP_COLUMNS = {
+    'payloads': ['mass_kg', 'orbit'],
+    'launchpads': ['name', 'full_name', 'region', 'latitude', 'longitude'],
+    'cores': ['serial', 'block', 'reuse_count'],
+    'rockets': ['name']
+}
+
+async def _fetch_endpoint(name, url, semaphore, fetch):
+    # requests is blocking, so each call runs in the default thread pool while
+    # the semaphore bounds how many are in flight at once.
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, functools.partial(fetch, url))
+        return name, data
+
+async def fetch_endpoints(endpoints=ENDPOINTS, base_url=SPACEX_API_BASE, max_concurrency=5, fetch=None,
+                          max_age=0):
+    """
+    Fetches several SpaceX API endpoints concurrently.
+
+    Args:
+        endpoints (iterable): Endpoint names, e.g. 'launches' or 'payloads'.
+        base_url (str): The API base URL.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        fetch (callable): Function taking a URL and returning decoded JSON.
+                          Defaults to the cached request_json.
+        max_age (float): Seconds a cached response is served without revalidation
+                         (http.max_age in config.yaml); used by the default fetch.
+
+    Returns:
+        dict: Maps each endpoint name to its decoded JSON list.
+    """
+    fetch = fetch or functools.partial(request_json, max_age=max_age)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [_fetch_endpoint(name, f"{base_url}/{name}", semaphore, fetch) for name in endpoints]
+    return dict(await asyncio.gather(*tasks))
+
+def build_lookup_tables(raw):
+    """
+    Turns the raw reference endpoint responses into DataFrames indexed by 'id'.
+
+    Args:
+        raw (dict): Maps endpoint names to decoded JSON lists.
+
+    Returns:
+        dict: Maps endpoint names to lookup DataFrames. 'launches' is returned
+              flattened with pd.json_normalize rather than indexed.
+    """
+    tables = {}
+    for name, records in raw.items():
+        if name == 'launches':
+            tables[name] = pd.json_normalize(records)
+            continue
+        columns = LOOKUP_COLUMNS.get(name, [])
+        table = pd.DataFrame.from_records(records, columns=['id'] + columns)
+        tables[name] = table.drop_duplicates('id').set_index('id')
+    return tables
+
+def join_launch_lookups(launches, tables):
+    """
+    Resolves the payload, launchpad, core and rocket IDs on each launch.
+
+    Each ID column is mapped through its lookup table with a vectorized
+    index lookup, using the first payload and first core of every launch.
+
+    Args:
+        launches (pd.DataFrame): Raw launch data from the /launches endpoint.
+        tables (dict): Lookup DataFrames from build_lookup_tables.
+
+    Returns:
+        pd.DataFrame: A copy of the launches with resolved lookup columns added.
+    """
+    joined = launches.copy()
+
+    def first_item(series):
+        return series.map(lambda x: x[0] if isinstance(x, list) and x else None)
+
+    def resolve(ids, table_name, column):
+        table = tables.get(table_name)
+        if table is None or column not in table.columns:
+            return pd.Series(None, index=ids.index, dtype=object)
+        return ids.map(table[column])
+
+    if 'payloads' in joined:
+        payload_ids = first_item(joined['payloads'])
+        joined['payload_mass_kg'] = resolve(payload_ids, 'payloads', 'mass_kg')
+        joined['payload_orbit'] = resolve(payload_ids, 'payloads', 'orbit')
+    if 'launchpad' in joined:
+        joined['launchpad_name'] = resolve(joined['launchpad'], 'launchpads', 'name')
+    if 'cores' in joined:
+        core_ids = first_item(joined['cores']).map(lambda c: c.get('core') if isinstance(c, dict) else None)
+        joined['core_serial'] = resolve(core_ids, 'cores', 'serial')
+    if 'rocket' in joined:
+        joined['rocket_name'] = resolve(joined['rocket'], 'rockets', 'name')
+    return joined
+
+def collect_spacex_data(endpoints=ENDPOINTS, base_url=SPACEX_API_BASE, max_concurrency=5, fetch=None, max_age=0):
+    """
+    Fetches the launches and all reference endpoints concurrently and joins them.
+
+    Wall-clock time is bounded by the slowest endpoint rather than the sum of all
+    of them.
+
+    Args:
+        endpoints (iterable): Endpoint names to fetch. Must include 'launches'.
+        base_url (str): The API base URL.
+        max_concurrency (int): Maximum number of requests in flight at once.
+        fetch (callable): Function taking a URL and returning decoded JSON.
+                          Defaults to the cached request_json.
+        max_age (float): Seconds a cached response is served without revalidation.
+
+    Returns:
+        dict: The lookup DataFrames from build_lookup_tables, with 'launches'
+              replaced by the joined launch data.
+    """
+    print(f"Fetching {', '.join(endpoints)} from {base_url}...")
+    raw = asyncio.run(fetch_endpoints(endpoints, base_url, max_concurrency, fetch, max_age))
+    tables = build_lookup_tables(raw)
+    tables['launches'] = join_launch_lookups(tables['launches'], tables)
+    print("Data fetched successfully.")
+    return tables
+
+def payload_map_from_lookup(payloads):
+    """
+    Converts the payloads lookup table into the {id: {'mass_kg', 'orbit'}}
+    mapping used by wrangle.clean_api_data.
+    """
+    return payloads[['mass_kg', 'orbit']].to_dict(orient='index')
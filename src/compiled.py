@@ -0,0 +1,289 @@
+import argparse
+import json
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.special import expit
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.preprocessing import MaxAbsScaler, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from src.registry import registry_from_config
+from src.utils import load_config
+
+TREE_MODELS = (DecisionTreeClassifier,)
+FOREST_MODELS = (RandomForestClassifier, ExtraTreesClassifier)
+LINEAR_MODELS = (LogisticRegression, SGDClassifier)
+
+_LEAF = -1  # sklearn's TREE_LEAF child index
+_PER_TREE_MIN_ROWS = 1024  # Batches this large are traversed one tree at a time
+
+class CompiledModel:
+    """
+    A fitted pipeline flattened into NumPy arrays, scored without scikit-learn.
+
+    The encoder becomes its vocabulary and remainder columns, the scaler its
+    offsets and scales, a tree or forest its nodes' features, thresholds,
+    children and leaf values (every tree of a forest in one set of arrays),
+    and a linear model its coefficients. predict_proba and predict repeat
+    scikit-learn's arithmetic step for step, in the same order and dtypes,
+    so they return identical results; what they skip is the input
+    validation and per-call dispatch, which dominate small batches.
+
+    Exposes classes_ and feature_names_in_, so it can stand in for the
+    pipeline in predict.score_chunk and serve.create_app.
+    """
+
+    def __init__(self, arrays, meta):
+        """
+        Args:
+            arrays (dict): Name -> np.ndarray, as made by compile_model.
+            meta (dict): The JSON-serializable rest (model kind, vocabulary, columns).
+        """
+        self.arrays = arrays
+        self.meta = meta
+        self.kind = meta['kind']
+        self.classes_ = arrays['classes']
+        self.feature_names_in_ = np.asarray(meta['feature_names_in'], dtype=object)
+        self._remainder = meta['remainder_columns']
+        self._vocabulary = [(column, {category: i for i, category in enumerate(categories)})
+                            for column, categories in meta['vocabulary']]
+        self._indexes = [pd.Index(categories) for _, categories in meta['vocabulary']]
+        self._offsets = np.cumsum([len(self._remainder)] + [len(c) for _, c in meta['vocabulary']])[:-1]
+        self.n_features_ = len(self._remainder) + sum(len(c) for _, c in meta['vocabulary'])
+        if self.kind in ('tree', 'forest'):
+            # Leaves point to themselves, so every row can take the same number of steps
+            leaf = arrays['left'] == _LEAF
+            nodes = np.arange(len(leaf))
+            self._children = np.stack([np.where(leaf, nodes, arrays['left']),
+                                       np.where(leaf, nodes, arrays['right'])], axis=1).ravel().astype(np.intp)
+            self._feature = np.where(leaf, 0, arrays['feature']).astype(np.intp)
+
+    def _encode(self, X):
+        """The encoder step: remainder columns then one-hot indicators, as a dense float64 array."""
+        if isinstance(X, dict):
+            row = np.zeros((1, self.n_features_))
+            for i, column in enumerate(self._remainder):
+                value = X.get(column)
+                row[0, i] = np.nan if value is None or value is pd.NA else value
+            for (column, index), offset in zip(self._vocabulary, self._offsets):
+                code = index.get(X.get(column))
+                if code is not None:
+                    row[0, offset + code] = 1.0
+            return row
+        if isinstance(X, list):
+            X = pd.DataFrame.from_records(X)
+        encoded = np.zeros((len(X), self.n_features_))
+        if self._remainder:
+            encoded[:, :len(self._remainder)] = X[self._remainder].to_numpy(dtype=np.float64, na_value=np.nan)
+        rows = np.arange(len(X))
+        for (column, _), index, offset in zip(self._vocabulary, self._indexes, self._offsets):
+            codes = index.get_indexer(X[column])
+            known = codes >= 0
+            encoded[rows[known], offset + codes[known]] = 1.0
+        return encoded
+
+    def transform(self, X):
+        """
+        Applies the encoder and scaler steps.
+
+        Args:
+            X: A DataFrame of launches, a list of launch dicts, or one launch dict.
+
+        Returns:
+            np.ndarray: The model's input features, float64.
+        """
+        features = self._encode(X)
+        if 'scaler_mean' in self.arrays:
+            features -= self.arrays['scaler_mean']
+        if 'scaler_scale' in self.arrays:
+            features /= self.arrays['scaler_scale']
+        return features
+
+    def _step(self, X, nodes, rows, n_rows, has_nan):
+        """Moves each node in `nodes` to the child its row's feature value leads to."""
+        values = X.take(self._feature.take(nodes) * n_rows + rows)
+        right = values > self.arrays['threshold'].take(nodes)
+        if has_nan:
+            right |= np.isnan(values) & ~self.arrays['missing_go_to_left'].take(nodes)
+        return self._children.take(2 * nodes + right)
+
+    def _leaves(self, features):
+        """Returns the leaf node each row reaches in each tree, shape (n_rows, n_trees)."""
+        roots, depths = self.arrays['roots'], self.arrays['depths']
+        n_rows = len(features)
+        # Trees compare float32 features with float64 thresholds; columns are laid out contiguously
+        X = np.ascontiguousarray(features.astype(np.float32).T).ravel()
+        has_nan = bool(np.isnan(X).any())
+        if n_rows < _PER_TREE_MIN_ROWS:
+            # Small batches: every tree at once, so a step costs a few calls whatever the forest size
+            nodes = np.broadcast_to(roots, (n_rows, len(roots))).copy()
+            rows = np.arange(n_rows)[:, None]
+            for _ in range(depths.max()):
+                nodes = self._step(X, nodes, rows, n_rows, has_nan)
+            return nodes
+        # Large batches: one tree at a time, whose nodes stay in cache
+        leaves = np.empty((n_rows, len(roots)), dtype=np.intp)
+        rows = np.arange(n_rows)
+        for tree, (root, depth) in enumerate(zip(roots, depths)):
+            nodes = np.full(n_rows, root, dtype=np.intp)
+            for _ in range(depth):
+                nodes = self._step(X, nodes, rows, n_rows, has_nan)
+            leaves[:, tree] = nodes
+        return leaves
+
+    def decision_function(self, X):
+        """Returns the linear model's decision scores (linear models only)."""
+        if self.kind != 'linear':
+            raise ValueError(f"A compiled {self.kind} model has no decision_function.")
+        features = self.transform(X)
+        if np.isnan(features).any():
+            raise ValueError(f"Input contains NaN; {self.meta['estimator']} does not accept missing values.")
+        scores = features @ self.arrays['coef'].T + self.arrays['intercept']
+        return scores.reshape(-1)
+
+    def predict_proba(self, X):
+        """
+        Returns class probabilities, identical to the pipeline's predict_proba.
+
+        Args:
+            X: A DataFrame of launches, a list of launch dicts, or one launch dict.
+
+        Returns:
+            np.ndarray: Shape (n_rows, n_classes), columns in classes_ order.
+        """
+        if self.kind == 'linear':
+            prob = expit(self.decision_function(X))
+            return np.stack([1 - prob, prob], axis=1)
+        leaves = self._leaves(self.transform(X))
+        values = self.arrays['value'][:, :len(self.classes_)]
+        if self.kind == 'tree':
+            return values[leaves[:, 0]]
+        # Summed tree by tree, in order, as RandomForestClassifier accumulates them
+        proba = np.zeros((len(leaves), len(self.classes_)))
+        for tree in range(leaves.shape[1]):
+            proba += values[leaves[:, tree]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        """Returns predicted classes, identical to the pipeline's predict."""
+        if self.kind == 'linear':
+            return self.classes_.take((self.decision_function(X) > 0).astype(np.intp))
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path):
+        """Saves the arrays and metadata to one uncompressed .npz file (no pickles)."""
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, meta=np.array(json.dumps(self.meta)), **self.arrays)
+        os.replace(tmp_path, path)
+
+def load_compiled(path):
+    """Loads a CompiledModel saved with CompiledModel.save."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+        meta = json.loads(str(data['meta']))
+    return CompiledModel(arrays, meta)
+
+def _flatten_trees(trees):
+    """Concatenates fitted trees' node arrays, with child indices offset to the combined arrays."""
+    roots, depths, parts = [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        roots.append(offset)
+        depths.append(t.max_depth)
+        parts.append({
+            'feature': t.feature.astype(np.int32),
+            'threshold': t.threshold,
+            'left': np.where(t.children_left == _LEAF, _LEAF, t.children_left + offset).astype(np.int32),
+            'right': np.where(t.children_right == _LEAF, _LEAF, t.children_right + offset).astype(np.int32),
+            'missing_go_to_left': t.missing_go_to_left.astype(bool),
+            'value': t.value[:, 0, :]
+        })
+        offset += t.node_count
+    arrays = {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+    arrays['roots'] = np.asarray(roots, dtype=np.intp)
+    arrays['depths'] = np.asarray(depths, dtype=np.intp)
+    return arrays
+
+def compile_model(pipeline):
+    """
+    Flattens a fitted train.build_pipeline pipeline into a CompiledModel.
+
+    Supports DecisionTree, RandomForest and ExtraTrees classifiers, and
+    binary LogisticRegression and log-loss SGDClassifier models, behind a
+    standard, max-abs or no scaler.
+
+    Args:
+        pipeline (Pipeline): The fitted pipeline (encoder, scaler, model).
+
+    Returns:
+        CompiledModel: The compiled model.
+
+    Raises:
+        ValueError: If a step cannot be compiled.
+    """
+    encoder = pipeline.named_steps['encoder']
+    scaler = pipeline.named_steps.get('scaler', 'passthrough')
+    model = pipeline.named_steps['model']
+    if getattr(encoder, 'handle_unknown', 'ignore') != 'ignore':
+        raise ValueError("Only encoders with handle_unknown='ignore' can be compiled.")
+
+    arrays = {'classes': np.asarray(model.classes_)}
+    if isinstance(scaler, StandardScaler):
+        if scaler.with_mean:
+            arrays['scaler_mean'] = scaler.mean_
+        if scaler.with_std:
+            arrays['scaler_scale'] = scaler.scale_
+    elif isinstance(scaler, MaxAbsScaler):
+        arrays['scaler_scale'] = scaler.scale_
+    elif scaler not in ('passthrough', None):
+        raise ValueError(f"{type(scaler).__name__} cannot be compiled.")
+
+    if isinstance(model, TREE_MODELS):
+        kind = 'tree'
+        arrays.update(_flatten_trees([model]))
+    elif isinstance(model, FOREST_MODELS):
+        kind = 'forest'
+        arrays.update(_flatten_trees(model.estimators_))
+    elif isinstance(model, LINEAR_MODELS) and len(model.classes_) == 2 and getattr(model, 'loss', 'log_loss') == 'log_loss':
+        kind = 'linear'
+        arrays['coef'] = np.asarray(model.coef_)
+        arrays['intercept'] = np.asarray(model.intercept_)
+    else:
+        raise ValueError(f"{type(model).__name__} cannot be compiled; score it with the pipeline instead.")
+
+    meta = {
+        'kind': kind,
+        'estimator': type(model).__name__,
+        'feature_names_in': [str(c) for c in encoder.feature_names_in_],
+        'remainder_columns': list(encoder.remainder_columns_),
+        'vocabulary': [[column, list(categories)] for column, categories in encoder.vocabulary_.items()]
+    }
+    return CompiledModel(arrays, meta)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the saved model as a compiled NumPy model.")
+    parser.add_argument('--model', default=None,
+                        help="Model file (default: the registry's production version, else models/best_model.pkl).")
+    parser.add_argument('--output', default=None, help="The .npz file to write (default: models/compiled_model.npz).")
+    args = parser.parse_args()
+
+    config = load_config()
+    registry, name = registry_from_config(config), config['registry']['model_name']
+    model_path = args.model or os.path.join(config['data_paths']['models'], 'best_model.pkl')
+    if args.model is None and 'production' in registry.aliases(name):
+        model_path = registry.model_path(name, 'production')
+    output = args.output or os.path.join(config['data_paths']['models'], 'compiled_model.npz')
+    compiled = compile_model(joblib.load(model_path))
+    compiled.save(output)
+    start = time.perf_counter()
+    load_compiled(output)
+    print(f"Compiled {compiled.meta['estimator']} from {model_path} to {output} "
+          f"({os.path.getsize(output) / 1024:,.0f} KB, loads in {(time.perf_counter() - start) * 1000:.1f} ms)")
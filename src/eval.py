@@ -1,7 +1,172 @@
+import argparse
+import os
+import numpy as np
 import pandas as pd
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
+from scipy.stats import binom, rankdata
+from sklearn.metrics import confusion_matrix
 import seaborn as sns
 import matplotlib.pyplot as plt
+from src.utils import load_config
+
+# Columns of the comparison table, in order; the confusion counts follow them
+METRICS = ['Accuracy', 'Precision', 'Recall', 'F1-Score', 'Specificity', 'MCC', 'ROC-AUC']
+COUNTS = ['TP', 'FP', 'FN', 'TN']
+DEFAULT_DOC_PATH = 'docs/model_comparison.md'
+
+def _as_binary(labels, name):
+    labels = np.asarray(labels)
+    if labels.dtype == bool:
+        return labels.astype(np.int64)
+    if not np.isin(labels, (0, 1)).all():
+        raise ValueError(f"{name} must be binary 0/1 labels.")
+    return labels.astype(np.int64)
+
+def confusion_matrices(y_true, y_pred):
+    """
+    Builds the confusion matrix of every model's predictions in one pass.
+
+    Each (true, predicted) pair is coded as 2 * true + predicted, offset by
+    4 per model, and a single bincount over all models' codes counts them.
+
+    Args:
+        y_true: True 0/1 labels, shape (n_samples,).
+        y_pred: Predicted 0/1 labels, shape (n_samples,) or (n_models, n_samples).
+
+    Returns:
+        np.ndarray: Shape (n_models, 2, 2), each [[TN, FP], [FN, TP]] like sklearn's confusion_matrix.
+    """
+    y_true = _as_binary(y_true, 'y_true')
+    y_pred = np.atleast_2d(_as_binary(y_pred, 'y_pred'))
+    if y_pred.shape[1] != len(y_true):
+        raise ValueError(f"Predictions cover {y_pred.shape[1]} samples; y_true has {len(y_true)}.")
+    n_models = len(y_pred)
+    codes = 2 * y_true + y_pred + 4 * np.arange(n_models)[:, None]
+    return np.bincount(codes.ravel(), minlength=4 * n_models).reshape(n_models, 2, 2)
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is 0 (sklearn's zero_division default)."""
+    numerator, denominator = np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+def metrics_from_confusion(matrices):
+    """
+    Derives the threshold metrics from confusion matrices, for all models at once.
+
+    Args:
+        matrices (np.ndarray): Shape (n_models, 2, 2), as from confusion_matrices.
+
+    Returns:
+        dict: Metric name -> array of shape (n_models,), plus the TP/FP/FN/TN counts.
+    """
+    tn, fp, fn, tp = (matrices.reshape(-1, 4).T).astype(float)
+    precision = _ratio(tp, tp + fp)
+    recall = _ratio(tp, tp + fn)
+    return {
+        'Accuracy': _ratio(tp + tn, tp + tn + fp + fn),
+        'Precision': precision,
+        'Recall': recall,
+        'F1-Score': _ratio(2 * tp, 2 * tp + fp + fn),
+        'Specificity': _ratio(tn, tn + fp),
+        'MCC': _ratio(tp * tn - fp * fn, np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn))),
+        'TP': tp.astype(int), 'FP': fp.astype(int), 'FN': fn.astype(int), 'TN': tn.astype(int)
+    }
+
+def _rank_auc(labels, scores):
+    """Row-wise ROC-AUC for matching (n_rows, n_samples) boolean labels and scores; NaN for one-class rows."""
+    n_pos = labels.sum(axis=1)
+    n_neg = labels.shape[1] - n_pos
+    ranks = rankdata(scores, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        auc = ((ranks * labels).sum(axis=1) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+    auc[(n_pos == 0) | (n_neg == 0) | np.isnan(scores).any(axis=1)] = np.nan
+    return auc
+
+def roc_auc(y_true, scores):
+    """
+    Computes each model's ROC-AUC from its scores, as the rank-sum (Mann-Whitney) statistic.
+
+    Tied scores get their average rank, which gives the same value as the
+    trapezoidal area under the ROC curve (sklearn's roc_auc_score).
+
+    Args:
+        y_true: True 0/1 labels, shape (n_samples,).
+        scores: Positive-class scores, shape (n_samples,) or (n_models, n_samples).
+                Rows of NaN (models without scores) give NaN.
+
+    Returns:
+        np.ndarray: Shape (n_models,). NaN if y_true holds a single class.
+    """
+    y_true = _as_binary(y_true, 'y_true').astype(bool)
+    scores = np.atleast_2d(np.asarray(scores, dtype=float))
+    return _rank_auc(np.broadcast_to(y_true, scores.shape), scores)
+
+def compare_predictions(y_true, predictions, scores=None):
+    """
+    Tabulates every metric for many models' predictions on the same labels.
+
+    Args:
+        y_true: True 0/1 labels.
+        predictions (dict): Model name -> predicted labels.
+        scores (dict): Model name -> positive-class scores, for ROC-AUC.
+                       Models without scores get a NaN ROC-AUC.
+
+    Returns:
+        pd.DataFrame: One row per model (in the given order), METRICS then COUNTS columns.
+    """
+    names = list(predictions)
+    metrics = metrics_from_confusion(confusion_matrices(y_true, np.stack([predictions[n] for n in names])))
+    scores = scores or {}
+    nan_scores = np.full(len(y_true), np.nan)
+    metrics['ROC-AUC'] = roc_auc(y_true, np.stack([np.asarray(scores.get(n, nan_scores), dtype=float)
+                                                   for n in names]))
+    table = pd.DataFrame(metrics, index=pd.Index(names, name='Model'))
+    return table[METRICS + COUNTS]
+
+def model_scores(model, X):
+    """
+    Returns a model's predicted labels and positive-class scores.
+
+    The scores are predict_proba's positive column, else decision_function,
+    else None.
+    """
+    y_pred = model.predict(X)
+    if hasattr(model, 'predict_proba'):
+        return y_pred, model.predict_proba(X)[:, list(model.classes_).index(1)]
+    if hasattr(model, 'decision_function'):
+        return y_pred, model.decision_function(X)
+    return y_pred, None
+
+def collect_predictions(models, X):
+    """
+    Runs each model on X once.
+
+    Returns:
+        tuple: (predictions, scores) dicts keyed by model name; models
+               without scores are left out of `scores`.
+    """
+    predictions, scores = {}, {}
+    for name, model in models.items():
+        predictions[name], score = model_scores(model, X)
+        if score is not None:
+            scores[name] = score
+    return predictions, scores
+
+def evaluate_models(models, X_test, y_test):
+    """
+    Evaluates several trained models on the same test set.
+
+    Each model predicts once; the metrics of all of them are then computed
+    together (see compare_predictions).
+
+    Args:
+        models (dict): Model name -> trained classifier.
+        X_test: Test features.
+        y_test: True labels for the test set.
+
+    Returns:
+        pd.DataFrame: One row per model, METRICS then COUNTS columns.
+    """
+    return compare_predictions(y_test, *collect_predictions(models, X_test))
 
 def evaluate_model(model, X_test, y_test):
     """
@@ -16,15 +181,214 @@ def evaluate_model(model, X_test, y_test):
         dict: A dictionary containing the accuracy, precision, recall, and f1-score.
     """
     y_pred = model.predict(X_test)
-    
-    metrics = {
-        'Accuracy': accuracy_score(y_test, y_pred),
-        'Precision': precision_score(y_test, y_pred),
-        'Recall': recall_score(y_test, y_pred),
-        'F1-Score': f1_score(y_test, y_pred)
-    }
-    
-    return metrics
+    metrics = metrics_from_confusion(confusion_matrices(y_test, y_pred))
+    return {name: float(metrics[name][0]) for name in ['Accuracy', 'Precision', 'Recall', 'F1-Score']}
+
+def bootstrap_metrics(y_true, predictions, scores=None, n_resamples=10_000, random_state=42):
+    """
+    Computes every metric of every model on the same bootstrap resamples of the test set.
+
+    All resamples are drawn at once as an (n_resamples, n_samples) index
+    matrix and turned into a matrix of how often each sample is drawn; one
+    matrix product with each model's TN/FP/FN/TP indicators then gives every
+    resample's confusion matrix. ROC-AUC is ranked row-wise over the
+    resampled scores. Models share the resamples, so their differences
+    per resample are paired.
+
+    Args:
+        y_true: True 0/1 labels.
+        predictions (dict): Model name -> predicted labels.
+        scores (dict): Model name -> positive-class scores, for ROC-AUC.
+        n_resamples (int): Bootstrap resamples.
+        random_state (int): Seed of the resampling.
+
+    Returns:
+        dict: Metric name (METRICS) -> array of shape (n_models, n_resamples),
+              models in the order of `predictions`.
+    """
+    names = list(predictions)
+    y_true = _as_binary(y_true, 'y_true')
+    y_pred = np.stack([_as_binary(predictions[name], 'y_pred') for name in names])
+    n_models, n_samples = y_pred.shape
+    indices = np.random.default_rng(random_state).integers(0, n_samples, (n_resamples, n_samples))
+    offsets = n_samples * np.arange(n_resamples)[:, None]
+    draws = np.bincount((indices + offsets).ravel(), minlength=n_resamples * n_samples).reshape(n_resamples, n_samples)
+
+    # Indicator of each sample being a TN, FP, FN or TP of each model: (n_samples, n_models * 4)
+    cells = (2 * y_true + y_pred)[:, :, None] == np.arange(4)
+    counts = draws.astype(float) @ cells.transpose(1, 0, 2).reshape(n_samples, -1).astype(float)
+    matrices = counts.reshape(n_resamples, n_models, 2, 2).transpose(1, 0, 2, 3).reshape(-1, 2, 2)
+    distributions = {name: values.reshape(n_models, n_resamples)
+                     for name, values in metrics_from_confusion(matrices).items() if name in METRICS}
+
+    labels = y_true.astype(bool)[indices]
+    distributions['ROC-AUC'] = np.full((n_models, n_resamples), np.nan)
+    for m, name in enumerate(names):
+        if scores and name in scores:
+            distributions['ROC-AUC'][m] = _rank_auc(labels, np.asarray(scores[name], dtype=float)[indices])
+    return distributions
+
+def bootstrap_intervals(y_true, predictions, scores=None, n_resamples=10_000, confidence=0.95, random_state=42):
+    """
+    Percentile bootstrap confidence intervals for every metric of every model.
+
+    Args:
+        y_true, predictions, scores: As for compare_predictions.
+        n_resamples (int): Bootstrap resamples.
+        confidence (float): Coverage of the intervals.
+        random_state (int): Seed of the resampling.
+
+    Returns:
+        pd.DataFrame: One row per model and metric: the test set estimate and its interval.
+    """
+    estimates = compare_predictions(y_true, predictions, scores)
+    distributions = bootstrap_metrics(y_true, predictions, scores, n_resamples, random_state)
+    tail = (1 - confidence) / 2 * 100
+    rows = []
+    for metric in METRICS:
+        values = distributions[metric]
+        valid = ~np.isnan(values).all(axis=1)
+        lower, upper = np.full(len(values), np.nan), np.full(len(values), np.nan)
+        if valid.any():
+            lower[valid], upper[valid] = np.nanpercentile(values[valid], [tail, 100 - tail], axis=1)
+        for m, name in enumerate(predictions):
+            rows.append({'Model': name, 'Metric': metric, 'Estimate': estimates.loc[name, metric],
+                         'CI Lower': lower[m], 'CI Upper': upper[m]})
+    return pd.DataFrame(rows).set_index(['Model', 'Metric'])
+
+def mcnemar_tests(y_true, predictions):
+    """
+    Exact McNemar tests between every pair of models.
+
+    Only the launches the two models disagree on count: b, those only the
+    first model gets right, and c, those only the second gets right. Under
+    equal error rates b ~ Binomial(b + c, 1/2). All pairs' b and c come from
+    one matrix product of the models' correctness indicators.
+
+    Returns:
+        pd.DataFrame: One row per pair: b, c and the two-sided p-value.
+    """
+    names = list(predictions)
+    y_true = _as_binary(y_true, 'y_true')
+    correct = np.stack([_as_binary(predictions[name], 'y_pred') == y_true for name in names]).astype(float)
+    only_first = correct @ (1 - correct).T  # [i, j]: right by model i, wrong by model j
+    rows = []
+    for i, j in zip(*np.triu_indices(len(names), k=1)):
+        b, c = int(only_first[i, j]), int(only_first[j, i])
+        p_value = min(1.0, 2 * binom.cdf(min(b, c), b + c, 0.5)) if b + c else 1.0
+        rows.append({'Model A': names[i], 'Model B': names[j], 'Only A Right': b, 'Only B Right': c,
+                     'McNemar p': p_value})
+    return pd.DataFrame(rows, columns=['Model A', 'Model B', 'Only A Right', 'Only B Right', 'McNemar p'])
+
+def paired_tests(y_true, predictions, scores=None, metric='F1-Score', n_resamples=10_000, confidence=0.95,
+                 random_state=42):
+    """
+    Tests every pair of models for a difference in `metric`, by paired bootstrap and by McNemar's test.
+
+    Both models of a pair are scored on the same resamples, so the spread of
+    their per-resample difference reflects only how they differ, not the
+    noise of the test set they share.
+
+    Args:
+        y_true, predictions, scores: As for compare_predictions.
+        metric (str): One of METRICS.
+        n_resamples (int): Bootstrap resamples.
+        confidence (float): Coverage of the difference's interval.
+        random_state (int): Seed of the resampling.
+
+    Returns:
+        pd.DataFrame: One row per pair: the test set difference (A - B) in
+                      `metric`, its bootstrap interval and two-sided p-value,
+                      and the McNemar counts and p-value.
+    """
+    names = list(predictions)
+    estimates = compare_predictions(y_true, predictions, scores)[metric]
+    values = bootstrap_metrics(y_true, predictions, scores, n_resamples, random_state)[metric]
+    first, second = np.triu_indices(len(names), k=1)
+    differences = values[first] - values[second]  # (n_pairs, n_resamples), paired by resample
+    tail = (1 - confidence) / 2 * 100
+    with np.errstate(invalid='ignore'):
+        lower, upper = np.nanpercentile(differences, [tail, 100 - tail], axis=1)
+        n_valid = (~np.isnan(differences)).sum(axis=1)
+        # Two-sided: twice the share of resamples on the far side of zero
+        p_values = np.minimum(1.0, 2 * np.minimum((differences <= 0).sum(axis=1),
+                                                   (differences >= 0).sum(axis=1)) / n_valid)
+    table = pd.DataFrame({
+        'Model A': [names[i] for i in first],
+        'Model B': [names[j] for j in second],
+        f"{metric} Difference": estimates.iloc[first].to_numpy() - estimates.iloc[second].to_numpy(),
+        'CI Lower': lower,
+        'CI Upper': upper,
+        'Bootstrap p': p_values
+    })
+    return table.merge(mcnemar_tests(y_true, predictions), on=['Model A', 'Model B'])
+
+def comparison_markdown(table, columns=METRICS, float_format='{:.4f}', intervals=None):
+    """
+    Renders a comparison table as a Markdown table, one row per model.
+
+    Args:
+        table (pd.DataFrame): Indexed by model name, e.g. from evaluate_models.
+        columns (list): The columns to include, in order; missing ones are skipped.
+        float_format (str): Format of float cells; NaN renders as '-'.
+        intervals (pd.DataFrame): Confidence intervals from bootstrap_intervals,
+                                  shown after each metric they cover.
+
+    Returns:
+        str: The Markdown table.
+    """
+    columns = [c for c in columns if c in table.columns]
+    def cell(value):
+        if isinstance(value, (float, np.floating)):
+            return '-' if np.isnan(value) else float_format.format(value)
+        return str(value)
+    def metric_cell(name, column):
+        text = cell(table.loc[name, column])
+        if intervals is not None and (name, column) in intervals.index:
+            lower, upper = intervals.loc[(name, column), ['CI Lower', 'CI Upper']]
+            if not np.isnan(lower):
+                text += f" [{cell(lower)}, {cell(upper)}]"
+        return text
+    lines = ['| Model | ' + ' | '.join(columns) + ' |', '| --- |' + ' --- |' * len(columns)]
+    for name in table.index:
+        lines.append(f"| **{name}** | " + ' | '.join(metric_cell(name, c) for c in columns) + ' |')
+    return '\n'.join(lines) + '\n'
+
+def update_comparison_doc(table, path=DEFAULT_DOC_PATH, heading='## Evaluation Metrics', intervals=None):
+    """
+    Writes a comparison table into the model comparison document.
+
+    The Markdown table under `heading` is replaced and the rest of the
+    document is kept as it is; a document without that heading gets a new
+    section at its end (a missing document is created).
+
+    Args:
+        table (pd.DataFrame): Indexed by model name, e.g. from evaluate_models.
+        path (str): The Markdown document.
+        heading (str): The heading of the section holding the table.
+        intervals (pd.DataFrame): Confidence intervals to show, from bootstrap_intervals.
+    """
+    markdown = comparison_markdown(table, intervals=intervals).splitlines()
+    lines = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            lines = f.read().splitlines()
+    if heading in lines:
+        start = lines.index(heading) + 1
+        # The table is the first run of '|' lines after the heading
+        while start < len(lines) and not lines[start].startswith('|') and not lines[start].startswith('#'):
+            start += 1
+        end = start
+        while end < len(lines) and lines[end].startswith('|'):
+            end += 1
+        if start == end:
+            markdown = markdown + ['']
+        lines[start:end] = markdown
+    else:
+        lines += ([''] if lines else ['# Model Performance Comparison', '']) + [heading, ''] + markdown
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    print(f"Comparison table written to {path}")
 
 def plot_confusion_matrix(y_test, y_pred, model_name):
     """
@@ -36,7 +400,7 @@ def plot_confusion_matrix(y_test, y_pred, model_name):
         model_name (str): The name of the model for the plot title.
     """
     cm = confusion_matrix(y_test, y_pred)
-    
+
     plt.figure(figsize=(8, 6))
     sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
                 xticklabels=['Predicted Failure', 'Predicted Success'],
@@ -44,4 +408,19 @@ def plot_confusion_matrix(y_test, y_pred, model_name):
     plt.ylabel('Actual')
     plt.xlabel('Predicted')
     plt.title(f'Confusion Matrix for {model_name}')
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write the model comparison table saved by src.train into the docs.")
+    parser.add_argument('--comparison', default=None, help="Comparison CSV (default: models/model_comparison.csv).")
+    parser.add_argument('--doc', default=DEFAULT_DOC_PATH)
+    args = parser.parse_args()
+
+    config = load_config()
+    models_dir, files = config['data_paths']['models'], config['data_files']
+    path = args.comparison or os.path.join(models_dir, files['model_comparison'])
+    table = pd.read_csv(path, index_col='Model')
+    print(table.to_string(float_format='{:.4f}'.format))
+    intervals_path = os.path.join(models_dir, files['metric_intervals'])
+    intervals = pd.read_csv(intervals_path, index_col=['Model', 'Metric']) if os.path.exists(intervals_path) else None
+    update_comparison_doc(table, args.doc, intervals=intervals)
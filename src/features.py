@@ -1,36 +1,321 @@
+import json
+import os
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from sklearn.utils.validation import check_is_fitted
+from src.utils import load_config
 
-def create_features(df):
+# Categorical columns of the wrangled launch data that are one-hot encoded
+CATEGORICAL_FEATURES = ['Orbit', 'LaunchSite', 'GridFins', 'Reused', 'Legs']
+
+class CategoricalEncoder(TransformerMixin, BaseEstimator):
+    """
+    One-hot encoder with a vocabulary frozen when it is fitted.
+
+    Unlike pd.get_dummies, every batch is encoded into the same columns, in the
+    same order, whichever categories it happens to contain, so a saved encoder
+    can encode inference batches consistently with the training data. The
+    output is a scipy CSR matrix that scikit-learn models accept directly,
+    or a dense array with `sparse_output=False`.
+
+    Output columns are the numeric remainder columns (if `remainder` is
+    'passthrough') followed by one indicator column per category, named like
+    pd.get_dummies names them, e.g. 'Orbit_LEO' or 'Reused_True'.
+    """
+
+    def __init__(self, columns=tuple(CATEGORICAL_FEATURES), remainder='passthrough', handle_unknown='ignore',
+                 sparse_output=True):
+        """
+        Args:
+            columns (sequence): The categorical columns to encode.
+            remainder (str): 'passthrough' keeps the other numeric and boolean
+                columns seen at fit time; 'drop' outputs only the indicators.
+            handle_unknown (str): 'ignore' encodes categories not seen at fit
+                time (and missing values) as all zeros; 'error' raises.
+            sparse_output (bool): Return a CSR matrix rather than a dense array.
+        """
+        self.columns = columns
+        self.remainder = remainder
+        self.handle_unknown = handle_unknown
+        self.sparse_output = sparse_output
+
+    def fit(self, X, y=None):
+        """
+        Learns the categories of each column and the remainder columns.
+
+        Args:
+            X (pd.DataFrame): Training data.
+            y: Ignored.
+
+        Returns:
+            CategoricalEncoder: self.
+        """
+        if self.remainder not in ('passthrough', 'drop'):
+            raise ValueError(f"remainder must be 'passthrough' or 'drop', got {self.remainder!r}")
+        if self.handle_unknown not in ('ignore', 'error'):
+            raise ValueError(f"handle_unknown must be 'ignore' or 'error', got {self.handle_unknown!r}")
+        columns = list(self.columns)
+        self.vocabulary_ = {column: sorted(X[column].dropna().unique().tolist(), key=str) for column in columns}
+        if self.remainder == 'passthrough':
+            others = X.drop(columns=columns)
+            self.remainder_columns_ = list(others.select_dtypes(include=['number', 'bool']).columns)
+        else:
+            self.remainder_columns_ = []
+        self.feature_names_in_ = np.asarray(list(X.columns), dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        return self
+
+    def get_feature_names_out(self, input_features=None):
+        """Returns the output column names, in output order."""
+        check_is_fitted(self, 'vocabulary_')
+        indicators = [f"{column}_{category}" for column, categories in self.vocabulary_.items()
+                      for category in categories]
+        return np.asarray(self.remainder_columns_ + indicators, dtype=object)
+
+    def transform(self, X):
+        """
+        Encodes a batch with the fitted vocabulary.
+
+        Args:
+            X (pd.DataFrame): Data with the fitted columns.
+
+        Returns:
+            scipy.sparse.csr_matrix or np.ndarray: One row per input row, float64.
+        """
+        check_is_fitted(self, 'vocabulary_')
+        n_rows = len(X)
+        rows, cols = [], []
+        offset = 0
+        for column, categories in self.vocabulary_.items():
+            codes = pd.Index(categories).get_indexer(X[column])
+            known = codes >= 0
+            if self.handle_unknown == 'error':
+                unknown = ~known & X[column].notna().to_numpy()
+                if unknown.any():
+                    raise ValueError(f"Unknown categories in {column}: {sorted(set(X[column][unknown]), key=str)}")
+            rows.append(np.flatnonzero(known))
+            cols.append(codes[known].astype(np.int64) + offset)
+            offset += len(categories)
+
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        indicators = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_rows, offset))
+        if self.remainder_columns_:
+            remainder = sp.csr_matrix(X[self.remainder_columns_].to_numpy(dtype=np.float64, na_value=np.nan))
+            indicators = sp.hstack([remainder, indicators], format='csr')
+        return indicators if self.sparse_output else indicators.toarray()
+
+def create_features(df, encoder=None):
     """
     Performs one-hot encoding on categorical features of the launch data.
 
+    The indicator columns come from a CategoricalEncoder, so a fitted encoder
+    gives the same columns for every batch. Pass the training encoder to
+    encode new data; an unfitted (or no) encoder is fitted on `df`.
+
     Args:
         df (pd.DataFrame): The cleaned launch data DataFrame.
+        encoder (CategoricalEncoder): Encoder to use. Fitted in place if it is not fitted yet.
 
     Returns:
-        pd.DataFrame: DataFrame with categorical features one-hot encoded.
+        pd.DataFrame: DataFrame with categorical features one-hot encoded, as
+                      sparse 0/1 columns (pd.SparseDtype(np.uint8, 0)).
     """
-    # Select categorical columns for one-hot encoding
-    features_to_encode = ['Orbit', 'LaunchSite', 'GridFins', 'Reused', 'Legs']
-    
-    # Apply one-hot encoding using pandas get_dummies
-    features_one_hot = pd.get_dummies(df[features_to_encode])
-    
+    if encoder is None:
+        encoder = CategoricalEncoder(remainder='drop')
+    if not hasattr(encoder, 'vocabulary_'):
+        encoder.fit(df)
+    features_to_encode = list(encoder.vocabulary_)
+
+    # Only the indicator columns are encoded here; the other columns are kept as they are
+    indicators = encoder.transform(df)
+    names = encoder.get_feature_names_out()
+    if encoder.remainder_columns_:
+        indicators = indicators[:, len(encoder.remainder_columns_):]
+        names = names[len(encoder.remainder_columns_):]
+    # Kept sparse: each launch sets one indicator per encoded column, so most values are 0.
+    # uint8 rather than bool, because scikit-learn cannot convert sparse bool columns.
+    features_one_hot = pd.DataFrame.sparse.from_spmatrix(
+        sp.csr_matrix(indicators).astype(np.uint8), index=df.index, columns=names)
+
     # Drop the original categorical columns
     df = df.drop(columns=features_to_encode)
-    
+
     # Concatenate the original dataframe with the new one-hot encoded columns
     df = pd.concat([df, features_one_hot], axis=1)
-    
+
     return df
 
+# Features describing each launch's history, computed from earlier launches only
+HISTORY_FEATURES = ['SitePriorSuccessRate', 'BoosterPriorSuccessRate', 'DaysSinceSiteLaunch', 'CoreFlightCount']
+# Wrangled columns the history features of a launch are looked up by
+HISTORY_INPUTS = ['Date', 'LaunchSite', 'Core']
+
+def new_history_state():
+    """Returns an empty running state for history_features."""
+    return {'sites': {}, 'cores': {}, 'last_launch': None}
+
+def _state_keys(column):
+    """Returns a column's values as JSON-compatible state keys, None where missing."""
+    values = column.astype(object)
+    return [None if missing else str(value) for value, missing in zip(values, values.isna())]
+
+def _launch_order(df):
+    # Launches without a date cannot be placed in time; they go last and read the state without updating it
+    dates = pd.to_datetime(df['Date'], utc=True)
+    nanos = dates.dt.tz_convert(None).to_numpy('datetime64[ns]').astype(np.int64)
+    missing = dates.isna().to_numpy()
+    nanos[missing] = np.iinfo(np.int64).max
+    order = np.lexsort((df['flight_number'].to_numpy(), nanos))
+    return order, nanos, missing
+
+def history_features(df, state=None):
+    """
+    Computes history features for launches in one pass in launch order.
+
+    Each launch only sees launches before it:
+      - SitePriorSuccessRate / BoosterPriorSuccessRate: landing success rate of
+        earlier launches from the same LaunchSite / of the same Core (the
+        booster; BoosterVersion is the mission name), smoothed as
+        (successes + 1) / (launches + 2), so a first launch gets 0.5.
+      - DaysSinceSiteLaunch: days since the previous launch from the same pad,
+        or -1 for a pad's first launch.
+      - CoreFlightCount: number of earlier launches of the same Core, plus this one.
+
+    The counts are kept in a running state, so new launches can be appended
+    by passing the state returned for the earlier ones instead of recomputing
+    the whole history.
+
+    Args:
+        df (pd.DataFrame): Wrangled launches with 'flight_number', 'Date',
+            'LaunchSite', 'Core' and 'class'.
+        state (dict): Running state from an earlier call, or None to start empty.
+            Not modified; an updated copy is returned.
+
+    Returns:
+        tuple: (DataFrame of HISTORY_FEATURES aligned with `df`, updated state).
+
+    Raises:
+        ValueError: If a dated launch is earlier than the last launch in `state`.
+    """
+    state = json.loads(json.dumps(state)) if state is not None else new_history_state()
+    order, nanos, undated = _launch_order(df)
+    last_launch = pd.Timestamp(state['last_launch']).value if state['last_launch'] else None
+    if last_launch is not None and (nanos[~undated] < last_launch).any():
+        raise ValueError("Launches earlier than the stored history state cannot be appended; recompute from scratch.")
+
+    sites, cores = state['sites'], state['cores']
+    site_values, core_values = _state_keys(df['LaunchSite']), _state_keys(df['Core'])
+    successes = pd.to_numeric(df['class']).to_numpy()
+    n = len(df)
+    site_rate, booster_rate = np.empty(n), np.empty(n)
+    days_since, core_count = np.empty(n), np.empty(n, dtype=np.int64)
+
+    for i in order:
+        site, core = site_values[i], core_values[i]
+        site_state = sites.get(site, [0, 0, None])  # [launches, successes, last launch ns]
+        core_state = cores.get(core, [0, 0])  # [launches, successes]
+        site_rate[i] = (site_state[1] + 1) / (site_state[0] + 2)
+        booster_rate[i] = (core_state[1] + 1) / (core_state[0] + 2)
+        days_since[i] = -1.0 if site_state[2] is None or undated[i] else (nanos[i] - site_state[2]) / 86_400e9
+        core_count[i] = core_state[0] + 1
+        if undated[i]:
+            continue
+        success = int(successes[i] == 1)
+        if site is not None:
+            sites[site] = [site_state[0] + 1, site_state[1] + success, int(nanos[i])]
+        if core is not None:
+            cores[core] = [core_state[0] + 1, core_state[1] + success]
+        last_launch = int(nanos[i])
+
+    state['last_launch'] = pd.Timestamp(last_launch, tz='UTC').isoformat() if last_launch is not None else None
+    features = pd.DataFrame({
+        'SitePriorSuccessRate': site_rate,
+        'BoosterPriorSuccessRate': booster_rate,
+        'DaysSinceSiteLaunch': days_since,
+        'CoreFlightCount': core_count
+    }, index=df.index)
+    return features, state
+
+def lookup_history_features(df, state):
+    """
+    Looks up the history features of launches to be scored, whose outcome is not known yet.
+
+    Every launch sees all the launches in `state` and none of the others in
+    `df`, and the state is not updated, so a launch gets the same features
+    whichever batch it is scored in.
+
+    Args:
+        df (pd.DataFrame): Launches with the HISTORY_INPUTS columns; missing
+            values get a first launch's features.
+        state (dict): Running state from history_features or load_history_state.
+
+    Returns:
+        pd.DataFrame: HISTORY_FEATURES aligned with `df`.
+    """
+    sites = [state['sites'].get(site, [0, 0, None]) for site in _state_keys(df['LaunchSite'])]
+    cores = [state['cores'].get(core, [0, 0]) for core in _state_keys(df['Core'])]
+    site_launches, site_successes = (np.array([s[k] for s in sites], dtype=np.float64) for k in (0, 1))
+    core_launches, core_successes = (np.array([c[k] for c in cores], dtype=np.float64) for k in (0, 1))
+    last_site_launch = pd.to_datetime(pd.Series([s[2] for s in sites], index=df.index, dtype='float64'), utc=True)
+    days_since = (pd.to_datetime(df['Date'], utc=True) - last_site_launch) / pd.Timedelta(days=1)
+    return pd.DataFrame({
+        'SitePriorSuccessRate': (site_successes + 1) / (site_launches + 2),
+        'BoosterPriorSuccessRate': (core_successes + 1) / (core_launches + 2),
+        'DaysSinceSiteLaunch': days_since.fillna(-1.0).to_numpy(dtype=np.float64),
+        'CoreFlightCount': core_launches.astype(np.int64) + 1
+    }, index=df.index)
+
+def history_state_path(config=None):
+    """Returns where the running history state is stored, from `data_files` in config.yaml."""
+    config = config or load_config()
+    return os.path.join(config['data_paths']['interim'], config['data_files']['history_state'])
+
+def load_history_state(path=None):
+    """Loads the stored running history state, or an empty state if there is none."""
+    path = path or history_state_path()
+    if not os.path.exists(path):
+        return new_history_state()
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_history_state(state, path=None):
+    """Saves the running history state as JSON."""
+    path = path or history_state_path()
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        json.dump(state, f)
+    print(f"History state saved to {path}")
+
+def split_data(X, Y, test_size=0.2, random_state=42):
+    """
+    Splits the feature and target data into training and testing sets.
+
+    Args:
+        X (pd.DataFrame): The feature matrix.
+        Y (pd.Series or np.array): The target vector.
+        test_size (float): The proportion of the dataset to include in the test split.
+        random_state (int): The seed used by the random number generator.
+
+    Returns:
+        tuple: X_train, X_test, Y_train, Y_test.
+    """
+    return train_test_split(X, Y, test_size=test_size, random_state=random_state)
+
 def split_and_scale_data(X, Y, test_size=0.2, random_state=42):
     """
     Splits the feature and target data into training and testing sets
     and applies standard scaling to the feature sets.
 
+    The scaler is fitted on the whole training set, so cross-validating on
+    its output leaks statistics across folds. For tuning, search over
+    train.build_pipeline on the output of split_data instead.
+
     Args:
         X (pd.DataFrame): The feature matrix.
         Y (pd.Series or np.array): The target vector.
@@ -41,7 +326,7 @@ def split_and_scale_data(X, Y, test_size=0.2, random_state=42):
         tuple: A tuple containing X_train, X_test, Y_train, Y_test, and the fitted scaler object.
     """
     # Split the data into training and testing sets
-    X_train, X_test, Y_train, Y_test = train_test_split(X, Y, test_size=test_size, random_state=random_state)
+    X_train, X_test, Y_train, Y_test = split_data(X, Y, test_size=test_size, random_state=random_state)
     
     # Initialize the StandardScaler
     scaler = StandardScaler()
@@ -52,4 +337,4 @@ def split_and_scale_data(X, Y, test_size=0.2, random_state=42):
     # Transform the test data using the same fitted scaler
     X_test_scaled = scaler.transform(X_test)
     
-    return X_train_scaled, X_test_scaled, Y_train, Y_test, scaler
\ No newline at end of file
+    return X_train_scaled, X_test_scaled, Y_train, Y_test, scaler
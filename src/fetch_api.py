@@ -1,51 +1,293 @@
+import argparse
+import json
 import requests
 import pandas as pd
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from src.collect import SPACEX_API_BASE, collect_spacex_data
+from src.http_client import request_json
+from src.reference_store import ReferenceStore
+from src.storage import (ARTIFACT_SCHEMAS, PARTITION_COLUMN, artifact_path, load_parquet,
+                         save_artifact, save_parquet)
+from src.utils import load_config
 
-def fetch_spacex_launch_data(api_url="https://api.spacexdata.com/v4/launches"):
+LAUNCHES_QUERY_URL = "https://api.spacexdata.com/v4/launches/query"
+
+def fetch_spacex_launch_data(base_url=SPACEX_API_BASE, store=None, fetch=None, max_age=0):
     """
-    Fetches all historical launch data from the SpaceX API v4.
+    Fetches all historical launch data from the SpaceX API v4, together with
+    the payload, launchpad, core and rocket reference data.
+
+    All endpoints are fetched concurrently (see collect.collect_spacex_data),
+    and the reference collections are written to the local reference store, so
+    wrangling resolves the launches' IDs without another request.
 
     Args:
-        api_url (str): The URL of the SpaceX launches API endpoint.
+        base_url (str): The SpaceX API base URL.
+        store (ReferenceStore): Store the reference data is written to. Defaults to the project's store.
+        fetch (callable): Function taking a URL and returning decoded JSON.
+                          Defaults to the cached request_json.
+        max_age (float): Seconds a cached response is served without revalidation.
 
     Returns:
-        pd.DataFrame: A pandas DataFrame containing the fetched launch data.
-                      Returns None if the request fails.
+        pd.DataFrame: The launches, flattened with pd.json_normalize, with their
+                      payload, launchpad, core and rocket IDs resolved.
+                      Returns None if a request fails.
     """
-    print(f"Fetching data from {api_url}...")
     try:
-        response = requests.get(api_url)
-        response.raise_for_status()  # Raise an exception for bad status codes (4xx or 5xx)
-        print("Data fetched successfully.")
-        # pd.json_normalize flattens the nested JSON structure
-        return pd.json_normalize(response.json())
+        tables = collect_spacex_data(base_url=base_url, fetch=fetch, max_age=max_age)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data: {e}")
         return None
 
-def save_data_as_json(dataframe, path, filename):
+    owns_store = store is None
+    store = store or ReferenceStore()
+    try:
+        store.load_tables(tables)
+    finally:
+        if owns_store:
+            store.close()
+    return tables['launches']
+
+def fetch_launches_since(flight_number=None, date_utc=None, query_url=LAUNCHES_QUERY_URL, page_size=100,
+                         pending_ids=None, max_age=0):
     """
-    Saves a pandas DataFrame to a specified path as a JSON file.
+    Fetches only the launches newer than a watermark, page by page, from the
+    paginated /v4/launches/query endpoint.
+
+    A launch counts as new if its flight_number or its date_utc is greater than
+    the stored watermark, so re-numbered or re-dated launches are picked up too.
+    The `pending_ids` launches (upcoming, or flown without an outcome yet) are
+    always fetched again, wherever they sit relative to the watermark.
 
     Args:
-        dataframe (pd.DataFrame): The DataFrame to save.
-        path (str): The directory path to save the file in.
-        filename (str): The name of the file.
-    """
-    if dataframe is not None:
-        if not os.path.exists(path):
-            os.makedirs(path)
-        filepath = os.path.join(path, filename)
-        dataframe.to_json(filepath, orient='records', indent=4)
-        print(f"Data saved to {filepath}")
+        flight_number (int): Highest flight number already stored. None fetches everything.
+        date_utc (str): Newest ISO-8601 launch date already stored.
+        query_url (str): The URL of the launches query endpoint.
+        page_size (int): Number of launches requested per page.
+        pending_ids (list): IDs of stored launches whose outcome is not known yet.
+        max_age (float): Seconds a cached page is served without revalidation.
+
+    Returns:
+        list: The raw launch documents, oldest first. Returns None if a request fails.
+    """
+    conditions = []
+    if flight_number is not None:
+        conditions.append({'flight_number': {'$gt': int(flight_number)}})
+    if date_utc is not None:
+        conditions.append({'date_utc': {'$gt': date_utc}})
+    if conditions and pending_ids:
+        conditions.append({'id': {'$in': list(pending_ids)}})
+    query = {'$or': conditions} if conditions else {}
+
+    docs = []
+    page = 1
+    print(f"Fetching launches newer than flight {flight_number} / {date_utc} from {query_url}...")
+    try:
+        while page is not None:
+            body = {
+                'query': query,
+                'options': {
+                    'page': page,
+                    'limit': page_size,
+                    'sort': {'flight_number': 'asc'},
+                    'pagination': True
+                }
+            }
+            result = request_json(query_url, method='POST', json_body=body, max_age=max_age)
+            docs.extend(result.get('docs', []))
+            page = result.get('nextPage') if result.get('hasNextPage') else None
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching data: {e}")
+        return None
+
+    print(f"Fetched {len(docs)} new launches.")
+    return docs
+
+def get_sync_watermark(dataframe):
+    """
+    Returns the newest flown flight number and launch date stored in a raw
+    launch DataFrame, and the IDs of the launches still to be settled.
+
+    Upcoming launches are left out of the watermark: a scheduled launch would
+    otherwise move it to a future date, and launches that fly or are re-dated
+    before then would never be fetched again. They, and flown launches without
+    a 'success' outcome yet, are listed in 'pending_ids' and re-queried on
+    every sync instead.
+
+    Args:
+        dataframe (pd.DataFrame): Raw launch data with 'flight_number' and 'date_utc'
+                                  columns, and optionally 'id', 'upcoming' and 'success'.
+
+    Returns:
+        dict: {'flight_number': int or None, 'date_utc': str or None, 'pending_ids': list}
+    """
+    if dataframe is None or dataframe.empty:
+        return {'flight_number': None, 'date_utc': None, 'pending_ids': []}
+    no_flag = pd.Series(False, index=dataframe.index)
+    upcoming = dataframe['upcoming'].fillna(False).astype(bool) if 'upcoming' in dataframe else no_flag
+    unsettled = dataframe['success'].isna() if 'success' in dataframe else no_flag
+    pending_ids = sorted(dataframe.loc[upcoming | unsettled, 'id'].astype(str)) if 'id' in dataframe else []
+    flown = dataframe[~upcoming]
+    flight_number = flown['flight_number'].max() if 'flight_number' in flown else None
+    date_utc = flown['date_utc'].astype(str).max() if 'date_utc' in flown and not flown.empty else None
+    return {
+        'flight_number': int(flight_number) if pd.notna(flight_number) else None,
+        'date_utc': date_utc,
+        'pending_ids': pending_ids
+    }
+
+def merge_launch_records(existing, new):
+    """
+    Merges newly fetched launches into the existing raw launch DataFrame.
+
+    Rows are de-duplicated on the launch 'id', keeping the newer copy, and the
+    result is sorted by flight number.
+
+    Args:
+        existing (pd.DataFrame): The launches already stored (may be None).
+        new (pd.DataFrame): The newly fetched launches.
+
+    Returns:
+        pd.DataFrame: The merged launch data.
+    """
+    if existing is None or existing.empty:
+        merged = new
+    elif new is None or new.empty:
+        merged = existing
     else:
-        print("No data to save.")
+        merged = pd.concat([existing, new], ignore_index=True)
+    key = 'id' if 'id' in merged.columns else 'flight_number'
+    merged = merged.drop_duplicates(subset=key, keep='last')
+    return merged.sort_values('flight_number', kind='stable').reset_index(drop=True)
+
+def _state_path(dataset_path):
+    # Prefixed with '_' so pyarrow ignores it when reading the dataset
+    return os.path.join(dataset_path, '_sync.json')
+
+def load_sync_state(dataset_path):
+    """
+    Loads the sync watermark stored in the raw launch dataset.
+
+    Falls back to computing it from the dataset itself if the state file is missing.
+
+    Args:
+        dataset_path (str): The raw launch Parquet dataset directory.
+
+    Returns:
+        dict: {'flight_number': int or None, 'date_utc': str or None, 'pending_ids': list}
+    """
+    state_file = _state_path(dataset_path)
+    if os.path.exists(state_file):
+        with open(state_file, 'r') as f:
+            return dict({'pending_ids': []}, **json.load(f))
+    if os.path.exists(dataset_path):
+        return get_sync_watermark(load_parquet(dataset_path))
+    return get_sync_watermark(None)
+
+def save_sync_state(state, dataset_path):
+    """Writes the sync watermark into the raw launch dataset directory."""
+    if not os.path.exists(dataset_path):
+        os.makedirs(dataset_path)
+    with open(_state_path(dataset_path), 'w') as f:
+        json.dump(state, f)
+
+def sync_spacex_launch_data(dataset_path, query_url=LAUNCHES_QUERY_URL, page_size=100, max_age=0):
+    """
+    Incrementally syncs the raw launch store with the SpaceX API.
+
+    Only launches newer than the stored watermark, and the stored launches
+    still pending an outcome, are downloaded and normalized, and only the
+    launch-year partitions they fall in (or used to fall in) are read back and
+    rewritten. When there is nothing new, the store is left untouched.
+
+    Args:
+        dataset_path (str): The raw launch Parquet dataset directory.
+        query_url (str): The URL of the launches query endpoint.
+        page_size (int): Number of launches requested per page.
+        max_age (float): Seconds a cached page is served without revalidation.
+
+    Returns:
+        pd.DataFrame: The newly fetched launches (empty if there were none),
+                      or None if the request fails.
+    """
+    state = load_sync_state(dataset_path)
+    docs = fetch_launches_since(state['flight_number'], state['date_utc'], query_url, page_size,
+                                state['pending_ids'], max_age)
+    if docs is None:
+        return None
+    new_launches = pd.json_normalize(docs)
+    if new_launches.empty:
+        print("Raw launch store is already up to date.")
+        return new_launches
+
+    existing = None
+    old_years = set()
+    if os.path.exists(dataset_path):
+        # A re-dated launch may already be stored under a different year
+        moved = load_parquet(dataset_path, columns=['id', PARTITION_COLUMN],
+                             filters=[('id', 'in', new_launches['id'].tolist())])
+        old_years = set(moved[PARTITION_COLUMN].dropna().astype(int))
+        new_years = set(pd.to_datetime(new_launches['date_utc'], utc=True).dt.year)
+        existing = load_parquet(dataset_path, years=sorted(old_years | new_years))
+    merged = merge_launch_records(existing, new_launches)
+    save_parquet(merged, dataset_path, date_column='date_utc',
+                 schema=ARTIFACT_SCHEMAS['raw_api_data'], partitions_only=True)
+    # Drop year partitions that the re-dated launches left empty
+    remaining_years = set(pd.to_datetime(merged['date_utc'], utc=True).dt.year)
+    for year in old_years - remaining_years:
+        shutil.rmtree(os.path.join(dataset_path, f"{PARTITION_COLUMN}={year}"), ignore_errors=True)
+    new_mark = get_sync_watermark(new_launches)
+    # Every pending launch was fetched again, so the new batch alone says which still are
+    save_sync_state(dict({key: max((v for v in (state[key], new_mark[key]) if v is not None), default=None)
+                          for key in ['flight_number', 'date_utc']}, pending_ids=new_mark['pending_ids']),
+                    dataset_path)
+    return new_launches
+
+def sync_with_reference_data(dataset_path, store=None, query_url=LAUNCHES_QUERY_URL, page_size=100, max_age=0):
+    """
+    Syncs the new launches and refreshes the stale reference collections concurrently.
+
+    The launch pages are fetched in a background thread while the store
+    downloads its stale payload, launchpad and core collections, so the run
+    takes as long as the slower of the two.
+
+    Args:
+        dataset_path (str): The raw launch Parquet dataset directory.
+        store (ReferenceStore): Store to refresh. Defaults to the project's store.
+        query_url (str): The URL of the launches query endpoint.
+        page_size (int): Number of launches requested per page.
+        max_age (float): Seconds a cached response is served without revalidation.
+
+    Returns:
+        pd.DataFrame: The newly fetched launches, as for sync_spacex_launch_data.
+    """
+    owns_store = store is None
+    store = store or ReferenceStore()
+    try:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            launches = pool.submit(sync_spacex_launch_data, dataset_path, query_url, page_size, max_age)
+            store.refresh(max_age=max_age)
+            return launches.result()
+    finally:
+        if owns_store:
+            store.close()
 
 if __name__ == '__main__':
     # This block runs when the script is executed directly from the command line
-    DATA_PATH = 'data/raw'
-    FILENAME = 'spacex_api_data.json'
-    
-    launch_data = fetch_spacex_launch_data()
-    save_data_as_json(launch_data, DATA_PATH, FILENAME)
\ No newline at end of file
+    DATASET_PATH = artifact_path('raw_api_data')
+
+    parser = argparse.ArgumentParser(description="Fetch SpaceX launch data.")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-download the full launch history instead of syncing new launches.")
+    args = parser.parse_args()
+    max_age = load_config()['http']['max_age']
+
+    if args.full:
+        launch_data = fetch_spacex_launch_data(max_age=max_age)
+        save_artifact(launch_data, 'raw_api_data')
+        if launch_data is not None:
+            save_sync_state(get_sync_watermark(launch_data), DATASET_PATH)
+    else:
+        sync_with_reference_data(DATASET_PATH, max_age=max_age)
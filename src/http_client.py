@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import warnings
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_CACHE_DIR = os.environ.get('SPACEX_HTTP_CACHE_DIR', 'data/cache/http')
+DEFAULT_TIMEOUT = 30  # seconds
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Sessions are not safe to share between threads, so each thread gets its own
+_local = threading.local()
+# Parsed payloads already loaded in this process, keyed by (cache_dir, cache key)
+_memory_cache = {}
+_memory_cache_lock = threading.Lock()
+
+def get_session(retries=3, backoff_factor=0.5):
+    """
+    Returns the calling thread's connection-pooled requests Session.
+
+    The session retries connection errors and 429/5xx responses with
+    exponential backoff, for both GET and the POST query endpoints. Each
+    thread, e.g. each worker of the collect and scrape_wiki thread pools,
+    gets its own session, which it reuses for all its requests.
+
+    Args:
+        retries (int): Maximum number of retries per request.
+        backoff_factor (float): Backoff factor passed to urllib3's Retry.
+
+    Returns:
+        requests.Session: The thread's session.
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # The SpaceX query endpoints are read-only POSTs
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+def cache_key(url, method='GET', json_body=None, kind='json'):
+    """Returns a stable cache key for a request and the form its payload is stored in."""
+    body = json.dumps(json_body, sort_keys=True) if json_body is not None else ''
+    return hashlib.sha256(f"{kind} {method.upper()} {url} {body}".encode('utf-8')).hexdigest()
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+def _read_entry(cache_dir, key):
+    with _memory_cache_lock:
+        entry = _memory_cache.get((cache_dir, key))
+    if entry is not None:
+        return entry
+    filepath = _cache_path(cache_dir, key)
+    if not os.path.exists(filepath):
+        return None
+    try:
+        with open(filepath, 'rb') as f:
+            entry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    with _memory_cache_lock:
+        _memory_cache[(cache_dir, key)] = entry
+    return entry
+
+def _write_entry(cache_dir, key, entry):
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    filepath = _cache_path(cache_dir, key)
+    tmp_path = f"{filepath}.{threading.get_ident()}.tmp"  # Threads may write the same entry at once
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, filepath)
+    with _memory_cache_lock:
+        _memory_cache[(cache_dir, key)] = entry
+
+def request_json(url, method='GET', json_body=None, cache_dir=DEFAULT_CACHE_DIR,
+                 max_age=0, timeout=DEFAULT_TIMEOUT, session=None):
+    """
+    Performs an HTTP request and returns the decoded JSON body, using an
+    on-disk response cache.
+
+    Cached entries younger than `max_age` seconds are returned without touching
+    the network. Older entries are revalidated with If-None-Match /
+    If-Modified-Since; a 304 response returns the cached payload without
+    re-parsing it. Payloads are stored already decoded, so a hit costs only an
+    unpickle (or nothing, if it was already loaded in this process).
+
+    Args:
+        url (str): The URL to request.
+        method (str): 'GET' or 'POST'.
+        json_body (dict): Optional JSON body, sent for POST requests.
+        cache_dir (str): Directory for cached responses. None disables caching.
+        max_age (float): Seconds a cached response is served without revalidation.
+        timeout (float): Request timeout in seconds.
+        session (requests.Session): Session to use; defaults to the thread's session.
+
+    Returns:
+        The decoded JSON payload.
+
+    Raises:
+        requests.exceptions.RequestException: If the request fails and there is
+            no cached copy to fall back on.
+    """
+    return _cached_request(url, method, json_body, cache_dir, max_age, timeout, session,
+                           decode=lambda response: response.json(), kind='json')
+
+def request_content(url, method='GET', json_body=None, cache_dir=DEFAULT_CACHE_DIR,
+                    max_age=0, timeout=DEFAULT_TIMEOUT, session=None):
+    """
+    Performs an HTTP request and returns the raw response body as bytes, with
+    the same caching and revalidation as request_json. Used for HTML pages.
+
+    Returns:
+        bytes: The response body.
+    """
+    return _cached_request(url, method, json_body, cache_dir, max_age, timeout, session,
+                           decode=lambda response: response.content, kind='content')
+
+def _cached_request(url, method, json_body, cache_dir, max_age, timeout, session, decode, kind):
+    session = session or get_session()
+    key = cache_key(url, method, json_body, kind)
+    entry = _read_entry(cache_dir, key) if cache_dir else None
+
+    if entry is not None and time.time() - entry['fetched_at'] < max_age:
+        return entry['payload']
+
+    headers = {}
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    try:
+        response = session.request(method, url, json=json_body, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry is not None:
+            entry = dict(entry, fetched_at=time.time())
+            _write_entry(cache_dir, key, entry)
+            return entry['payload']
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        if entry is None:
+            raise
+        warnings.warn(f"Request to {url} failed ({e}); serving stale cached copy.")
+        return entry['payload']
+
+    payload = decode(response)
+    if cache_dir:
+        _write_entry(cache_dir, key, {
+            'payload': payload,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time()
+        })
+    return payload
+
+def clear_memory_cache():
+    """Drops the in-process copy of cached payloads (the on-disk cache is kept)."""
+    with _memory_cache_lock:
+        _memory_cache.clear()
@@ -0,0 +1,232 @@
+import re
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+from src.scrape_wiki import normalize_launch_columns
+
+# Linkage passes, tried in order on the records still unmatched. Each pass is a
+# hash join on its key columns; only records sharing a block (equal keys) are
+# ever compared, so the work grows with the data rather than with all pairs.
+#   day_shifts:    API dates are also tried this many days off, for launches
+#                  logged either side of midnight
+#   accept_single: a block with exactly one record on each side matches without scoring
+#   min_score:     otherwise the name similarity a pair needs to be matched
+LINK_PASSES = (
+    {'name': 'date_booster', 'keys': ['date', 'serial'], 'day_shifts': (0,), 'accept_single': True, 'min_score': 0.0},
+    {'name': 'date', 'keys': ['date'], 'day_shifts': (0,), 'accept_single': True, 'min_score': 0.3},
+    {'name': 'adjacent_date', 'keys': ['date'], 'day_shifts': (-1, 1), 'accept_single': False, 'min_score': 0.5},
+)
+MAX_BLOCK_PAIRS = 100  # Blocks with more candidate pairs than this are left unmatched
+
+# Wikipedia orbit descriptions -> the API's orbit codes
+WIKI_ORBITS = {
+    'leo': 'LEO', 'leo (iss)': 'ISS', 'iss': 'ISS', 'vleo': 'VLEO', 'polar leo': 'PO', 'polar': 'PO',
+    'polar orbit': 'PO', 'sso': 'SSO', 'sun-synchronous': 'SSO', 'gto': 'GTO', 'geo': 'GEO', 'meo': 'MEO',
+    'heo': 'HEO', 'heliocentric': 'HCO', 'sun–earth l1': 'ES-L1', 'sun-earth l1': 'ES-L1', 'tli': 'TLI',
+    'suborbital': 'SO', 'bleo': 'BLEO'
+}
+
+def _name_key(values):
+    """Lower-cases names and reduces them to space-separated alphanumeric tokens."""
+    return values.astype(object).where(values.notna(), '').map(
+        lambda v: ' '.join(re.findall(r'[a-z0-9]+', str(v).lower())))
+
+def _serial_key(values):
+    """Extracts a booster serial such as 'B1049' (dropping the '.4' flight suffix)."""
+    return values.astype('string').str.extract(r'(B\d{4})', expand=False).astype(object)
+
+def _flight_key(values):
+    return pd.to_numeric(values.astype('string').str.extract(r'(\d+)', expand=False), errors='coerce')
+
+def _utc_day(dates):
+    dates = pd.to_datetime(dates, errors='coerce', utc=True)
+    return dates.dt.tz_convert(None).dt.normalize()
+
+def normalize_api_keys(api):
+    """
+    Builds the linkage keys of the cleaned API launches.
+
+    Args:
+        api (pd.DataFrame): Launches with 'flight_number', 'Date' and
+            'BoosterVersion' (the mission name), and optionally 'core_serial'.
+
+    Returns:
+        pd.DataFrame: 'date', 'serial', 'name' and 'flight' keys, aligned with `api`.
+    """
+    serial = api['core_serial'] if 'core_serial' in api else pd.Series(None, index=api.index, dtype=object)
+    return pd.DataFrame({
+        'date': _utc_day(api['Date']),
+        'serial': _serial_key(serial),
+        'name': _name_key(api['BoosterVersion']),
+        'flight': pd.to_numeric(api['flight_number'], errors='coerce')
+    }, index=api.index)
+
+def normalize_wiki_keys(wiki):
+    """
+    Builds the linkage keys of the scraped Wikipedia launch rows.
+
+    Args:
+        wiki (pd.DataFrame): Launch rows in the canonical schema (see
+            scrape_wiki.normalize_launch_columns).
+
+    Returns:
+        pd.DataFrame: 'date', 'serial', 'name' and 'flight' keys, aligned with `wiki`.
+    """
+    text = wiki['Date and time (UTC)'].astype('string')
+    day = text.str.extract(r'(\d{1,2} [A-Za-z]+ \d{4})', expand=False)
+    return pd.DataFrame({
+        'date': pd.to_datetime(day, format='%d %B %Y', errors='coerce'),
+        'serial': _serial_key(wiki['Version, Booster']),
+        'name': _name_key(wiki['Payload']),
+        'flight': _flight_key(wiki['Flight No.'])
+    }, index=wiki.index)
+
+def _shift_days(keys, shifts):
+    if shifts == (0,):
+        return keys
+    return pd.concat([keys.assign(date=keys['date'] + pd.Timedelta(days=s)) for s in shifts])
+
+def _candidate_pairs(api_keys, wiki_keys, keys, max_block_pairs):
+    """Hash-joins the two sides on `keys`, skipping blocks with too many pairs to compare."""
+    left = api_keys.dropna(subset=keys).rename_axis('api_row').reset_index()
+    right = wiki_keys.dropna(subset=keys).rename_axis('wiki_row').reset_index()
+    if left.empty or right.empty:
+        return pd.DataFrame(columns=['api_row', 'wiki_row', 'block_pairs', 'name_x', 'name_y', 'flight_x', 'flight_y']), 0
+
+    block_pairs = left.groupby(keys).size().mul(right.groupby(keys).size(), fill_value=0).rename('block_pairs')
+    block_pairs = block_pairs[block_pairs > 0]
+    oversized = int((block_pairs > max_block_pairs).sum())
+    block_pairs = block_pairs[block_pairs <= max_block_pairs].reset_index()
+    left = left.merge(block_pairs, on=keys)
+    pairs = left.merge(right, on=keys)
+    return pairs, oversized
+
+def _name_similarity(a, b):
+    return SequenceMatcher(None, a, b).ratio() if a and b else 0.0
+
+def _select_one_to_one(pairs):
+    """Greedily keeps the best-scoring pairs so each record is matched at most once."""
+    pairs = pairs.sort_values(['score', 'flight_gap'], ascending=[False, True], kind='stable')
+    used_api, used_wiki, keep = set(), set(), []
+    for position, api_row, wiki_row in zip(range(len(pairs)), pairs['api_row'], pairs['wiki_row']):
+        if api_row in used_api or wiki_row in used_wiki:
+            continue
+        used_api.add(api_row)
+        used_wiki.add(wiki_row)
+        keep.append(position)
+    return pairs.iloc[keep]
+
+def link_launches(api, wiki, passes=LINK_PASSES, max_block_pairs=MAX_BLOCK_PAIRS):
+    """
+    Links cleaned API launches to scraped Wikipedia launch rows.
+
+    Both sides are reduced to normalized date, booster serial, mission name
+    and flight number keys. Each pass hash-joins the still unmatched records on
+    its keys and compares names only inside the resulting blocks, so the cost
+    is near-linear in the number of launches.
+
+    Args:
+        api (pd.DataFrame): Cleaned API launches (see normalize_api_keys).
+        wiki (pd.DataFrame): Scraped Wikipedia rows, in any header spelling.
+        passes (tuple): Linkage passes; defaults to LINK_PASSES.
+        max_block_pairs (int): Largest block that is compared.
+
+    Returns:
+        tuple: (matches, report). matches is a DataFrame with 'api_row' and
+               'wiki_row' index labels, the 'pass' that matched them and the
+               name 'score'. report summarizes the match coverage.
+    """
+    api_keys = normalize_api_keys(api)
+    wiki_keys = normalize_wiki_keys(normalize_launch_columns(wiki))
+    matched = []
+    report = {'api_rows': len(api), 'wiki_rows': len(wiki), 'by_pass': {}, 'oversized_blocks': 0}
+
+    for link_pass in passes:
+        open_api = api_keys.drop(index=[m for part in matched for m in part['api_row']])
+        open_wiki = wiki_keys.drop(index=[m for part in matched for m in part['wiki_row']])
+        pairs, oversized = _candidate_pairs(_shift_days(open_api, link_pass['day_shifts']), open_wiki,
+                                            link_pass['keys'], max_block_pairs)
+        report['oversized_blocks'] += oversized
+        if pairs.empty:
+            report['by_pass'][link_pass['name']] = 0
+            continue
+
+        pairs['score'] = [_name_similarity(a, b) for a, b in zip(pairs['name_x'], pairs['name_y'])]
+        pairs['flight_gap'] = (pairs['flight_x'] - pairs['flight_y']).abs()
+        single = pairs['block_pairs'].eq(1) & link_pass['accept_single']
+        pairs = pairs[single | (pairs['score'] >= link_pass['min_score'])]
+        # A shifted API record can land in two blocks; it is still matched only once
+        found = _select_one_to_one(pairs)[['api_row', 'wiki_row', 'score']].assign(**{'pass': link_pass['name']})
+        report['by_pass'][link_pass['name']] = len(found)
+        matched.append(found)
+
+    matches = (pd.concat(matched, ignore_index=True) if matched
+               else pd.DataFrame(columns=['api_row', 'wiki_row', 'score', 'pass']))
+    matches = matches[['api_row', 'wiki_row', 'pass', 'score']]
+    report['matched'] = len(matches)
+    report['api_coverage'] = len(matches) / len(api) if len(api) else 0.0
+    report['wiki_coverage'] = len(matches) / len(wiki) if len(wiki) else 0.0
+    return matches, report
+
+def parse_wiki_fields(wiki):
+    """
+    Parses the Wikipedia payload mass, orbit and landing columns into API form.
+
+    Returns:
+        pd.DataFrame: 'PayloadMass' (kg, float), 'Orbit' (API orbit code) and
+                      'Outcome' (True/False, or None when no landing was attempted).
+    """
+    wiki = normalize_launch_columns(wiki)
+    mass = wiki['Payload mass'].astype('string').str.extract(r'(\d[\d,]*(?:\.\d+)?)\s*kg', expand=False)
+    orbit = wiki['Orbit'].astype('string').str.strip().str.lower().map(WIKI_ORBITS, na_action='ignore')
+    landing = wiki['Booster landing'].astype('string').str.strip().str.lower()
+    outcome = np.select([landing.str.startswith('success').fillna(False), landing.str.startswith('failure').fillna(False)],
+                        [True, False], default=None)
+    return pd.DataFrame({
+        'PayloadMass': pd.to_numeric(mass.str.replace(',', ''), errors='coerce'),
+        'Orbit': orbit.astype(object),
+        'Outcome': outcome
+    }, index=wiki.index)
+
+def fill_from_wiki(api, wiki, verbose=True):
+    """
+    Fills missing PayloadMass, Orbit and Outcome values of the API launches
+    from their linked Wikipedia rows.
+
+    Only values missing on the API side are filled; values present in the API
+    are never overwritten. Run this before missing values are imputed.
+
+    Args:
+        api (pd.DataFrame): Cleaned API launches, before imputation.
+        wiki (pd.DataFrame): Scraped Wikipedia rows.
+        verbose (bool): Print the coverage report.
+
+    Returns:
+        tuple: (filled launches, report). The report from link_launches also
+               counts the values filled per column under 'filled'.
+    """
+    matches, report = link_launches(api, wiki)
+    filled = api.copy()
+    report['filled'] = {}
+    wiki_values = parse_wiki_fields(wiki).loc[matches['wiki_row']]
+    wiki_values.index = pd.Index(matches['api_row'])
+    for column in ('PayloadMass', 'Orbit', 'Outcome'):
+        candidates = wiki_values[column].reindex(filled.index)
+        gaps = filled[column].isna() & candidates.notna()
+        report['filled'][column] = int(gaps.sum())
+        if gaps.any():
+            filled[column] = filled[column].astype(object).where(~gaps, candidates).infer_objects()
+    if verbose:
+        print_link_report(report)
+    return filled, report
+
+def print_link_report(report):
+    """Prints the match coverage of a linkage run."""
+    print(f"Linked {report['matched']} of {report['api_rows']} API launches ({report['api_coverage']:.1%}) "
+          f"to {report['wiki_rows']} Wikipedia rows ({report['wiki_coverage']:.1%}).")
+    for name, count in report['by_pass'].items():
+        print(f"  {name:<14} {count}")
+    if report['oversized_blocks']:
+        print(f"  {report['oversized_blocks']} blocks were too large to compare.")
+    if 'filled' in report:
+        print("  Filled from Wikipedia: " + ', '.join(f"{c} {n}" for c, n in report['filled'].items()))
@@ -0,0 +1,214 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from src.utils import artifact_path, load_config
+
+DEFAULT_STATE_FILE = 'data/cache/pipeline/state.json'
+
+def _project_path(module):
+    return os.path.join(*module.split('.')) + '.py'
+
+def module_sources(module):
+    """
+    Returns the source files a stage depends on: its module and every `src`
+    module it imports, directly or through other `src` modules.
+
+    Args:
+        module (str): A dotted module name, e.g. 'src.wrangle'.
+
+    Returns:
+        list: Sorted source file paths.
+    """
+    seen, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        path = _project_path(name)
+        if name in seen or not os.path.exists(path):
+            continue
+        seen.add(name)
+        with open(path, 'r') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module and node.module.startswith('src.'):
+                pending.append(node.module)
+            elif isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names if alias.name.startswith('src.'))
+    return sorted(_project_path(name) for name in seen)
+
+def _walk_files(path):
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names))
+    return files
+
+def hash_path(path, memo):
+    """
+    Returns the SHA-256 of a file's or directory's contents, or None if it is missing.
+
+    File hashes are memoized by size and modification time, so unchanged
+    files are not re-read on later runs.
+
+    Args:
+        path (str): A file, or a directory such as a Parquet dataset.
+        memo (dict): path -> [size, mtime_ns, sha256], updated in place.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    for file_path in _walk_files(path):
+        stat = os.stat(file_path)
+        cached = memo.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            file_hash = cached[2]
+        else:
+            file_digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    file_digest.update(block)
+            file_hash = file_digest.hexdigest()
+            memo[file_path] = [stat.st_size, stat.st_mtime_ns, file_hash]
+        digest.update(f"{os.path.relpath(file_path, path)}\0{file_hash}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+def _output_paths(stage, config):
+    paths = {name: artifact_path(name, config) for name in stage.get('outputs', [])}
+    paths.update((path, path) for path in stage.get('output_files', []))
+    return paths
+
+def stage_fingerprint(stage, config, memo):
+    """
+    Fingerprints everything a stage's output depends on.
+
+    Args:
+        stage (dict): The stage's entry under pipeline.stages in config.yaml.
+        config (dict): The loaded config.
+        memo (dict): File hash memo (see hash_path).
+
+    Returns:
+        str: A SHA-256 hex digest of the stage's source files, its config
+             sections, its arguments and the contents of its input artifacts
+             and other input files.
+    """
+    parts = {
+        'stage': stage,
+        'sources': {path: hash_path(path, memo) for path in module_sources(stage['module'])},
+        'config': {section: config.get(section) for section in stage.get('config', [])},
+        'inputs': {name: hash_path(artifact_path(name, config), memo) for name in stage.get('inputs', [])},
+        'files': {path: hash_path(path, memo) for path in stage.get('files', [])}
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def load_state(path=DEFAULT_STATE_FILE):
+    """Loads the pipeline cache state, or an empty state if there is none."""
+    if not os.path.exists(path):
+        return {'stages': {}, 'file_hashes': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_state(state, path=DEFAULT_STATE_FILE):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    # Forget hashes of files that no longer exist, e.g. replaced Parquet parts
+    for stale in [p for p in state['file_hashes'] if not os.path.exists(p)]:
+        del state['file_hashes'][stale]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def _miss_reason(stage, record, fingerprint, outputs, memo):
+    """Returns why a stage has to run, or None if its stored outputs can be reused."""
+    if record is None:
+        return "never run"
+    if record['fingerprint'] != fingerprint:
+        return "inputs changed"
+    for name, path in outputs.items():
+        if hash_path(path, memo) != record['outputs'].get(name):
+            return f"output {name} missing or modified"
+    max_age = stage.get('max_age')
+    if max_age is not None and time.time() - record['finished_at'] >= max_age:
+        return f"older than {max_age} s"
+    return None
+
+def run_module(module, args=()):
+    """Runs a pipeline module's command-line entry point in a subprocess."""
+    subprocess.run([sys.executable, '-m', module, *args], check=True)
+
+def run_pipeline(stage_names=None, force=False, config=None, runner=run_module):
+    """
+    Runs pipeline stages in order, skipping those whose inputs have not changed.
+
+    A stage is a cache hit when its fingerprint (source, config sections,
+    arguments, input artifact and input file contents) matches the last successful run and
+    its outputs still hold the contents that run wrote. Stages with a
+    `max_age`, such as those reading from the network, also re-run once
+    their outputs are older than that.
+
+    Args:
+        stage_names (list): Stages to run. Defaults to every stage, in config order.
+        force (bool): Run the stages even if they are cache hits.
+        config (dict): The loaded config. Defaults to config/config.yaml.
+        runner (callable): Called as runner(module, args) to run a stage.
+
+    Returns:
+        dict: Stage name -> 'hit' or 'miss'.
+    """
+    config = config or load_config()
+    pipeline = config['pipeline']
+    stages = pipeline['stages']
+    stage_names = list(stage_names or stages)
+    unknown = [name for name in stage_names if name not in stages]
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {', '.join(unknown)}")
+
+    state_file = pipeline.get('state_file', DEFAULT_STATE_FILE)
+    state = load_state(state_file)
+    memo = state['file_hashes']
+    results = {}
+    for name in stage_names:
+        stage = stages[name]
+        start = time.perf_counter()
+        fingerprint = stage_fingerprint(stage, config, memo)
+        outputs = _output_paths(stage, config)
+        reason = "forced" if force else _miss_reason(stage, state['stages'].get(name), fingerprint, outputs, memo)
+        if reason is None:
+            results[name] = 'hit'
+            print(f"[{name}] cache hit ({time.perf_counter() - start:.2f} s)")
+            continue
+
+        print(f"[{name}] cache miss: {reason}; running {stage['module']}")
+        runner(stage['module'], stage.get('args', []))
+        state['stages'][name] = {
+            'fingerprint': fingerprint,
+            'outputs': {output: hash_path(path, memo) for output, path in outputs.items()},
+            'finished_at': time.time()
+        }
+        save_state(state, state_file)
+        results[name] = 'miss'
+        print(f"[{name}] done ({time.perf_counter() - start:.2f} s)")
+
+    save_state(state, state_file)
+    hits = sum(result == 'hit' for result in results.values())
+    print(f"Pipeline finished: {hits} cache hits, {len(results) - hits} misses.")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the pipeline stages, reusing outputs whose inputs have not changed.")
+    parser.add_argument('stages', nargs='*', help="Stages to run (default: all, in config order).")
+    parser.add_argument('--force', action='store_true', help="Re-run the stages even if they are cache hits.")
+    args = parser.parse_args()
+
+    try:
+        run_pipeline(args.stages, force=args.force)
+    except subprocess.CalledProcessError as e:
+        print(f"Pipeline stopped: {' '.join(e.cmd[1:])} exited with status {e.returncode}.")
+        sys.exit(e.returncode)
@@ -0,0 +1,232 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.compiled import load_compiled
+from src.features import (HISTORY_FEATURES, HISTORY_INPUTS, history_state_path, load_history_state,
+                          lookup_history_features)
+from src.registry import registry_from_config
+from src.storage import ARTIFACT_SCHEMAS, apply_schema
+from src.utils import load_config
+
+DEFAULT_CHUNK_SIZE = 100_000  # Rows scored at a time; bounds memory whatever the file size
+ID_COLUMNS = ['flight_number', 'BoosterVersion', 'Date']  # Copied to the output when present
+
+def load_scoring_model(model_path, mmap=True):
+    """
+    Loads a model to score with: a compiled .npz model (see src.compiled), or
+    a saved pipeline, memory-mapped when `mmap` is set and the file is uncompressed.
+    """
+    if model_path.endswith('.npz'):
+        return load_compiled(model_path)
+    return joblib.load(model_path, mmap_mode='r' if mmap else None)
+
+def feature_columns(model):
+    """Returns the input columns a fitted pipeline (or estimator) was trained on."""
+    return [str(c) for c in model.feature_names_in_]
+
+def input_columns(columns):
+    """Returns the columns to read for a model's feature `columns`: history features are looked up from their inputs."""
+    if not set(HISTORY_FEATURES) & set(columns):
+        return list(columns)
+    inputs = [c for c in columns if c not in HISTORY_FEATURES]
+    return inputs + [c for c in HISTORY_INPUTS if c not in inputs]
+
+def iter_input_chunks(path, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads a CSV or Parquet file of launches in chunks, casting them to the wrangled data dtypes.
+
+    Args:
+        path (str): A .csv file, or a Parquet file or dataset directory.
+        columns (list): Columns to read; the others are never parsed. Defaults to all.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk, indexed by row position in the file.
+    """
+    schema = ARTIFACT_SCHEMAS['wrangled_data']
+    start = 0
+    if path.endswith('.csv'):
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in header if columns is None or c in columns]
+        chunks = pd.read_csv(path, usecols=usecols, chunksize=chunk_size)
+    else:
+        dataset = pq.ParquetDataset(path) if os.path.isdir(path) else pq.ParquetFile(path)
+        names = dataset.schema.names
+        read = [c for c in names if columns is None or c in columns]
+        if os.path.isdir(path):
+            batches = (batch for fragment in dataset.fragments
+                       for batch in fragment.to_batches(columns=read, batch_size=chunk_size))
+        else:
+            batches = dataset.iter_batches(batch_size=chunk_size, columns=read)
+        chunks = (batch.to_pandas() for batch in batches)
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield apply_schema(chunk, schema)
+
+def score_chunk(model, chunk, columns, history_state=None):
+    """
+    Scores one chunk of launches.
+
+    History features the chunk does not hold are looked up in `history_state`
+    (see features.lookup_history_features).
+
+    Returns:
+        pd.DataFrame: The chunk's ID columns plus 'probability' (of a successful
+                      landing, NaN for models without predict_proba) and 'prediction'.
+    """
+    missing = [c for c in columns if c not in chunk]
+    if missing and history_state is not None and set(missing) <= set(HISTORY_FEATURES):
+        history = lookup_history_features(chunk.reindex(columns=HISTORY_INPUTS), history_state)
+        chunk = chunk.assign(**{c: history[c] for c in missing})
+        missing = []
+    if missing:
+        raise ValueError(f"Input is missing feature columns: {', '.join(missing)}")
+    X = chunk[columns]
+    result = chunk[[c for c in ID_COLUMNS if c in chunk]].copy()
+    if hasattr(model, 'predict_proba'):
+        proba = model.predict_proba(X)
+        # Same class as predict for the tree and linear models, without a second pass
+        result['probability'] = proba[:, list(model.classes_).index(1)] if 1 in model.classes_ else 0.0
+        result['prediction'] = model.classes_[proba.argmax(axis=1)]
+    else:
+        result['probability'] = np.nan
+        result['prediction'] = model.predict(X)
+    result['prediction'] = result['prediction'].astype('int8')
+    return result
+
+class _OutputWriter:
+    """Appends scored chunks to a CSV or Parquet file, written next to `path` and moved into place."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.parquet = not path.endswith('.csv')
+        self.writer = None
+        self.rows = 0
+
+    def write(self, frame):
+        if self.parquet:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.tmp_path, table.schema)
+            self.writer.write_table(table)
+        else:
+            frame.to_csv(self.tmp_path, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        self.rows += len(frame)
+
+    def close(self, ok=True):
+        if self.writer is not None:
+            self.writer.close()
+        if ok and self.rows:
+            os.replace(self.tmp_path, self.path)
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+# The model held by each worker process, loaded once when the process starts
+_worker_model = {}
+
+def _init_worker(model_path, mmap, history_state):
+    model = load_scoring_model(model_path, mmap)
+    _worker_model.update(model=model, columns=feature_columns(model), history_state=history_state)
+
+def _score_in_worker(chunk):
+    return score_chunk(_worker_model['model'], chunk, _worker_model['columns'], _worker_model['history_state'])
+
+def predict_file(model_path, input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=1, mmap=True,
+                 history_state=None):
+    """
+    Scores a file of launches in chunks and writes the probabilities and predicted class.
+
+    Only the model's feature columns and the ID columns are read, one chunk at
+    a time, so memory stays flat however large the input is. With several
+    workers, chunks are scored in a process pool; each worker loads the model
+    once, memory-mapped when the model file is uncompressed (as registry
+    bundles are), so the workers share its arrays. At most two chunks per
+    worker are in flight, and the output keeps the input order.
+
+    Args:
+        model_path (str): A saved pipeline (see train.build_pipeline), or a compiled .npz model.
+        input_path (str): A .csv file, or a Parquet file or dataset directory.
+        output_path (str): A .csv or .parquet file to write.
+        chunk_size (int): Rows scored at a time.
+        workers (int): Worker processes; 1 scores in this process.
+        mmap (bool): Memory-map the model's arrays.
+        history_state (dict): Running history state to look up the history
+                              features of a model trained with them. Defaults
+                              to the stored state (see features.load_history_state).
+
+    Returns:
+        int: The number of rows scored.
+    """
+    model = load_scoring_model(model_path, mmap)
+    columns = feature_columns(model)
+    if history_state is None and set(HISTORY_FEATURES) & set(columns):
+        history_state = load_history_state()
+    chunks = iter_input_chunks(input_path, input_columns(columns) + ID_COLUMNS, chunk_size)
+    writer = _OutputWriter(output_path)
+    start = time.perf_counter()
+    ok = False
+    try:
+        if workers <= 1:
+            for chunk in chunks:
+                writer.write(score_chunk(model, chunk, columns, history_state))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path, mmap, history_state)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(_score_in_worker, chunk))
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.popleft().result())
+                while pending:
+                    writer.write(pending.popleft().result())
+        ok = True
+    finally:
+        writer.close(ok)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {writer.rows:,} rows in {elapsed:.2f} s ({writer.rows / max(elapsed, 1e-9):,.0f} rows/s); "
+          f"saved to {output_path}")
+    return writer.rows
+
+def resolve_model_path(model=None, config=None):
+    """
+    Returns the model file to score with: `model` if given, else the registry's
+    production version, else models/best_model.pkl.
+    """
+    if model:
+        return model
+    config = config or load_config()
+    registry = registry_from_config(config)
+    name = config['registry']['model_name']
+    if 'production' in registry.aliases(name):
+        return registry.model_path(name, 'production')
+    return os.path.join(config['data_paths']['models'], 'best_model.pkl')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of launches with the saved model.")
+    parser.add_argument('input', help="A .csv file, or a Parquet file or dataset directory, in the wrangled schema.")
+    parser.add_argument('output', help="The .csv or .parquet file to write.")
+    parser.add_argument('--model', default=None,
+                        help="Model file, or a compiled .npz model "
+                             "(default: the registry's production version, else models/best_model.pkl).")
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: prediction.workers).")
+    args = parser.parse_args()
+
+    config = load_config()
+    settings = config['prediction']
+    model_path = resolve_model_path(args.model, config)
+    print(f"Scoring with {model_path}")
+    predict_file(model_path, args.input, args.output, args.chunk_size or settings['chunk_size'],
+                 args.workers or settings['workers'], history_state=load_history_state(history_state_path(config)))
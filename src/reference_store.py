@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sqlite3
+import time
+import pandas as pd
+from src.collect import SPACEX_API_BASE, fetch_endpoints
+
+DEFAULT_DB_PATH = 'data/interim/reference.db'
+DEFAULT_TTL = 24 * 60 * 60  # seconds
+
+# Column name -> SQLite type for each reference collection. 'id' is always the primary key.
+COLLECTION_SCHEMAS = {
+    'payloads': {'mass_kg': 'REAL', 'orbit': 'TEXT'},
+    'launchpads': {'name': 'TEXT', 'full_name': 'TEXT', 'region': 'TEXT', 'latitude': 'REAL', 'longitude': 'REAL'},
+    'cores': {'serial': 'TEXT', 'block': 'INTEGER', 'reuse_count': 'INTEGER'}
+}
+
+class ReferenceStore:
+    """
+    A local SQLite store for the payload, launchpad and core reference data.
+
+    Each collection is a table keyed by the API 'id' (a primary-key index), so a
+    whole column of IDs can be resolved with one indexed join instead of a
+    network request per wrangling run.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        """
+        Opens (and if needed creates) the store.
+
+        Args:
+            db_path (str): Path to the SQLite database file, or ':memory:'.
+        """
+        if db_path != ':memory:':
+            directory = os.path.dirname(db_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            for collection, columns in COLLECTION_SCHEMAS.items():
+                column_defs = ', '.join(f"{name} {sql_type}" for name, sql_type in columns.items())
+                self.conn.execute(f"CREATE TABLE IF NOT EXISTS {collection} (id TEXT PRIMARY KEY, {column_defs})")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS refresh_log (collection TEXT PRIMARY KEY, refreshed_at REAL)")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def replace(self, collection, records):
+        """
+        Replaces the contents of a collection with freshly fetched records.
+
+        Args:
+            collection (str): One of COLLECTION_SCHEMAS.
+            records (list): Decoded JSON records from the API endpoint.
+        """
+        columns = ['id'] + list(COLLECTION_SCHEMAS[collection])
+        rows = [tuple(record.get(column) for column in columns) for record in records]
+        placeholders = ', '.join('?' for _ in columns)
+        with self.conn:
+            self.conn.execute(f"DELETE FROM {collection}")
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {collection} ({', '.join(columns)}) VALUES ({placeholders})", rows
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO refresh_log (collection, refreshed_at) VALUES (?, ?)",
+                (collection, time.time())
+            )
+
+    def load_tables(self, tables):
+        """
+        Replaces collections with lookup tables that were already fetched, e.g.
+        by collect.collect_spacex_data, so they are not downloaded again.
+
+        Args:
+            tables (dict): Collection name -> DataFrame indexed by 'id'. Tables
+                           that are not reference collections are skipped.
+
+        Returns:
+            list: The names of the collections replaced.
+        """
+        loaded = []
+        for collection, table in tables.items():
+            if collection not in COLLECTION_SCHEMAS:
+                continue
+            records = table.reset_index().astype(object)
+            self.replace(collection, records.where(records.notna(), None).to_dict(orient='records'))
+            loaded.append(collection)
+        return loaded
+
+    def last_refreshed(self, collection):
+        """Returns the UNIX time a collection was last refreshed, or None."""
+        row = self.conn.execute(
+            "SELECT refreshed_at FROM refresh_log WHERE collection = ?", (collection,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_stale(self, collection, ttl=DEFAULT_TTL):
+        """Returns True if a collection was never refreshed or is older than `ttl` seconds."""
+        refreshed_at = self.last_refreshed(collection)
+        return refreshed_at is None or time.time() - refreshed_at >= ttl
+
+    def refresh(self, collections=tuple(COLLECTION_SCHEMAS), ttl=DEFAULT_TTL,
+                base_url=SPACEX_API_BASE, fetch=None, max_age=0):
+        """
+        Re-downloads the collections whose data is older than `ttl`.
+
+        Stale collections are fetched concurrently. If a download fails, the
+        existing rows are kept and a warning is printed; a collection that has
+        never been loaded raises instead, so lookups never silently come back empty.
+
+        Args:
+            collections (iterable): Collection names to check.
+            ttl (float): Maximum age in seconds before a collection is refreshed.
+            base_url (str): The API base URL.
+            fetch (callable): Function taking a URL and returning decoded JSON.
+                              Defaults to the cached request_json.
+            max_age (float): Seconds a cached response is served without revalidation.
+
+        Returns:
+            list: The names of the collections that were refreshed.
+
+        Raises:
+            RuntimeError: If a collection with no stored data could not be fetched.
+        """
+        stale = [c for c in collections if self.is_stale(c, ttl)]
+        if not stale:
+            return []
+        print(f"Refreshing reference data: {', '.join(stale)}...")
+        try:
+            raw = asyncio.run(fetch_endpoints(stale, base_url, fetch=fetch, max_age=max_age))
+        except Exception as e:
+            empty = [c for c in stale if self.last_refreshed(c) is None]
+            if empty:
+                raise RuntimeError(f"Could not load reference data for {', '.join(empty)}: {e}") from e
+            print(f"Warning: reference data refresh failed ({e}); using stored data.")
+            return []
+        for collection, records in raw.items():
+            self.replace(collection, records)
+        return stale
+
+    def lookup(self, collection, ids, columns=None):
+        """
+        Resolves a whole column of IDs in one indexed join.
+
+        Args:
+            collection (str): One of COLLECTION_SCHEMAS.
+            ids (pd.Series or list): IDs to resolve. May contain duplicates and nulls.
+            columns (list): Columns to return. Defaults to every stored column.
+
+        Returns:
+            pd.DataFrame: One row per input ID, aligned with `ids` (same index if a
+                          Series was passed). Unknown or null IDs give null rows.
+        """
+        ids = ids if isinstance(ids, pd.Series) else pd.Series(list(ids), dtype=object)
+        columns = list(columns or COLLECTION_SCHEMAS[collection])
+        unique_ids = [(i,) for i in pd.unique(ids.dropna().astype(str))]
+
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_ids (id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM lookup_ids")
+            self.conn.executemany("INSERT INTO lookup_ids (id) VALUES (?)", unique_ids)
+        found = pd.read_sql_query(
+            f"SELECT c.id, {', '.join('c.' + col for col in columns)} "
+            f"FROM lookup_ids JOIN {collection} AS c ON c.id = lookup_ids.id",
+            self.conn
+        ).set_index('id')
+
+        result = found.reindex(ids.where(ids.isna(), ids.astype(str)))
+        result.index = ids.index
+        return result
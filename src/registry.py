@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from src.search_store import data_fingerprint
+from src.utils import load_config
+
+DEFAULT_ROOT = 'models/registry'
+MODEL_FILE = 'model.joblib'
+METADATA_FILE = 'metadata.json'
+ALIASES_FILE = 'aliases.json'
+
+_VERSION_DIR = re.compile(r'^v(\d+)$')
+
+def _json_value(value):
+    """Converts what json cannot write: NumPy scalars to Python numbers, anything else to its str."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+class ModelRegistry:
+    """
+    A directory of versioned model bundles.
+
+    Each version of a registered model is a directory holding the whole fitted
+    pipeline (encoder, scaler and model) and a metadata.json with its metrics,
+    training data fingerprint, parameters and feature columns:
+
+        models/registry/<name>/v0001/model.joblib
+        models/registry/<name>/v0001/metadata.json
+        models/registry/<name>/aliases.json    e.g. {"latest": 2, "production": 1}
+
+    Bundles are written uncompressed, so they can be loaded with mmap_mode:
+    the arrays of the model are then mapped from the file rather than copied,
+    and serving processes loading the same version share their pages.
+    Versions are never modified once written.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        """
+        Args:
+            root (str): The registry directory. Created on first registration.
+        """
+        self.root = root
+        self._aliases = {}  # name -> (aliases.json mtime_ns, aliases)
+
+    def _model_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _version_dir(self, name, version):
+        return os.path.join(self._model_dir(name), f"v{version:04d}")
+
+    def versions(self, name):
+        """Returns the registered versions of a model, oldest first."""
+        if not os.path.isdir(self._model_dir(name)):
+            return []
+        matches = (_VERSION_DIR.match(entry) for entry in os.listdir(self._model_dir(name)))
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def aliases(self, name):
+        """
+        Returns a model's aliases, e.g. {'latest': 3, 'production': 2}.
+
+        The aliases file is only re-read when it changes, so resolving an alias
+        on every request costs a single stat call.
+        """
+        path = os.path.join(self._model_dir(name), ALIASES_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        cached = self._aliases.get(name)
+        if cached is None or cached[0] != mtime:
+            with open(path, 'r') as f:
+                cached = (mtime, json.load(f))
+            self._aliases[name] = cached
+        return dict(cached[1])
+
+    def _write_aliases(self, name, aliases):
+        path = os.path.join(self._model_dir(name), ALIASES_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(aliases, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def set_alias(self, name, alias, version):
+        """Points an alias such as 'production' at a registered version."""
+        version = self.resolve(name, version)
+        aliases = self.aliases(name)
+        aliases[alias] = version
+        self._write_aliases(name, aliases)
+        print(f"{name}: {alias} -> v{version:04d}")
+
+    def resolve(self, name, ref='latest'):
+        """
+        Resolves a version number, 'v3'-style name or alias to a version number.
+
+        Raises:
+            KeyError: If the model, version or alias is not registered.
+        """
+        if isinstance(ref, int) or (isinstance(ref, str) and ref.isdigit()):
+            version = int(ref)
+        elif isinstance(ref, str) and _VERSION_DIR.match(ref):
+            version = int(ref[1:])
+        else:
+            aliases = self.aliases(name)
+            if ref not in aliases:
+                raise KeyError(f"{name} has no version aliased {ref!r}")
+            return aliases[ref]
+        if not os.path.isdir(self._version_dir(name, version)):
+            raise KeyError(f"{name} has no version {version}")
+        return version
+
+    def register(self, model, name, metrics=None, X=None, y=None, params=None, aliases=('latest',),
+                 trained_through=None, trained_flights=None):
+        """
+        Stores a fitted model as the next version of `name`.
+
+        Args:
+            model: The fitted pipeline (see train.build_pipeline) or estimator.
+            name (str): The registered model name.
+            metrics (dict): Evaluation metrics to keep with it.
+            X (pd.DataFrame): The training features, fingerprinted and their columns recorded.
+            y: The training labels, fingerprinted with X.
+            params (dict): Parameters to record. Defaults to the model's get_params(deep=True).
+            aliases (iterable): Aliases to point at the new version. 'production'
+                                is also set if the model has no production version yet.
+            trained_through: The latest launch date in the data the model was
+                             trained from. Launches after it were never seen by
+                             the model, so they can validate models derived
+                             from it (see retrain).
+            trained_flights: The flight numbers of the launches the model was
+                             fitted on; with a random train/test split, the
+                             other launches up to `trained_through` are unseen too.
+
+        Returns:
+            int: The new version number.
+        """
+        os.makedirs(self._model_dir(name), exist_ok=True)
+        version = (self.versions(name) or [0])[-1] + 1
+        if params is None:
+            params = {k: v for k, v in model.get_params(deep=True).items() if k not in ('steps', 'memory')}
+        metadata = {
+            'name': name,
+            'version': version,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'model_class': type(model).__name__,
+            'estimator': type(getattr(model, 'named_steps', {}).get('model', model)).__name__,
+            'metrics': metrics or {},
+            'data_fingerprint': data_fingerprint(X, y) if X is not None and y is not None else None,
+            'n_train_rows': None if X is None else len(X),
+            'feature_columns': None if X is None else [str(c) for c in X.columns],
+            'trained_through': None if trained_through is None else pd.Timestamp(trained_through).isoformat(),
+            'trained_flights': None if trained_flights is None else sorted(int(f) for f in trained_flights),
+            'params': json.loads(json.dumps(params, sort_keys=True, default=_json_value)),
+            'sklearn_version': sklearn.__version__
+        }
+        # Written in a scratch directory and renamed into place, so readers never see a partial version
+        tmp_dir = os.path.join(self._model_dir(name), f".v{version:04d}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE), compress=0)
+            with open(os.path.join(tmp_dir, METADATA_FILE), 'w') as f:
+                json.dump(metadata, f, indent=2, default=_json_value)
+            os.rename(tmp_dir, self._version_dir(name, version))
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        new_aliases = self.aliases(name)
+        new_aliases.update({alias: version for alias in aliases})
+        new_aliases.setdefault('production', version)
+        self._write_aliases(name, new_aliases)
+        print(f"Registered {name} v{version:04d} ({', '.join(a for a, v in new_aliases.items() if v == version)})")
+        return version
+
+    def metadata(self, name, ref='latest'):
+        """Returns the metadata of a registered version."""
+        with open(os.path.join(self._version_dir(name, self.resolve(name, ref)), METADATA_FILE), 'r') as f:
+            return json.load(f)
+
+    def model_path(self, name, ref='latest'):
+        """Returns the model file of a registered version."""
+        return os.path.join(self._version_dir(name, self.resolve(name, ref)), MODEL_FILE)
+
+    def load(self, name, ref='production', mmap=True):
+        """
+        Loads a registered version.
+
+        Args:
+            name (str): The registered model name.
+            ref: A version number, 'v3'-style name or alias.
+            mmap (bool): Map the model's arrays read-only from the file instead
+                         of reading them into memory.
+
+        Returns:
+            The fitted model.
+        """
+        return joblib.load(self.model_path(name, ref), mmap_mode='r' if mmap else None)
+
+def registry_from_config(config=None):
+    """Returns the registry configured under `registry` in config.yaml."""
+    config = config or load_config()
+    return ModelRegistry(config['registry']['root'])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List and promote registered model versions.")
+    parser.add_argument('command', choices=['list', 'show', 'promote'])
+    parser.add_argument('version', nargs='?', default='latest', help="Version or alias (show, promote).")
+    parser.add_argument('--name', default=None, help="Registered model name (default: registry.model_name).")
+    parser.add_argument('--alias', default='production', help="Alias to set (promote).")
+    args = parser.parse_args()
+
+    config = load_config()
+    registry = registry_from_config(config)
+    name = args.name or config['registry']['model_name']
+    if args.command == 'list':
+        aliases = registry.aliases(name)
+        for version in registry.versions(name):
+            metadata = registry.metadata(name, version)
+            tags = ', '.join(alias for alias, v in sorted(aliases.items()) if v == version)
+            f1 = metadata['metrics'].get('F1-Score')
+            print(f"v{version:04d}  {metadata['created_at']}  {metadata['estimator']:<22} "
+                  f"F1 {'-' if f1 is None else f'{f1:.4f}'}  {tags}")
+    elif args.command == 'show':
+        print(json.dumps(registry.metadata(name, args.version), indent=2))
+    else:
+        registry.set_alias(name, args.alias, args.version)
@@ -0,0 +1,201 @@
+import argparse
+import copy
+import os
+import time
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from src.eval import evaluate_model
+from src.features import history_features, history_state_path, save_history_state
+from src.registry import registry_from_config
+from src.storage import load_artifact
+from src.train import prepare_training_data, save_model, training_window
+from src.utils import load_config, load_model
+
+# Models grown with warm_start: their trees are independent, so new ones can be added and old ones dropped
+FORESTS = (RandomForestClassifier, ExtraTreesClassifier)
+
+def supports_incremental_update(pipeline):
+    """Returns True if the pipeline's model can be updated without a full retrain."""
+    model = pipeline.named_steps['model']
+    return isinstance(model, FORESTS) or hasattr(model, 'partial_fit')
+
+def incremental_update(pipeline, X_new, y_new, X_seen=None, y_seen=None, new_trees=50, max_trees=None):
+    """
+    Folds a batch of new launches into a trained pipeline without refitting it.
+
+    The encoder keeps its vocabulary, so categories first seen in the batch
+    encode as all zeros until the next full retrain.
+      - Forests keep their trees and grow `new_trees` more with warm_start,
+        fitted on the seen and new launches together. With `max_trees`, the
+        oldest trees are then dropped, so the forest follows recent data.
+      - Models with partial_fit (e.g. SGDClassifier) take one pass over the
+        batch, after the scaler's running mean and variance are updated
+        with it.
+
+    Args:
+        pipeline (Pipeline): A fitted train.build_pipeline pipeline. Not modified.
+        X_new (pd.DataFrame): The new launches' features.
+        y_new: Their labels.
+        X_seen (pd.DataFrame): The launches the pipeline was trained on (forests only).
+        y_seen: Their labels.
+        new_trees (int): Trees added to a forest.
+        max_trees (int): Largest forest kept, or None to keep every tree.
+
+    Returns:
+        Pipeline: The updated copy.
+
+    Raises:
+        ValueError: If the model supports neither warm_start trees nor partial_fit.
+    """
+    updated = copy.deepcopy(pipeline)
+    model = updated.named_steps['model']
+    encoded = updated.named_steps['encoder'].transform(X_new)
+
+    if isinstance(model, FORESTS):
+        if X_seen is not None:
+            X_all = pd.concat([X_seen, X_new])
+            y_all = np.concatenate([np.asarray(y_seen), np.asarray(y_new)])
+        else:
+            X_all, y_all = X_new, np.asarray(y_new)
+        features = updated[:-1].transform(X_all)
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees)
+        model.fit(features, y_all)
+        model.set_params(warm_start=False)
+        if max_trees is not None and len(model.estimators_) > max_trees:
+            model.estimators_ = model.estimators_[-max_trees:]
+            model.set_params(n_estimators=max_trees)
+        return updated
+
+    if hasattr(model, 'partial_fit'):
+        scaler = updated.named_steps['scaler']
+        if hasattr(scaler, 'partial_fit'):
+            scaler.partial_fit(encoded)
+        features = encoded if scaler == 'passthrough' else scaler.transform(encoded)
+        model.partial_fit(features, np.asarray(y_new))
+        return updated
+
+    raise ValueError(f"{type(model).__name__} cannot be updated incrementally; retrain it with src.train.")
+
+def validation_gate(updated, retrained, X_holdout, y_holdout, metric='F1-Score', tolerance=0.02):
+    """
+    Compares an incrementally updated model against a full retrain on held-out launches.
+
+    Args:
+        updated: The incrementally updated model.
+        retrained: The same model retrained from scratch on the same launches.
+        X_holdout, y_holdout: Launches neither model was trained on.
+        metric (str): An eval.evaluate_model metric.
+        tolerance (float): How far the update may score below the full retrain.
+
+    Returns:
+        dict: Both models' metric, and 'passed' if the update is within the
+              tolerance. With no held-out launches the gate fails closed:
+              both metrics are None and 'passed' is False.
+    """
+    if len(y_holdout) == 0:
+        return {'metric': metric, 'updated': None, 'retrained': None, 'passed': False}
+    updated_score = evaluate_model(updated, X_holdout, y_holdout)[metric]
+    retrained_score = evaluate_model(retrained, X_holdout, y_holdout)[metric]
+    return {
+        'metric': metric,
+        'updated': updated_score,
+        'retrained': retrained_score,
+        'passed': updated_score >= retrained_score - tolerance
+    }
+
+def split_by_date(df, new_since, holdout_launches, trained_through, trained_flights=None):
+    """
+    Splits launches in date order into those already seen, the new batch and a held-out window.
+
+    The production model, and an update built on it, may have seen any launch
+    it was fitted on, so only the launches it never saw are held out: those
+    after `trained_through`, and those up to it that are not in
+    `trained_flights` (the test split of src.train). The latest
+    `holdout_launches` of them are held out, or none if `trained_through`
+    is unknown.
+
+    Args:
+        df (pd.DataFrame): Wrangled launches.
+        new_since (str): Launches from this date on are new.
+        holdout_launches (int): Launches kept out of both models for the gate.
+        trained_through: The latest launch date in the data the production model
+                         was trained from (registry metadata 'trained_through'), or None.
+        trained_flights (list): The flight numbers the production model was fitted
+                                on (registry metadata 'trained_flights'), or None
+                                if it was fitted on every launch up to `trained_through`.
+
+    Returns:
+        tuple: (seen, new, holdout) DataFrames.
+    """
+    df = df.sort_values(['Date', 'flight_number'], kind='stable')
+    held_out = np.zeros(len(df), dtype=bool)
+    if trained_through is not None:
+        unseen_mask = df['Date'] > pd.to_datetime(trained_through, utc=True)
+        if trained_flights is not None:
+            unseen_mask |= ~df['flight_number'].isin(trained_flights)
+        unseen = np.flatnonzero(unseen_mask)
+        held_out[unseen[len(unseen) - min(holdout_launches, len(unseen)):]] = True
+    holdout, rest = df[held_out], df[~held_out]
+    new_mask = rest['Date'] >= pd.Timestamp(new_since, tz='UTC')
+    return rest[~new_mask], rest[new_mask], holdout
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fold new launches into the saved model, checked against a full retrain.")
+    parser.add_argument('--new-since', required=True, help="Launches from this date (YYYY-MM-DD) on are the new batch.")
+    parser.add_argument('--model', default=None,
+                        help="Model file to update (default: the registry's production version, else models/best_model.pkl).")
+    args = parser.parse_args()
+
+    config = load_config()
+    settings = config['retraining']
+    target = config['project_settings']['target_column']
+    registry, name = registry_from_config(config), config['registry']['model_name']
+    model_path = args.model or os.path.join(config['data_paths']['models'], 'best_model.pkl')
+    if args.model is None and 'production' in registry.aliases(name):
+        print(f"Updating {name} v{registry.resolve(name, 'production'):04d} from the registry")
+        production = registry.load(name, 'production', mmap=False)
+        production_metadata = registry.metadata(name, 'production')
+        trained_through = production_metadata.get('trained_through')
+        trained_flights = production_metadata.get('trained_flights')
+    else:
+        production = load_model(model_path)
+        trained_through = trained_flights = None  # A model file does not record what it was trained on
+
+    launches = load_artifact('wrangled_data', config=config)
+    history, history_state = history_features(launches)
+    seen, new, holdout = split_by_date(launches.join(history), args.new_since, settings['holdout_launches'],
+                                       trained_through, trained_flights)
+    (X_seen, y_seen), (X_new, y_new), (X_holdout, y_holdout) = (prepare_training_data(part, target)
+                                                               for part in (seen, new, holdout))
+    print(f"{len(seen)} seen launches, {len(new)} new, {len(holdout)} held out")
+
+    start = time.perf_counter()
+    updated = incremental_update(production, X_new, y_new, X_seen, y_seen, settings['new_trees'],
+                                 settings.get('max_trees'))
+    update_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    retrained = clone(production).fit(pd.concat([X_seen, X_new]), np.concatenate([y_seen, y_new]))
+    retrain_seconds = time.perf_counter() - start
+
+    gate = validation_gate(updated, retrained, X_holdout, y_holdout, tolerance=settings['tolerance'])
+    if gate['updated'] is None:
+        print(f"Incremental update: {update_seconds:.2f} s; full retrain: {retrain_seconds:.2f} s")
+        print("No launches unseen by the production model to validate on; saving the full retrain.")
+    else:
+        print(f"Incremental update: {update_seconds:.2f} s, held-out {gate['metric']} {gate['updated']:.4f}")
+        print(f"Full retrain:       {retrain_seconds:.2f} s, held-out {gate['metric']} {gate['retrained']:.4f}")
+        if gate['passed']:
+            print("Validation gate passed; saving the updated model.")
+        else:
+            print(f"Validation gate failed (more than {settings['tolerance']} below the full retrain); "
+                  "saving the full retrain instead.")
+    chosen = updated if gate['passed'] else retrained
+    save_model(chosen, os.path.dirname(model_path), os.path.basename(model_path), chosen.named_steps['encoder'])
+    save_history_state(history_state, history_state_path(config))
+    registry.register(chosen, name, metrics={f"Held-out {gate['metric']}": gate['updated' if gate['passed'] else 'retrained'],
+                                             'incremental': bool(gate['passed'])},
+                      X=pd.concat([X_seen, X_new]), y=np.concatenate([y_seen, y_new]), aliases=('latest', 'production'),
+                      **training_window(launches, pd.concat([X_seen, X_new])))
@@ -1,54 +1,350 @@
+import argparse
+import functools
+import hashlib
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import os
+from lxml import etree
+from src.http_client import request_content
+from src.storage import save_artifact
+from src.utils import load_config
 
-def scrape_launch_data(wiki_url="https://en.wikipedia.org/wiki/List_of_Falcon_9_and_Falcon_Heavy_launches"):
+WIKI_URL = "https://en.wikipedia.org/wiki/List_of_Falcon_9_and_Falcon_Heavy_launches"
+LAUNCH_TABLE_HEADER = "Flight No."
+DEFAULT_PAGE_CACHE_DIR = 'data/cache/wiki'
+
+# Header spellings vary between the yearly list pages; each is mapped to one
+# canonical column by its lower-cased prefix.
+CANONICAL_COLUMNS = {
+    'flight no': 'Flight No.',
+    'date and time': 'Date and time (UTC)',
+    'version': 'Version, Booster',
+    'launch site': 'Launch site',
+    'payload mass': 'Payload mass',
+    'payload': 'Payload',
+    'orbit': 'Orbit',
+    'customer': 'Customer',
+    'launch outcome': 'Launch outcome',
+    'booster landing': 'Booster landing',
+    'landing': 'Booster landing'
+}
+
+def _is_skipped(element):
+    # Footnote markers like [12] and inline <style> blocks are not cell content
+    if element.tag in ('style', 'script'):
+        return True
+    return element.tag == 'sup' and 'reference' in (element.get('class') or '')
+
+def _collect_text(element, parts):
+    if element.tag == 'br':
+        parts.append(' ')
+        return
+    if not isinstance(element.tag, str) or _is_skipped(element):
+        return
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+def _cell_text(cell):
+    """Returns the visible text of a table cell with whitespace collapsed."""
+    parts = []
+    _collect_text(cell, parts)
+    return ' '.join(''.join(parts).split())
+
+def _span(cell, attribute):
+    match = re.match(r'\d+', cell.get(attribute) or '')
+    return max(int(match.group()), 1) if match else 1
+
+def _take_span(pending, col):
+    remaining, text = pending[col]
+    if remaining == 1:
+        del pending[col]
+    else:
+        pending[col][0] -= 1
+    return text
+
+def _row_cells(tr):
+    return [cell for cell in tr if cell.tag in ('td', 'th')]
+
+def _table_rows(table):
+    # Only this table's own rows, not rows of tables nested inside its cells
+    return table.xpath('./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr')
+
+def _expand_row(cells, pending):
+    """
+    Lays out one row's cells on the column grid, filling in values carried down
+    by rowspans from earlier rows and repeating values across colspans.
+    """
+    row = []
+    for cell in cells:
+        while len(row) in pending:
+            row.append(_take_span(pending, len(row)))
+        text = _cell_text(cell)
+        rowspan = _span(cell, 'rowspan')
+        for _ in range(_span(cell, 'colspan')):
+            if rowspan > 1:
+                pending[len(row)] = [rowspan - 1, text]
+            row.append(text)
+    while len(row) in pending:
+        row.append(_take_span(pending, len(row)))
+    return row
+
+def _iter_table_rows(table):
+    """
+    Yields the header and then every data row of a launch table.
+
+    A row made of a single cell spanning the remaining columns is the mission
+    description that Wikipedia places under each launch; it is skipped, but the
+    rowspans it sits under are still consumed.
+    """
+    rows = _table_rows(table)
+    header = [' '.join(_cell_text(c).split()) for c in _row_cells(rows[0])]
+    yield header
+
+    pending = {}
+    for tr in rows[1:]:
+        cells = _row_cells(tr)
+        if not cells:
+            continue
+        if len(cells) == 1 and _span(cells[0], 'colspan') > 1:
+            for col in list(pending):
+                _take_span(pending, col)
+            continue
+        row = _expand_row(cells, pending)
+        yield (row + [None] * len(header))[:len(header)]
+
+def _is_launch_table(table):
+    rows = _table_rows(table)
+    if not rows:
+        return False
+    first_cell = next(iter(_row_cells(rows[0])), None)
+    return first_cell is not None and _cell_text(first_cell).startswith(LAUNCH_TABLE_HEADER.rstrip('.'))
+
+def _open_source(source):
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    if isinstance(source, str) and source.lstrip().startswith('<'):
+        return io.BytesIO(source.encode('utf-8'))
+    return source  # A file path or a binary file-like object
+
+def iter_launch_tables(source):
+    """
+    Streams the launch tables out of a Falcon 9 launches page.
+
+    The page is parsed incrementally with lxml. Each table is checked for the
+    "Flight No." header as soon as it has been read, and anything that is not a
+    launch table is discarded before any of its rows are laid out. Parsed
+    elements are cleared as the parser moves on, so memory stays bounded by
+    the largest single table.
+
+    Args:
+        source: A local HTML file path, a binary file object, or the HTML as bytes/str.
+
+    Yields:
+        tuple: (header, rows) for each launch table, where rows is a generator
+               of lists aligned with header. Consume the rows before advancing
+               to the next table, since the table is cleared afterwards.
+    """
+    for _, table in etree.iterparse(_open_source(source), events=('end',), tag='table', html=True, recover=True):
+        nested = next(table.iterancestors('table'), None) is not None
+        if not nested and _is_launch_table(table):
+            rows = _iter_table_rows(table)
+            header = next(rows)
+            yield header, rows
+        if not nested:
+            table.clear()
+            while table.getprevious() is not None:
+                del table.getparent()[0]
+
+def extract_launch_tables(source):
+    """
+    Extracts and concatenates every launch table from a launches page.
+
+    Args:
+        source: A local HTML file path, a binary file object, or the HTML as bytes/str.
+
+    Returns:
+        pd.DataFrame: All launch rows. Tables with differing headers are aligned by column name.
+    """
+    frames = [pd.DataFrame(list(rows), columns=header) for header, rows in iter_launch_tables(source)]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+def fetch_page_html(wiki_url=WIKI_URL, snapshot_path=None, max_age=0):
+    """
+    Returns the raw HTML of a Wikipedia page, from a local snapshot if one exists.
+
+    When `snapshot_path` is given but missing, the downloaded page is saved there
+    so later runs (and benchmarks) can work offline.
+
+    Args:
+        wiki_url (str): The URL of the Wikipedia page.
+        snapshot_path (str): Optional path of a cached HTML snapshot.
+        max_age (float): Seconds a cached download is served without revalidation.
+
+    Returns:
+        bytes: The page HTML.
     """
-    Scrapes Falcon 9 launch data from a Wikipedia page using pandas.
+    if snapshot_path and os.path.exists(snapshot_path):
+        with open(snapshot_path, 'rb') as f:
+            return f.read()
+    html = request_content(wiki_url, max_age=max_age)
+    if snapshot_path:
+        directory = os.path.dirname(snapshot_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(snapshot_path, 'wb') as f:
+            f.write(html)
+    return html
+
+def scrape_launch_data_read_html(html):
+    """
+    Extracts the launch tables with pandas.read_html, parsing every table on the page.
+
+    This was the original extraction path; it is kept for comparison in
+    benchmarks/bench_scrape_wiki.py.
+
+    Args:
+        html (bytes or str): The page HTML.
+
+    Returns:
+        pd.DataFrame: The concatenated launch tables.
+    """
+    if isinstance(html, bytes):
+        html = html.decode('utf-8')
+    tables = pd.read_html(io.StringIO(html))
+    return pd.concat(
+        [table for table in tables if "Flight No." in table.columns or "Flight\nNo." in table.columns],
+        ignore_index=True
+    )
+
+def scrape_launch_data(wiki_url=WIKI_URL, snapshot_path=None, max_age=0):
+    """
+    Scrapes Falcon 9 launch data from a Wikipedia page.
 
     Args:
         wiki_url (str): The URL of the Wikipedia page to scrape.
+        snapshot_path (str): Optional local HTML snapshot to read from (or to create).
+        max_age (float): Seconds a cached download is served without revalidation.
 
     Returns:
-        pd.DataFrame: A DataFrame containing the launch data, or None if scraping fails.
+        pd.DataFrame: The launch rows in the canonical schema, with a 'SourcePage'
+                      column, as for scrape_launch_pages. None if scraping fails.
     """
-    print(f"Scraping data from {wiki_url}...")
+    print(f"Scraping data from {snapshot_path if snapshot_path and os.path.exists(snapshot_path) else wiki_url}...")
     try:
-        # pandas.read_html is a powerful tool for scraping tables from web pages
-        tables = pd.read_html(wiki_url)
-        
-        # I need to find the correct tables that contain the launch records.
-        # I will combine all tables that have a "Flight No." column.
-        launch_df = pd.concat(
-            [table for table in tables if "Flight No." in table.columns or "Flight\nNo." in table.columns],
-            ignore_index=True
-        )
+        html = fetch_page_html(wiki_url, snapshot_path, max_age)
+        launch_df = extract_launch_tables(html)
+        if launch_df.empty:
+            raise ValueError("No tables with a 'Flight No.' header were found.")
         print("Scraping successful.")
-        return launch_df
+        return normalize_launch_columns(launch_df).assign(SourcePage=wiki_url)
     except Exception as e:
         print(f"Error scraping data: {e}")
         return None
 
-def save_data_as_csv(dataframe, path, filename):
+def normalize_launch_columns(dataframe):
     """
-    Saves a pandas DataFrame to a specified path as a CSV file.
+    Renames a scraped launch table's columns to the canonical launch schema.
+
+    Columns that do not match any canonical name are dropped, and canonical
+    columns missing from the table are added as nulls.
 
     Args:
-        dataframe (pd.DataFrame): The DataFrame to save.
-        path (str): The directory path to save the file in.
-        filename (str): The name of the file.
-    """
-    if dataframe is not None:
-        if not os.path.exists(path):
-            os.makedirs(path)
-        filepath = os.path.join(path, filename)
-        dataframe.to_csv(filepath, index=False)
-        print(f"Data saved to {filepath}")
-    else:
-        print("No data to save.")
+        dataframe (pd.DataFrame): A launch table as extracted from one page.
+
+    Returns:
+        pd.DataFrame: The table with exactly the canonical columns, in order.
+    """
+    renames = {}
+    for column in dataframe.columns:
+        key = str(column).lower()
+        for prefix, canonical in CANONICAL_COLUMNS.items():
+            if key.startswith(prefix):
+                renames.setdefault(column, canonical)
+                break
+    normalized = dataframe[list(renames)].rename(columns=renames)
+    normalized = normalized.loc[:, ~normalized.columns.duplicated()]
+    return normalized.reindex(columns=list(dict.fromkeys(CANONICAL_COLUMNS.values())))
+
+@functools.lru_cache(maxsize=None)
+def parser_version():
+    """Returns a short hash of this module's source, which holds the extractor and the column normalization."""
+    with open(__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def _scrape_page(url, cache_dir, max_age=0):
+    """
+    Downloads one page and returns (launch table, whether it had to be parsed).
+
+    The parsed table is cached under the SHA-256 of the page HTML and the
+    parser version, so an unchanged page is loaded from the cache without
+    parsing, and a changed extractor re-parses every page.
+    """
+    html = request_content(url, max_age=max_age)
+    content_hash = hashlib.sha256(html).hexdigest()
+    table_path = os.path.join(cache_dir, f"{content_hash}.{parser_version()}.pkl")
+    if os.path.exists(table_path):
+        return pd.read_pickle(table_path), False
+
+    html_path = os.path.join(cache_dir, f"{content_hash}.html")
+    with open(html_path, 'wb') as f:
+        f.write(html)
+    table = normalize_launch_columns(extract_launch_tables(html))
+    table.to_pickle(table_path)
+    return table, True
+
+def scrape_launch_pages(urls, cache_dir=DEFAULT_PAGE_CACHE_DIR, max_workers=4, max_age=0):
+    """
+    Scrapes several Wikipedia launch list pages concurrently.
+
+    Each page's raw HTML and parsed table are cached by content hash, so only
+    pages whose content changed since the last run are re-parsed.
+
+    Args:
+        urls (list): The Wikipedia pages to scrape, e.g. one per year range.
+        cache_dir (str): Directory for the per-page HTML and table cache.
+        max_workers (int): Number of pages fetched and parsed at once.
+        max_age (float): Seconds a cached download is served without revalidation.
+
+    Returns:
+        pd.DataFrame: All launch rows in the canonical schema, in page order,
+                      with a 'SourcePage' column. None if any page fails.
+    """
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+    print(f"Scraping {len(urls)} pages with {max_workers} workers...")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda url: _scrape_page(url, cache_dir, max_age), urls))
+    except Exception as e:
+        print(f"Error scraping data: {e}")
+        return None
+
+    reparsed = sum(parsed for _, parsed in results)
+    print(f"Scraping successful ({reparsed} of {len(urls)} pages re-parsed).")
+    frames = [table.assign(SourcePage=url) for url, (table, _) in zip(urls, results)]
+    return pd.concat(frames, ignore_index=True)
 
 if __name__ == '__main__':
-    DATA_PATH = 'data/raw'
-    FILENAME = 'wiki_falcon9_table.csv'
-    
-    scraped_data = scrape_launch_data()
-    save_data_as_csv(scraped_data, DATA_PATH, FILENAME)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape the Falcon 9 launch tables from Wikipedia.")
+    parser.add_argument('--snapshot', default=None,
+                        help="Read the page from this local HTML snapshot (downloaded and saved there if missing).")
+    parser.add_argument('--all-pages', action='store_true',
+                        help="Scrape every page listed under scraping.wiki_pages in config/config.yaml.")
+    args = parser.parse_args()
+    config = load_config()
+
+    if args.all_pages:
+        scraping = config['scraping']
+        scraped_data = scrape_launch_pages(scraping['wiki_pages'], scraping['cache_dir'], scraping['max_workers'],
+                                           config['http']['max_age'])
+    else:
+        scraped_data = scrape_launch_data(snapshot_path=args.snapshot, max_age=config['http']['max_age'])
+    save_artifact(scraped_data, 'raw_wiki_data')
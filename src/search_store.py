@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import check_cv
+
+DEFAULT_DB_PATH = 'data/cache/training/search_results.db'
+
+class SearchResultStore:
+    """
+    A local SQLite store of hyperparameter search results, one row per candidate and fold.
+
+    Rows are keyed by a search key (see search_key), the candidate's
+    parameters and the fold, and are committed as each fit finishes, so an
+    interrupted search loses at most the fits that were still running.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        """
+        Opens (and if needed creates) the store.
+
+        Args:
+            db_path (str): Path to the SQLite database file, or ':memory:'.
+        """
+        if db_path != ':memory:':
+            directory = os.path.dirname(db_path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+        self.db_path = db_path
+        # Searches of different models may write from separate processes
+        self.conn = sqlite3.connect(db_path, timeout=60)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS fold_results (search_key TEXT, model TEXT, candidate TEXT, fold INTEGER, "
+                "score REAL, fit_seconds REAL, finished_at REAL, PRIMARY KEY (search_key, candidate, fold))"
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def completed(self, key):
+        """Returns {(candidate, fold): score} for the fits already stored under a search key."""
+        rows = self.conn.execute(
+            "SELECT candidate, fold, score FROM fold_results WHERE search_key = ?", (key,)
+        ).fetchall()
+        return {(candidate, fold): np.nan if score is None else score for candidate, fold, score in rows}
+
+    def record(self, key, model, candidate, fold, score, fit_seconds):
+        """Stores the score of one candidate on one fold."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fold_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, candidate, fold, None if np.isnan(score) else float(score), fit_seconds, time.time())
+            )
+
+    def results(self, key=None):
+        """
+        Returns the stored fold results, optionally for one search key.
+
+        Returns:
+            pd.DataFrame: One row per candidate and fold.
+        """
+        query = "SELECT * FROM fold_results"
+        if key is None:
+            return pd.read_sql_query(query, self.conn)
+        return pd.read_sql_query(query + " WHERE search_key = ?", self.conn, params=(key,))
+
+def candidate_key(params):
+    """A canonical string for a candidate's parameters; estimators are keyed by their repr."""
+    return json.dumps(params, sort_keys=True, default=repr)
+
+def data_fingerprint(X, y):
+    """Returns a SHA-256 of the training features and labels, including column names and dtypes."""
+    digest = hashlib.sha256()
+    if isinstance(X, pd.DataFrame):
+        digest.update(json.dumps([[str(c), str(t)] for c, t in X.dtypes.items()]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    else:
+        digest.update(joblib.hash(np.asarray(X)).encode('utf-8'))
+    digest.update(joblib.hash(np.asarray(y)).encode('utf-8'))
+    return digest.hexdigest()
+
+def search_key(estimator, X, y, folds, scoring):
+    """
+    Identifies the setting a search's fold scores are comparable in.
+
+    The key covers the data, the fold indices, the scoring and the base
+    estimator's own parameters, but not the grid: a candidate's scores stay
+    valid when the grid around it changes, so expanding a grid only runs the
+    new points.
+
+    Returns:
+        str: A SHA-256 hex digest.
+    """
+    params = {name: value for name, value in estimator.get_params(deep=True).items() if not name.endswith('memory')}
+    parts = {
+        'data': data_fingerprint(X, y),
+        'folds': joblib.hash([(train, test) for train, test in folds]),
+        'scoring': scoring,
+        'estimator': candidate_key(params),
+        'sklearn': sklearn.__version__
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+def _rows(X, index):
+    return X.iloc[index] if hasattr(X, 'iloc') else X[index]
+
+# Errors a fit raises again on every attempt with the same candidate and data, such as an
+# invalid parameter combination; anything else (a MemoryError, a killed worker) may not recur
+DETERMINISTIC_FIT_ERRORS = (ValueError, TypeError, ArithmeticError)
+
+def _with_params(estimator, params):
+    # Parameter values such as a scaler are cloned too, as in scikit-learn's searches, so no fit changes the grid
+    return clone(estimator).set_params(**clone(params, safe=False))
+
+def _fit_and_score(task, estimator, params, X, y, train, test, scorer):
+    """
+    Fits one candidate on one fold.
+
+    A fit failing with one of DETERMINISTIC_FIT_ERRORS scores NaN, like
+    error_score=np.nan, and that score is stored. Other errors are raised, so
+    nothing is stored for the fit and it is retried when the search resumes.
+    """
+    start = time.perf_counter()
+    try:
+        model = _with_params(estimator, params).fit(_rows(X, train), y[train])
+        score = scorer(model, _rows(X, test), y[test])
+    except DETERMINISTIC_FIT_ERRORS as e:
+        warnings.warn(f"Fit failed for {params}: {e}")
+        score = np.nan
+    return task, score, time.perf_counter() - start
+
+class ResumableSearchCV:
+    """
+    A grid or randomized search that stores every fold score as it finishes.
+
+    Fits already in the store under the same search key are not repeated, so
+    an interrupted search resumes where it stopped and a widened grid only
+    fits the new candidates. Exposes the attributes of GridSearchCV that
+    train.search_record reads: best_params_, best_score_, best_estimator_,
+    cv_results_ and n_splits_, plus n_reused_, the fits taken from the store.
+    """
+
+    def __init__(self, estimator, candidates, store, cv=5, scoring='f1', n_jobs=-1, name=None, verbose=1):
+        """
+        Args:
+            estimator: The base estimator or pipeline.
+            candidates (list): Parameter dicts to evaluate, e.g. list(ParameterGrid(grid)).
+            store (SearchResultStore): Where fold scores are read and written.
+            cv: Number of folds, a CV splitter or (train, test) index pairs.
+            scoring (str): Scoring metric to use for evaluation.
+            n_jobs (int): Fits run in parallel.
+            name (str): The model's name in the store.
+            verbose (int): Print how many fits are reused.
+        """
+        self.estimator = estimator
+        self.candidates = candidates
+        self.store = store
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.name = name
+        self.verbose = verbose
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        folds = list(check_cv(self.cv, y, classifier=True).split(X, y))
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        name = self.name or type(self.estimator).__name__
+        key = search_key(self.estimator, X, y, folds, self.scoring)
+        keys = [candidate_key(params) for params in self.candidates]
+
+        scores = self.store.completed(key)
+        pending = [(i, f) for i in range(len(keys)) for f in range(len(folds)) if (keys[i], f) not in scores]
+        if self.verbose:
+            print(f"{len(self.candidates)} candidates x {len(folds)} folds: "
+                  f"{len(keys) * len(folds) - len(pending)} fits reused, {len(pending)} to run")
+        tasks = (delayed(_fit_and_score)((i, f), self.estimator, self.candidates[i], X, y, *folds[f], scorer)
+                 for i, f in pending)
+        # Each score is stored as soon as its fit finishes, in whatever order that is
+        for (i, f), score, seconds in Parallel(n_jobs=self.n_jobs, return_as='generator_unordered')(tasks):
+            self.store.record(key, name, keys[i], f, score, seconds)
+            scores[(keys[i], f)] = score
+
+        split_scores = np.array([[scores[(k, f)] for f in range(len(folds))] for k in keys], dtype=float)
+        means = split_scores.mean(axis=1)  # A candidate with a failed fold scores NaN
+        if np.isnan(means).all():
+            raise ValueError(f"Every candidate of {name} failed to fit.")
+        ranks = pd.Series(means).rank(method='min', ascending=False, na_option='bottom').astype(int).to_numpy()
+        self.cv_results_ = {
+            'params': list(self.candidates),
+            'mean_test_score': means,
+            'std_test_score': np.std(split_scores, axis=1),
+            'rank_test_score': ranks,
+            **{f"split{f}_test_score": split_scores[:, f] for f in range(len(folds))}
+        }
+        self.best_index_ = int(np.nanargmax(means))
+        self.best_params_ = self.candidates[self.best_index_]
+        self.best_score_ = float(means[self.best_index_])
+        self.n_splits_ = len(folds)
+        self.n_reused_ = len(keys) * len(folds) - len(pending)
+        self.search_key_ = key
+        self.best_estimator_ = _with_params(self.estimator, self.best_params_).fit(X, y)
+        return self
@@ -0,0 +1,243 @@
+import argparse
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+from flask import Flask, jsonify, request
+from src.features import HISTORY_FEATURES, history_state_path, load_history_state
+from src.predict import feature_columns, input_columns, load_scoring_model, resolve_model_path, score_chunk
+from src.storage import ARTIFACT_SCHEMAS, apply_schema
+from src.utils import load_config
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-launch requests into small batches.
+
+    Request threads submit one launch each and wait on the returned future.
+    A single scoring thread takes the first waiting launch, then collects
+    more for up to `max_wait_ms` (or until `max_batch_size`) and scores them
+    with one vectorized call. Under load, a request waits a few milliseconds
+    at most, and the model's per-call overhead is paid once per batch rather
+    than once per launch. If a batch fails, its launches are scored again one
+    at a time, so only the launches that fail alone get the error.
+    """
+
+    def __init__(self, score_batch, max_batch_size=64, max_wait_ms=2.0):
+        """
+        Args:
+            score_batch (callable): Scores a list of launches; returns one result per launch.
+            max_batch_size (int): Largest batch scored at once.
+            max_wait_ms (float): How long a batch stays open for more launches; 0 scores each alone.
+        """
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = deque(maxlen=10_000)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, launch):
+        """Queues one launch for scoring; returns a Future of its result."""
+        future = Future()
+        self._queue.put((launch, future))
+        return future
+
+    def close(self):
+        """Scores the launches already queued, then stops the scoring thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Stop once this batch is scored
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = self._collect(item) if self.max_wait > 0 else [item]
+            self.batch_sizes.append(len(batch))
+            try:
+                results = self.score_batch([launch for launch, _ in batch])
+            except Exception:
+                self._score_each(batch)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _score_each(self, batch):
+        for launch, future in batch:
+            try:
+                future.set_result(self.score_batch([launch])[0])
+            except Exception as e:
+                future.set_exception(e)
+
+class LatencyRecorder:
+    """Keeps the latencies of the most recent requests and reports their percentiles."""
+
+    def __init__(self, window=10_000):
+        """
+        Args:
+            window (int): Number of recent requests the percentiles cover.
+        """
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+            self.count = 0
+
+    def summary(self):
+        """Returns the request count and the p50/p99 latency in milliseconds of the recent window."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+            count = self.count
+        if not len(latencies):
+            return {'requests': count, 'p50_ms': None, 'p99_ms': None}
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        return {'requests': count, 'p50_ms': round(float(p50), 3), 'p99_ms': round(float(p99), 3)}
+
+def make_scorer(model, history_state=None):
+    """
+    Returns a function scoring a list of launch dicts with `model`, one result dict per launch.
+
+    A model trained with history features gets them from `history_state`
+    (see predict.score_chunk), looked up by each launch's Date, LaunchSite and Core.
+    """
+    columns = feature_columns(model)
+    schema = ARTIFACT_SCHEMAS['wrangled_data']
+
+    def score_batch(launches):
+        frame = apply_schema(pd.DataFrame.from_records(launches, columns=input_columns(columns)), schema)
+        scored = score_chunk(model, frame, columns, history_state)
+        return [{'probability': None if np.isnan(p) else float(p), 'prediction': int(c)}
+                for p, c in zip(scored['probability'], scored['prediction'])]
+
+    return score_batch
+
+def create_app(model=None, max_batch_size=None, max_wait_ms=None, config=None):
+    """
+    Builds the prediction service.
+
+    The model is loaded once, here; every request is scored by the same
+    in-memory pipeline through a MicroBatcher.
+
+      POST /predict   One launch as a JSON object of feature columns, answered
+                      with {"probability": ..., "prediction": ...}; or a JSON
+                      list of launches, scored together and answered in order.
+                      A launch that cannot be scored gets a 400; one still
+                      waiting after serving.request_timeout_s gets a 503.
+                      For a model trained with history features, those are
+                      looked up from the launch's Date, LaunchSite and Core
+                      in the stored history state instead.
+      GET  /metrics   Request count, p50/p99 latency and mean batch size;
+                      ?reset=1 also clears them, e.g. between load-test runs.
+      GET  /health    The model file and its feature columns.
+
+    Args:
+        model: A fitted pipeline, or the path of a saved one or of a compiled
+               .npz model. Defaults to the registry's production version,
+               else models/best_model.pkl.
+        max_batch_size (int): Defaults to serving.max_batch_size in config.yaml.
+        max_wait_ms (float): Defaults to serving.max_wait_ms in config.yaml.
+        config (dict): Defaults to config.yaml.
+
+    Returns:
+        Flask: The app; also run by gunicorn as "src.serve:create_app()".
+    """
+    config = config or load_config()
+    settings = config['serving']
+    model_path = None
+    if model is None or isinstance(model, str):
+        model_path = resolve_model_path(model, config)
+        model = load_scoring_model(model_path)
+    columns = feature_columns(model)
+    history_state = load_history_state(history_state_path(config)) if set(HISTORY_FEATURES) & set(columns) else None
+    score_batch = make_scorer(model, history_state)
+    # Sent by clients; the history features are looked up from the launch's Date and Core when present
+    required = [c for c in columns if c not in HISTORY_FEATURES]
+    batcher = MicroBatcher(score_batch,
+                           settings['max_batch_size'] if max_batch_size is None else max_batch_size,
+                           settings['max_wait_ms'] if max_wait_ms is None else max_wait_ms)
+    latency = LatencyRecorder()
+
+    app = Flask(__name__)
+    app.config['batcher'] = batcher
+
+    @app.post('/predict')
+    def predict():
+        start = time.perf_counter()
+        payload = request.get_json(silent=True)
+        launches = payload if isinstance(payload, list) else [payload]
+        if not launches or not all(isinstance(launch, dict) for launch in launches):
+            return jsonify(error="Expected a JSON object (or list of objects) of feature columns."), 400
+        missing = sorted({c for launch in launches for c in required if c not in launch})
+        if missing:
+            return jsonify(error=f"Missing feature columns: {', '.join(missing)}"), 400
+        try:
+            if isinstance(payload, list):
+                result = score_batch(launches)
+            else:
+                result = batcher.submit(payload).result(timeout=settings['request_timeout_s'])
+        except (ValueError, TypeError) as e:
+            return jsonify(error=str(e)), 400
+        except TimeoutError:
+            return jsonify(error="Scoring timed out."), 503
+        latency.record(time.perf_counter() - start)
+        return jsonify(result)
+
+    @app.get('/metrics')
+    def metrics():
+        sizes = list(batcher.batch_sizes)
+        summary = dict(latency.summary(), batches=len(sizes),
+                       mean_batch_size=round(float(np.mean(sizes)), 2) if sizes else None)
+        if request.args.get('reset'):
+            latency.reset()
+            batcher.batch_sizes.clear()
+        return jsonify(summary)
+
+    @app.get('/health')
+    def health():
+        return jsonify(status='ok', model=model_path, feature_columns=columns)
+
+    return app
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve landing-success predictions over HTTP.")
+    parser.add_argument('--model', default=None,
+                        help="Model file, or a compiled .npz model "
+                             "(default: the registry's production version, else models/best_model.pkl).")
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--max-batch-size', type=int, default=None)
+    parser.add_argument('--max-wait-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    config = load_config()
+    app = create_app(args.model, args.max_batch_size, args.max_wait_ms, config)
+    # One process; request threads wait on the shared batcher while it scores
+    app.run(host=args.host or config['serving']['host'], port=args.port or config['serving']['port'],
+            threaded=True)
@@ -0,0 +1,263 @@
+import base64
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.utils import artifact_path, load_config
+
+PARTITION_COLUMN = 'launch_year'
+SCHEMA_FILE = '_schema.json'  # Files starting with '_' are ignored by pyarrow datasets
+
+WIKI_COLUMNS = ['Flight No.', 'Date and time (UTC)', 'Version, Booster', 'Launch site', 'Payload',
+                'Payload mass', 'Orbit', 'Customer', 'Launch outcome', 'Booster landing', 'SourcePage']
+
+# Declared pandas dtypes for each artifact's key columns. Columns not listed
+# keep the type pyarrow stored for them.
+ARTIFACT_SCHEMAS = {
+    'raw_api_data': {
+        'id': 'string',
+        'flight_number': 'Int64',
+        'name': 'string',
+        'date_utc': 'string'
+    },
+    'raw_wiki_data': {column: 'string' for column in WIKI_COLUMNS},
+    # Compact dtypes: the wrangled frame is held resident by the dashboard and
+    # by every training worker. BoosterVersion holds near-unique mission names,
+    # for which a categorical would be larger than Arrow-backed strings.
+    'wrangled_data': {
+        'flight_number': 'int32',
+        'Date': 'datetime64[ns, UTC]',
+        'BoosterVersion': 'string',
+        'PayloadMass': 'float32',
+        'Orbit': 'category',
+        'LaunchSite': 'category',
+        'Outcome': 'boolean',
+        'Flights': 'Int8',  # Flights of one booster; nullable Int8 raises rather than wrapping past 127
+        'Core': 'string',
+        'GridFins': 'boolean',
+        'Reused': 'boolean',
+        'Legs': 'boolean',
+        'class': 'int8'
+    }
+}
+
+def apply_schema(dataframe, schema):
+    """
+    Casts the columns named in `schema` to their declared dtypes.
+
+    Args:
+        dataframe (pd.DataFrame): The data to cast.
+        schema (dict): Column name -> pandas dtype. Missing columns are ignored.
+
+    Returns:
+        pd.DataFrame: The cast data.
+    """
+    dtypes = {column: dtype for column, dtype in (schema or {}).items() if column in dataframe.columns}
+    return dataframe.astype(dtypes) if dtypes else dataframe
+
+def memory_footprint(dataframe):
+    """Returns the in-memory size of a DataFrame in bytes, including string contents."""
+    return int(dataframe.memory_usage(deep=True).sum())
+
+def compact_artifact(dataframe, name, verbose=True):
+    """
+    Casts an artifact to its declared compact schema and reports the memory saved.
+
+    Args:
+        dataframe (pd.DataFrame): The data to cast.
+        name (str): An artifact key of ARTIFACT_SCHEMAS.
+        verbose (bool): Print the footprint before and after.
+
+    Returns:
+        pd.DataFrame: The cast data.
+    """
+    before = memory_footprint(dataframe)
+    compact = apply_schema(dataframe, ARTIFACT_SCHEMAS.get(name))
+    if verbose:
+        after = memory_footprint(compact)
+        print(f"{name}: {before / 2**20:.2f} MiB -> {after / 2**20:.2f} MiB in memory "
+              f"({1 - after / before if before else 0:.0%} smaller)")
+    return compact
+
+def _is_nested(series):
+    sample = series.dropna().head(50)
+    return any(isinstance(value, (list, dict)) for value in sample)
+
+def _encode_nested(dataframe):
+    # Raw API records hold lists of dicts with varying keys, which Parquet cannot
+    # type consistently, so those columns are stored as JSON text.
+    json_columns = [c for c in dataframe.columns if dataframe[c].dtype == object and _is_nested(dataframe[c])]
+    if not json_columns:
+        return dataframe, []
+    encoded = dataframe.copy()
+    for column in json_columns:
+        encoded[column] = encoded[column].map(lambda v: None if v is None else json.dumps(v))
+    return encoded, json_columns
+
+def _decode_nested(dataframe, json_columns):
+    for column in json_columns:
+        if column in dataframe.columns:
+            dataframe[column] = dataframe[column].map(lambda v: json.loads(v) if isinstance(v, str) else None)
+    return dataframe
+
+def _launch_years(values):
+    dates = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+    return dates.dt.year.astype('Int64')
+
+def launch_years(first_year, last_year=None):
+    """
+    Returns the launch years from `first_year` to `last_year` inclusive, for the `years` filter of load_artifact.
+
+    Args:
+        first_year (int): The first year, or None for no year filter.
+        last_year (int): The last year. Defaults to the current year.
+
+    Returns:
+        list: The years, or None if `first_year` is None.
+    """
+    if first_year is None:
+        return None
+    last_year = last_year if last_year is not None else pd.Timestamp.now(tz='UTC').year
+    return list(range(int(first_year), int(last_year) + 1))
+
+def _read_sidecar(path):
+    sidecar = os.path.join(path, SCHEMA_FILE)
+    if not os.path.exists(sidecar):
+        return {'json_columns': [], 'date_column': None}
+    with open(sidecar, 'r') as f:
+        return json.load(f)
+
+def _encode_arrow_schema(schema):
+    return base64.b64encode(schema.remove_metadata().serialize().to_pybytes()).decode('ascii')
+
+def _decode_arrow_schema(text):
+    return pa.ipc.read_schema(pa.py_buffer(base64.b64decode(text)))
+
+def _conform_table(table, schema):
+    """Casts a table to `schema`, adding the columns it lacks as nulls."""
+    columns = [table[field.name].cast(field.type) if field.name in table.column_names
+               else pa.nulls(len(table), field.type) for field in schema]
+    return pa.Table.from_arrays(columns, schema=schema.with_metadata(table.schema.metadata))
+
+def save_parquet(dataframe, path, date_column=None, schema=None, partitions_only=False):
+    """
+    Saves a DataFrame as a Parquet dataset, partitioned by launch year.
+
+    Args:
+        dataframe (pd.DataFrame): The data to save.
+        path (str): The dataset directory.
+        date_column (str): Column holding the launch date. If None, the data is not partitioned.
+        schema (dict): Declared dtypes applied before writing.
+        partitions_only (bool): If True, only the year partitions present in
+            `dataframe` are replaced and other years are kept. Otherwise the
+            whole dataset is replaced.
+
+    The Arrow schema of the whole dataset is kept in its sidecar file. A
+    partial write is cast to it, widened with the batch's own columns, so
+    partitions written from different batches (where a column may be all
+    null, or missing) can still be read together.
+    """
+    if dataframe is None:
+        print("No data to save.")
+        return
+    data, json_columns = _encode_nested(apply_schema(dataframe, schema))
+    partition_cols = None
+    if date_column:
+        data = data.assign(**{PARTITION_COLUMN: _launch_years(data[date_column])})
+        partition_cols = [PARTITION_COLUMN]
+
+    if not partitions_only and os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    sidecar = _read_sidecar(path) if partitions_only else {'json_columns': []}
+    if sidecar.get('arrow_schema'):
+        stored = _decode_arrow_schema(sidecar['arrow_schema'])
+        table = _conform_table(table, pa.unify_schemas([stored, table.schema], promote_options='permissive'))
+    pq.write_to_dataset(table, path, partition_cols=partition_cols,
+                        existing_data_behavior='delete_matching' if partition_cols else 'overwrite_or_ignore')
+
+    file_schema = table.schema
+    if partition_cols:
+        file_schema = file_schema.remove(file_schema.get_field_index(PARTITION_COLUMN))
+    sidecar = {
+        'json_columns': sorted(set(sidecar['json_columns']) | set(json_columns)),
+        'date_column': date_column,
+        'arrow_schema': _encode_arrow_schema(file_schema)
+    }
+    with open(os.path.join(path, SCHEMA_FILE), 'w') as f:
+        json.dump(sidecar, f)
+    print(f"Data saved to {path}")
+
+def load_parquet(path, columns=None, years=None, filters=None, schema=None):
+    """
+    Loads a Parquet dataset written by save_parquet.
+
+    Only the requested columns are read, and year and row filters are pushed
+    down to pyarrow, so partitions and row groups that cannot match are skipped.
+
+    Args:
+        path (str): The dataset directory.
+        columns (list): Columns to read. Defaults to all columns.
+        years (list): Launch years to read. Defaults to all years.
+        filters (list): Extra pyarrow filters, e.g. [('Orbit', '=', 'LEO')].
+        schema (dict): Declared dtypes applied after reading.
+
+    Returns:
+        pd.DataFrame: The loaded data.
+    """
+    sidecar = _read_sidecar(path)
+    all_filters = list(filters or [])
+    if years is not None:
+        all_filters.append((PARTITION_COLUMN, 'in', [int(y) for y in years]))
+
+    partitioning = ds.partitioning(pa.schema([(PARTITION_COLUMN, pa.int32())]), flavor='hive')
+    dataset_schema = None
+    if sidecar.get('arrow_schema'):
+        # Older partitions are cast to the dataset schema as they are read
+        dataset_schema = _decode_arrow_schema(sidecar['arrow_schema'])
+        if sidecar.get('date_column'):
+            dataset_schema = dataset_schema.append(pa.field(PARTITION_COLUMN, pa.int32()))
+    table = pq.read_table(path, columns=columns, filters=all_filters or None, partitioning=partitioning,
+                          schema=dataset_schema)
+    dataframe = table.to_pandas()
+    if PARTITION_COLUMN in dataframe.columns and (columns is None or PARTITION_COLUMN not in columns):
+        dataframe = dataframe.drop(columns=PARTITION_COLUMN)
+    dataframe = _decode_nested(dataframe, sidecar['json_columns'])
+    return apply_schema(dataframe, schema)
+
+def save_artifact(dataframe, name, config=None, partitions_only=False):
+    """
+    Saves a pipeline artifact with its declared schema and year partitioning.
+
+    Args:
+        dataframe (pd.DataFrame): The data to save.
+        name (str): An artifact key from the `artifacts` section of config.yaml.
+        config (dict): The loaded config. Defaults to config/config.yaml.
+        partitions_only (bool): Replace only the years present in `dataframe`.
+    """
+    config = config or load_config()
+    date_column = config['artifacts'][name].get('date_column')
+    save_parquet(dataframe, artifact_path(name, config), date_column,
+                 ARTIFACT_SCHEMAS.get(name), partitions_only)
+
+def load_artifact(name, columns=None, years=None, filters=None, config=None):
+    """
+    Loads a pipeline artifact, reading only the columns and years requested.
+
+    Args:
+        name (str): An artifact key from the `artifacts` section of config.yaml.
+        columns (list): Columns to read. Defaults to all columns.
+        years (list): Launch years to read. Defaults to all years.
+        filters (list): Extra pyarrow filters.
+        config (dict): The loaded config. Defaults to config/config.yaml.
+
+    Returns:
+        pd.DataFrame: The loaded data.
+    """
+    config = config or load_config()
+    return load_parquet(artifact_path(name, config), columns, years, filters, ARTIFACT_SCHEMAS.get(name))
@@ -0,0 +1,212 @@
+import argparse
+import codecs
+import json
+import os
+import pandas as pd
+from src.http_client import DEFAULT_TIMEOUT, get_session
+from src.utils import artifact_path
+
+LAUNCHES_URL = "https://api.spacexdata.com/v4/launches"
+DEFAULT_CHUNK_SIZE = 20000  # Launch records per written and wrangled chunk; large enough to amortise pandas overhead
+READ_SIZE = 64 * 1024  # Bytes read from the response or file at a time
+
+_decoder = json.JSONDecoder()
+
+def _iter_text(source, read_size=READ_SIZE):
+    """Yields decoded text pieces from a file path, a binary/text file object or an iterable of chunks."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            yield from _iter_text(f, read_size)
+        return
+    if hasattr(source, 'read'):
+        f = source
+        source = iter(lambda: f.read(read_size), f.read(0))
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for piece in source:
+        yield decoder.decode(piece) if isinstance(piece, bytes) else piece
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def iter_json_array(source, read_size=READ_SIZE):
+    """
+    Parses a top-level JSON array incrementally, yielding one element at a time.
+
+    Only the unparsed remainder of the input is buffered, so memory is bounded
+    by the read size plus the largest single element, not the whole document.
+
+    Args:
+        source: A file path, a file object, or an iterable of bytes/str chunks
+                (e.g. requests' Response.iter_content).
+        read_size (int): Bytes read at a time from a path or file object.
+
+    Yields:
+        The decoded array elements, in order.
+
+    Raises:
+        ValueError: If the input is not a JSON array or is truncated.
+    """
+    pieces = _iter_text(source, read_size)
+    buffer, pos, exhausted = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, exhausted
+        piece = next(pieces, None)
+        if piece is None:
+            exhausted = True
+            return False
+        buffer = buffer[pos:] + piece
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ValueError("Expected a JSON array.")
+    pos += 1
+
+    expect_value = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError("Truncated JSON array.")
+        if buffer[pos] == ']':
+            return
+        if not expect_value:
+            if buffer[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {buffer[pos]!r}.")
+            pos += 1
+            expect_value = True
+            continue
+        try:
+            element, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            element, end = None, None
+        # An element ending exactly at the end of the buffer may be a number cut short
+        if end is None or (end == len(buffer) and not exhausted):
+            if not fill():
+                if end is None:
+                    raise ValueError("Truncated JSON array.")
+            continue
+        yield element
+        pos = end
+        expect_value = False
+
+def iter_record_chunks(records, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Groups an iterable of records into lists of at most `chunk_size`."""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def write_ndjson(records, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Writes records as newline-delimited JSON, one fixed-size chunk at a time.
+
+    The file is written next to `path` and moved into place once complete, so
+    an interrupted ingest never leaves a partial file behind.
+
+    Args:
+        records (iterable): The records to write, e.g. from iter_json_array.
+        path (str): The output .ndjson file.
+        chunk_size (int): Records buffered before each write.
+
+    Returns:
+        int: The number of records written.
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in iter_record_chunks(records, chunk_size):
+                f.write(''.join(json.dumps(record) + '\n' for record in chunk))
+                count += len(chunk)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    print(f"{count} records saved to {path}")
+    return count
+
+def read_ndjson_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Reads a newline-delimited JSON file back as a sequence of DataFrames.
+
+    Each chunk is flattened with pd.json_normalize like fetch_api's output and
+    indexed by record position in the file.
+
+    Args:
+        path (str): The .ndjson file.
+        chunk_size (int): Records per DataFrame.
+
+    Yields:
+        pd.DataFrame: The next chunk of at most `chunk_size` records.
+    """
+    start = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = (line for line in f if line.strip())
+        for chunk_lines in iter_record_chunks(lines, chunk_size):
+            # One decoder call per chunk instead of one per line
+            chunk = json.loads('[' + ','.join(chunk_lines) + ']')
+            frame = pd.json_normalize(chunk)
+            frame.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield frame
+
+def stream_launches(source=LAUNCHES_URL, path=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                    session=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Streams a launches JSON array from the API or a local file into NDJSON.
+
+    Unlike fetch_api.fetch_spacex_launch_data, the response is never loaded
+    whole: it is parsed as it is downloaded and written out in chunks, so large
+    merged histories and synthetic datasets can be ingested with flat memory use.
+
+    Args:
+        source (str): An http(s) URL returning a JSON array, or a local JSON file path.
+        path (str): The output .ndjson file. Defaults to ndjson_path('raw_api_data').
+        chunk_size (int): Records per written chunk.
+        session (requests.Session): Session for URLs. Defaults to the shared session.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        str: The path written.
+    """
+    path = path or ndjson_path('raw_api_data')
+    print(f"Streaming launches from {source}...")
+    if source.startswith(('http://', 'https://')):
+        session = session or get_session()
+        with session.get(source, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            write_ndjson(iter_json_array(response.iter_content(READ_SIZE)), path, chunk_size)
+    else:
+        write_ndjson(iter_json_array(source), path, chunk_size)
+    return path
+
+def ndjson_path(name, config=None):
+    """Returns the NDJSON file of a raw artifact, e.g. data/raw/spacex_api_data.ndjson."""
+    return f"{os.path.splitext(artifact_path(name, config))[0]}.ndjson"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stream the raw launch JSON into newline-delimited JSON.")
+    parser.add_argument('--source', default=LAUNCHES_URL, help="API URL or local JSON file holding a launches array.")
+    parser.add_argument('--out', default=None, help="Output .ndjson file (defaults to data/raw/spacex_api_data.ndjson).")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    stream_launches(args.source, args.out, args.chunk_size)
@@ -1,10 +1,177 @@
-from sklearn.model_selection import GridSearchCV
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.model_selection import (GridSearchCV, HalvingGridSearchCV, ParameterGrid, ParameterSampler,
+                                     RandomizedSearchCV, StratifiedKFold, check_cv)
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MaxAbsScaler, StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+import argparse
 import joblib
+from joblib import Memory
+import json
 import os
+import time
+import pandas as pd
+from src.eval import bootstrap_intervals, collect_predictions, evaluate_models, paired_tests
+from src.features import (HISTORY_INPUTS, CategoricalEncoder, history_features, history_state_path,
+                          save_history_state, split_data)
+from src.registry import registry_from_config
+from src.search_store import ResumableSearchCV, SearchResultStore
+from src.storage import launch_years, load_artifact
+from src.utils import encoder_path, load_config
 
-def tune_model(model, param_grid, X_train, y_train, cv=5, scoring='f1'):
+SEARCH_STRATEGIES = ('grid', 'random', 'halving')
+
+# The model families tuned by the training driver, by their name in model_params.yaml
+MODEL_CLASSES = {
+    'LogisticRegression': LogisticRegression,
+    'SGDClassifier': SGDClassifier,  # Logistic regression that can be updated with partial_fit (see retrain.py)
+    'SVM': SVC,
+    'DecisionTree': DecisionTreeClassifier,
+    'RandomForest': RandomForestClassifier
+}
+# Identifiers, and the landing outcome the target is derived from
+NON_FEATURE_COLUMNS = ['Date', 'BoosterVersion', 'Outcome', 'Core']
+# The wrangled columns the models are trained on
+FEATURE_COLUMNS = ['flight_number', 'PayloadMass', 'Orbit', 'LaunchSite', 'Flights', 'GridFins', 'Reused', 'Legs']
+# Scalers that can be tuned under `preprocessing` in model_params.yaml, by the class
+# each search instantiates (see make_scaler); None skips scaling
+SCALERS = {
+    'standard': StandardScaler,
+    'maxabs': MaxAbsScaler,
+    'none': None
+}
+
+def build_search(model, param_grid, search=None, cv=5, scoring='f1', n_jobs=-1, y=None, store=None, name=None):
     """
-    Performs hyperparameter tuning for a given model using GridSearchCV.
+    Creates the hyperparameter search object for a search strategy.
+
+    Args:
+        model: A scikit-learn classifier instance.
+        param_grid (dict): Parameter names -> lists of values to try.
+        search (dict): The model's entry under `search` in model_params.yaml:
+            strategy: 'grid' (exhaustive, the default), 'random' or 'halving'.
+            random:   n_iter, or max_fits (candidates x folds) to derive it from;
+                      random_state.
+            halving:  resource ('n_samples' or a parameter such as
+                      'n_estimators', which is then taken out of the grid),
+                      factor, min_resources, max_resources; random_state.
+        cv: Number of folds or a CV splitter.
+        scoring (str): Scoring metric to use for evaluation.
+        n_jobs (int): Parallel jobs of the search.
+        y: Training labels, used to count the folds of an integer `cv`.
+        store (SearchResultStore): If given, grid and random searches store
+            every fold score and skip the fits already stored (see
+            search_store.ResumableSearchCV). Halving searches are not
+            resumable, as each round depends on the one before.
+        name (str): The model's name in the store.
+
+    Returns:
+        A GridSearchCV, RandomizedSearchCV, HalvingGridSearchCV or ResumableSearchCV.
+    """
+    search = dict(search or {})
+    strategy = search.pop('strategy', 'grid')
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy {strategy!r}; expected one of {SEARCH_STRATEGIES}")
+    common = dict(estimator=model, cv=cv, scoring=scoring, n_jobs=n_jobs, verbose=1)
+
+    if strategy == 'grid':
+        if store is not None:
+            return ResumableSearchCV(model, list(ParameterGrid(param_grid)), store, cv, scoring, n_jobs, name)
+        return GridSearchCV(param_grid=param_grid, **common)
+
+    if strategy == 'random':
+        n_iter = search.get('n_iter')
+        if n_iter is None:
+            n_splits = check_cv(cv, y, classifier=True).get_n_splits()
+            n_iter = max(1, search.get('max_fits', 10 * n_splits) // n_splits)
+        if store is not None:
+            candidates = list(ParameterSampler(param_grid, n_iter, random_state=search.get('random_state')))
+            return ResumableSearchCV(model, candidates, store, cv, scoring, n_jobs, name)
+        return RandomizedSearchCV(param_distributions=param_grid, n_iter=n_iter,
+                                  random_state=search.get('random_state'), **common)
+
+    resource = search.get('resource', 'n_samples')
+    grid = dict(param_grid)
+    max_resources = search.get('max_resources', 'auto')
+    if resource != 'n_samples':
+        # The resource is grown by the search itself, so it cannot also be a grid dimension
+        values = grid.pop(resource, None)
+        if max_resources == 'auto' and values:
+            max_resources = max(values)
+    return HalvingGridSearchCV(param_grid=grid, resource=resource, factor=search.get('factor', 3),
+                               min_resources=search.get('min_resources', 'exhaust'), max_resources=max_resources,
+                               random_state=search.get('random_state'), **common)
+
+def search_record(name, search_cv, strategy, elapsed, scoring):
+    """Summarizes a finished search: its best score, the fits it took and its wall-clock time."""
+    n_splits = search_cv.n_splits_
+    return {
+        'model': name,
+        'strategy': strategy,
+        'scoring': scoring,
+        'best_score': float(search_cv.best_score_),
+        'best_params': search_cv.best_params_,
+        'candidates': len(search_cv.cv_results_['params']),
+        'fits': len(search_cv.cv_results_['params']) * n_splits,
+        'reused_fits': getattr(search_cv, 'n_reused_', 0),
+        'seconds': round(elapsed, 3),
+        'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+def append_search_log(log_path, record):
+    """Appends a search record to a JSON-lines log."""
+    directory = os.path.dirname(log_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(log_path, 'a') as f:
+        f.write(json.dumps(record, default=str) + '\n')
+    return record
+
+def search_log_path(config=None):
+    """Returns the search log file, e.g. models/search_log.jsonl."""
+    config = config or load_config()
+    return os.path.join(config['data_paths']['models'], config['data_files']['search_log'])
+
+def load_search_log(log_path):
+    """
+    Loads the search log written by tune_model, one row per search, to compare strategies.
+
+    Returns:
+        pd.DataFrame: The logged searches, empty if there are none.
+    """
+    if not os.path.exists(log_path):
+        return pd.DataFrame()
+    with open(log_path, 'r') as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
+
+def run_search(model, param_grid, X_train, y_train, cv=5, scoring='f1', search=None, name=None, n_jobs=-1,
+               store=None):
+    """
+    Fits a hyperparameter search and summarizes it.
+
+    Returns:
+        tuple: (the fitted search object, its search_record).
+    """
+    search_cv = build_search(model, param_grid, search, cv, scoring, n_jobs, y=y_train, store=store, name=name)
+
+    # Fit the search to the data
+    start = time.perf_counter()
+    search_cv.fit(X_train, y_train)
+    elapsed = time.perf_counter() - start
+
+    print(f"Best Parameters: {search_cv.best_params_}")
+    print(f"Best {scoring} Score on Validation Set: {search_cv.best_score_:.4f} ({elapsed:.1f} s)")
+    strategy = (search or {}).get('strategy', 'grid')
+    return search_cv, search_record(name or type(model).__name__, search_cv, strategy, elapsed, scoring)
+
+def tune_model(model, param_grid, X_train, y_train, cv=5, scoring='f1', search=None, name=None, log_path=None,
+               n_jobs=-1, store=None):
+    """
+    Performs hyperparameter tuning for a given model.
 
     Args:
         model: A scikit-learn classifier instance.
@@ -12,30 +179,27 @@ def tune_model(model, param_grid, X_train, y_train, cv=5, scoring='f1'):
                            parameter settings to try as values.
         X_train: Training features.
         y_train: Training labels.
-        cv (int): Number of cross-validation folds.
+        cv: Number of cross-validation folds, or precomputed (train, test) index pairs.
         scoring (str): Scoring metric to use for evaluation.
+        search (dict): Search strategy settings (see build_search). Defaults
+                       to an exhaustive GridSearchCV.
+        name (str): The model's name in the search log. Defaults to its class name.
+        log_path (str): If given, the best score and wall-clock time are
+                        appended to this JSON-lines file (see load_search_log).
+        n_jobs (int): Parallel jobs of the search; -1 uses all cores.
+        store (SearchResultStore): If given, every fold score is stored as it
+                                   finishes and fits already stored for the
+                                   same data are skipped (see build_search).
 
     Returns:
         A trained scikit-learn model with the best found hyperparameters.
     """
-    grid_search = GridSearchCV(
-        estimator=model,
-        param_grid=param_grid,
-        cv=cv,
-        scoring=scoring,
-        n_jobs=-1,  # Use all available cores
-        verbose=1
-    )
-    
-    # Fit the grid search to the data
-    grid_search.fit(X_train, y_train)
-    
-    print(f"Best Parameters: {grid_search.best_params_}")
-    print(f"Best {scoring} Score on Validation Set: {grid_search.best_score_:.4f}")
-    
-    return grid_search.best_estimator_
-
-def save_model(model, path, filename):
+    search_cv, record = run_search(model, param_grid, X_train, y_train, cv, scoring, search, name, n_jobs, store)
+    if log_path:
+        append_search_log(log_path, record)
+    return search_cv.best_estimator_
+
+def save_model(model, path, filename, encoder=None):
     """
     Saves a trained model to a file using joblib.
 
@@ -43,9 +207,273 @@ def save_model(model, path, filename):
         model: The trained model object to save.
         path (str): The directory path to save the model in.
         filename (str): The name of the file.
+        encoder: The fitted features.CategoricalEncoder the model was trained
+                 with. Saved next to the model (see utils.encoder_path) so
+                 batches can be encoded the same way at inference time.
     """
     if not os.path.exists(path):
         os.makedirs(path)
     filepath = os.path.join(path, filename)
     joblib.dump(model, filepath)
-    print(f"Model saved to {filepath}")
\ No newline at end of file
+    print(f"Model saved to {filepath}")
+    if encoder is not None:
+        joblib.dump(encoder, encoder_path(filepath))
+        print(f"Encoder saved to {encoder_path(filepath)}")
+
+def prepare_training_data(df, target='class'):
+    """
+    Selects the feature columns and target of the wrangled launches.
+
+    The categorical columns are left unencoded: the encoder is the first step
+    of the pipeline built by build_pipeline, so it is fitted inside each CV fold.
+
+    Returns:
+        tuple: (X, y).
+    """
+    X = df.drop(columns=[target] + [c for c in NON_FEATURE_COLUMNS if c in df])
+    return X, df[target].to_numpy()
+
+def training_window(launches, X_train):
+    """
+    Returns the registry.register arguments recording which launches a model
+    trained on `X_train` has seen: the latest launch date of `launches`, the
+    data it was split from, and the flight numbers of the training rows.
+    retrain validates updates of the model on the launches it has not seen.
+    """
+    return {'trained_through': launches['Date'].max(), 'trained_flights': X_train['flight_number']}
+
+def load_training_data(config=None, columns=()):
+    """
+    Loads the wrangled launches for training, reading only FEATURE_COLUMNS
+    and the target (plus `columns`), from the launch years set by
+    `training.first_year` and `training.last_year`.
+
+    Returns:
+        pd.DataFrame: The launches.
+    """
+    config = config or load_config()
+    training = config['training']
+    columns = list(dict.fromkeys(FEATURE_COLUMNS + [config['project_settings']['target_column']] + list(columns)))
+    return load_artifact('wrangled_data', columns=columns,
+                         years=launch_years(training.get('first_year'), training.get('last_year')), config=config)
+
+def make_scaler(name):
+    """Returns a new, unfitted scaler for a key of SCALERS, or 'passthrough' for 'none'."""
+    scaler_class = SCALERS[name]
+    return scaler_class() if scaler_class is not None else 'passthrough'
+
+def build_pipeline(model, scaler='standard', memory=None):
+    """
+    Chains the categorical encoder, a scaler and a model into one estimator.
+
+    Searching over the pipeline fits the encoder and scaler on the training
+    part of each CV fold only, and lets their settings be tuned with the model.
+
+    Args:
+        model: A scikit-learn classifier instance.
+        scaler (str): A key of SCALERS.
+        memory: A joblib.Memory or cache directory. Fitted transformers are
+                cached there, so candidates sharing the same preprocessing on
+                the same fold do not refit it.
+
+    Returns:
+        Pipeline: Steps 'encoder', 'scaler' and 'model'.
+    """
+    return Pipeline([
+        # Dense, so that the scaler can centre the features; uncentred, large
+        # columns such as flight_number make linear SVMs very slow to converge
+        ('encoder', CategoricalEncoder(sparse_output=False)),
+        ('scaler', make_scaler(scaler)),
+        ('model', model)
+    ], memory=memory)
+
+def pipeline_search_space(param_grid, preprocessing=None, search=None):
+    """
+    Maps a model's grid and search settings onto the pipeline's parameter names.
+
+    Args:
+        param_grid (dict): The model's grid from model_params.yaml.
+        preprocessing (dict): The model's entry under `preprocessing`, e.g.
+                              {'scaler': ['standard', 'maxabs']}.
+        search (dict): The model's search settings (see build_search).
+
+    Returns:
+        tuple: (pipeline param grid, search settings).
+    """
+    grid = {f"model__{name}": values for name, values in param_grid.items()}
+    for name, values in (preprocessing or {}).items():
+        grid[name] = [make_scaler(v) for v in values] if name == 'scaler' else values
+    search = dict(search or {})
+    if search.get('resource', 'n_samples') != 'n_samples':
+        search['resource'] = f"model__{search['resource']}"
+    return grid, search
+
+def make_cv_folds(y, n_splits=5, random_state=42):
+    """Computes stratified CV fold indices once, so every model is scored on the same folds."""
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return list(splitter.split(y, y))
+
+def plan_core_budget(n_models, n_jobs):
+    """
+    Splits a core budget between concurrent searches.
+
+    Models are tuned in separate processes, each search getting an equal share
+    of the cores, so the searches never ask for more cores than the budget
+    between them.
+
+    Args:
+        n_models (int): The number of models to tune.
+        n_jobs (int): The core budget; -1 for every core.
+
+    Returns:
+        tuple: (worker processes, n_jobs of each search).
+    """
+    budget = os.cpu_count() if n_jobs in (None, -1) else max(1, n_jobs)
+    workers = max(1, min(n_models, budget))
+    return workers, max(1, budget // workers)
+
+# Training data held by each worker process, sent once when the process starts
+_worker_data = {}
+
+def _init_worker(X, y, folds):
+    _worker_data.update(X=X, y=y, folds=folds)
+
+def _tune_one(name, param_grid, preprocessing, search, scoring, n_jobs, random_state, cache_dir, store_path):
+    model = MODEL_CLASSES[name]()
+    if 'random_state' in model.get_params():
+        model.set_params(random_state=random_state)
+    grid, search = pipeline_search_space(param_grid, preprocessing, search)
+    memory = Memory(cache_dir, verbose=0) if cache_dir else None
+    store = SearchResultStore(store_path) if store_path else None
+    try:
+        search_cv, record = run_search(build_pipeline(model, memory=memory), grid, _worker_data['X'],
+                                       _worker_data['y'], _worker_data['folds'], scoring, search, name, n_jobs, store)
+    finally:
+        if store is not None:
+            store.close()
+    # The saved model should not depend on the transformer cache
+    return name, search_cv.best_estimator_.set_params(memory=None), record
+
+def train_models(X_train, y_train, names=None, params=None, config=None, n_jobs=None, log_path=None):
+    """
+    Tunes every configured model on the same precomputed CV folds.
+
+    Each model is tuned as a pipeline of encoder, scaler and model (see
+    build_pipeline), with transformer fits cached in `training.cache_dir`.
+    Fold scores are kept in the `training.results_store` database, so an
+    interrupted run resumes, and a widened grid only fits its new candidates.
+    The models are tuned concurrently in a process pool sized by the
+    `training.n_jobs` core budget (see plan_core_budget).
+
+    Args:
+        X_train (pd.DataFrame): Unencoded training features (see prepare_training_data).
+        y_train: Training labels.
+        names (list): Models to tune. Defaults to `training.models`.
+        params (dict): The loaded model_params.yaml: a grid per model and
+                       optional `preprocessing` and `search` sections.
+        config (dict): The loaded config. Defaults to config/config.yaml.
+        n_jobs (int): Core budget. Defaults to `training.n_jobs`.
+        log_path (str): If given, each search is appended to this log (see load_search_log).
+
+    Returns:
+        dict: Model name -> (best estimator, search record), in the order of `names`.
+    """
+    config = config or load_config()
+    params = params or load_config('config/model_params.yaml')
+    training = config['training']
+    names = list(names or training['models'])
+    unknown = [name for name in names if name not in MODEL_CLASSES]
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(unknown)}")
+    random_state = config['project_settings']['random_state']
+    folds = make_cv_folds(y_train, training.get('cv_folds', 5), random_state)
+    workers, search_jobs = plan_core_budget(len(names), training.get('n_jobs', -1) if n_jobs is None else n_jobs)
+    print(f"Tuning {len(names)} models on {len(folds)} shared folds: {workers} processes x {search_jobs} cores")
+
+    cache_dir = training.get('cache_dir')
+    tasks = [(name, params.get(name, {}), params.get('preprocessing', {}).get(name), params.get('search', {}).get(name),
+              training.get('scoring', 'f1'), search_jobs, random_state, cache_dir, training.get('results_store'))
+             for name in names]
+    trained = {}
+    if workers == 1:
+        _init_worker(X_train, y_train, folds)
+        results = (_tune_one(*task) for task in tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X_train, y_train, folds))
+        results = (future.result() for future in as_completed([pool.submit(_tune_one, *task) for task in tasks]))
+    try:
+        for name, estimator, record in results:
+            print(f"[{name}] best {record['scoring']} {record['best_score']:.4f} in {record['seconds']:.1f} s")
+            trained[name] = (estimator, record)
+            if log_path:
+                append_search_log(log_path, record)
+    finally:
+        if workers > 1:
+            pool.shutdown(cancel_futures=True)
+    if cache_dir and training.get('cache_max_bytes'):
+        Memory(cache_dir, verbose=0).reduce_size(bytes_limit=training['cache_max_bytes'])
+    return {name: trained[name] for name in names}
+
+def compare_models(trained, X_test, y_test):
+    """
+    Tabulates each tuned model's search and its test set metrics.
+
+    Returns:
+        pd.DataFrame: One row per model, best test F1-Score first.
+    """
+    searches = pd.DataFrame([{'Model': name, 'Strategy': record['strategy'], 'Fits': record['fits'],
+                              'Search Seconds': record['seconds'], f"CV {record['scoring']}": record['best_score']}
+                             for name, (_, record) in trained.items()]).set_index('Model')
+    metrics = evaluate_models({name: model for name, (model, _) in trained.items()}, X_test, y_test)
+    return searches.join(metrics).sort_values('F1-Score', ascending=False, kind='stable')
+
+def comparison_path(config=None):
+    """Returns the model comparison table, e.g. models/model_comparison.csv."""
+    config = config or load_config()
+    return os.path.join(config['data_paths']['models'], config['data_files']['model_comparison'])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tune every configured model and save the best one.")
+    parser.add_argument('--models', nargs='+', default=None, help="Models to tune (default: training.models).")
+    parser.add_argument('--n-jobs', type=int, default=None, help="Core budget (default: training.n_jobs).")
+    args = parser.parse_args()
+
+    config = load_config()
+    settings = config['project_settings']
+    launches = load_training_data(config, columns=HISTORY_INPUTS)
+    history, history_state = history_features(launches)
+    X, y = prepare_training_data(launches.join(history), settings['target_column'])
+    X_train, X_test, y_train, y_test = split_data(X, y, settings['test_size'], settings['random_state'])
+
+    trained = train_models(X_train, y_train, args.models, config=config, n_jobs=args.n_jobs,
+                           log_path=search_log_path(config))
+    comparison = compare_models(trained, X_test, y_test)
+    print("--- Model Evaluation on Test Set ---")
+    print(comparison.to_string(float_format='{:.4f}'.format))
+    comparison.to_csv(comparison_path(config))
+    print(f"Comparison saved to {comparison_path(config)}")
+
+    # The test set is small: check which differences between the models stand out from its noise
+    evaluation = config['evaluation']
+    predictions, scores = collect_predictions({name: model for name, (model, _) in trained.items()}, X_test)
+    intervals = bootstrap_intervals(y_test, predictions, scores, evaluation['n_resamples'],
+                                    evaluation['confidence'], settings['random_state'])
+    tests = paired_tests(y_test, predictions, scores, evaluation['paired_metric'], evaluation['n_resamples'],
+                         evaluation['confidence'], settings['random_state'])
+    print(f"--- {evaluation['confidence']:.0%} bootstrap intervals ({evaluation['n_resamples']:,} resamples) ---")
+    print(intervals.xs(evaluation['paired_metric'], level='Metric').to_string(float_format='{:.4f}'.format))
+    print(f"--- Paired tests of {evaluation['paired_metric']} ---")
+    print(tests.to_string(index=False, float_format='{:.4f}'.format))
+    models_dir = config['data_paths']['models']
+    intervals.to_csv(os.path.join(models_dir, config['data_files']['metric_intervals']))
+    tests.to_csv(os.path.join(models_dir, config['data_files']['paired_tests']), index=False)
+
+    best_name = comparison.index[0]
+    print(f"The best performing model is: {best_name}")
+    best_model = trained[best_name][0]
+    save_model(best_model, config['data_paths']['models'], 'best_model.pkl', best_model.named_steps['encoder'])
+    # Scoring looks up the history features of new launches in the state as of the training launches
+    save_history_state(history_state, history_state_path(config))
+    registry_from_config(config).register(best_model, config['registry']['model_name'],
+                                          metrics=comparison.loc[best_name].to_dict(), X=X_train, y=y_train,
+                                          **training_window(launches, X_train))
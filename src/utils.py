@@ -1,3 +1,4 @@
+import os
 import yaml
 import joblib
 
@@ -14,6 +15,25 @@ def load_config(filepath='config/config.yaml'):
     with open(filepath, 'r') as f:
         return yaml.safe_load(f)
 
+def artifact_path(name, config=None):
+    """
+    Returns the Parquet dataset directory of a pipeline artifact.
+
+    The directory is the artifact's stage folder from `data_paths` plus the
+    stem of its file name in `data_files`, e.g. data/raw/spacex_api_data.parquet.
+
+    Args:
+        name (str): An artifact key from the `artifacts` section of config.yaml.
+        config (dict): The loaded config. Defaults to config/config.yaml.
+
+    Returns:
+        str: The dataset directory.
+    """
+    config = config or load_config()
+    stage = config['artifacts'][name]['stage']
+    stem = os.path.splitext(config['data_files'][name])[0]
+    return os.path.join(config['data_paths'][stage], f"{stem}.parquet")
+
 def load_model(filepath):
     """
     Loads a model from a file using joblib.
@@ -25,4 +45,20 @@ def load_model(filepath):
         The loaded model object.
     """
     print(f"Loading model from {filepath}")
-    return joblib.load(filepath)
\ No newline at end of file
+    return joblib.load(filepath)
+
+def encoder_path(model_filepath):
+    """Returns where the categorical encoder of a saved model is stored, e.g. models/rf.encoder.joblib."""
+    return f"{os.path.splitext(model_filepath)[0]}.encoder.joblib"
+
+def load_encoder(model_filepath):
+    """
+    Loads the categorical encoder saved alongside a model.
+
+    Args:
+        model_filepath (str): The path to the model file.
+
+    Returns:
+        The fitted features.CategoricalEncoder.
+    """
+    return joblib.load(encoder_path(model_filepath))
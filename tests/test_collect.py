@@ -0,0 +1,61 @@
+import time
+import pandas as pd
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.collect import collect_spacex_data, payload_map_from_lookup
+
+RESPONSES = {
+    'launches': [{
+        'id': 'l1', 'flight_number': 1, 'rocket': 'r1', 'launchpad': 'lp1',
+        'payloads': ['p1', 'p2'], 'cores': [{'core': 'c1', 'landing_success': True}]
+    }, {
+        'id': 'l2', 'flight_number': 2, 'rocket': 'r1', 'launchpad': 'lp2',
+        'payloads': [], 'cores': [{'core': None, 'landing_success': None}]
+    }],
+    'payloads': [{'id': 'p1', 'mass_kg': 500, 'orbit': 'LEO'}, {'id': 'p2', 'mass_kg': 10, 'orbit': 'GTO'}],
+    'launchpads': [{'id': 'lp1', 'name': 'CCSFS SLC 40'}],
+    'cores': [{'id': 'c1', 'serial': 'B1049'}],
+    'rockets': [{'id': 'r1', 'name': 'Falcon 9'}]
+}
+
+def slow_fetch(url):
+    """Pretends every endpoint takes 0.2s to respond."""
+    time.sleep(0.2)
+    return RESPONSES[url.rsplit('/', 1)[-1]]
+
+def test_collect_spacex_data_runs_concurrently():
+    """Tests that all five endpoints are fetched in parallel, not one after another."""
+    start = time.perf_counter()
+    tables = collect_spacex_data(fetch=slow_fetch)
+    elapsed = time.perf_counter() - start
+
+    assert set(tables) == {'launches', 'payloads', 'launchpads', 'cores', 'rockets'}
+    assert elapsed < 0.6
+
+def test_collect_spacex_data_joins_lookups():
+    """Tests that launch IDs are resolved through the lookup tables."""
+    launches = collect_spacex_data(fetch=lambda url: RESPONSES[url.rsplit('/', 1)[-1]])['launches']
+
+    # Test 1: IDs on the first launch are resolved
+    first = launches.iloc[0]
+    assert first['payload_mass_kg'] == 500
+    assert first['payload_orbit'] == 'LEO'
+    assert first['launchpad_name'] == 'CCSFS SLC 40'
+    assert first['core_serial'] == 'B1049'
+    assert first['rocket_name'] == 'Falcon 9'
+
+    # Test 2: Missing or unknown IDs resolve to nulls
+    second = launches.iloc[1]
+    assert pd.isna(second['payload_mass_kg'])
+    assert pd.isna(second['launchpad_name'])
+    assert pd.isna(second['core_serial'])
+
+def test_payload_map_from_lookup():
+    """Tests conversion to the mapping used by clean_api_data."""
+    payloads = collect_spacex_data(endpoints=('launches', 'payloads'),
+                                   fetch=lambda url: RESPONSES[url.rsplit('/', 1)[-1]])['payloads']
+    assert payload_map_from_lookup(payloads)['p2'] == {'mass_kg': 10, 'orbit': 'GTO'}
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from src.compiled import compile_model, load_compiled
+from src.predict import predict_file
+from src.storage import ARTIFACT_SCHEMAS, apply_schema
+from src.train import build_pipeline, prepare_training_data
+
+@pytest.fixture
+def launches():
+    """Wrangled launches with missing payload masses and landing-gear flags."""
+    rng = np.random.default_rng(4)
+    n = 300
+    orbit = rng.choice(['LEO', 'GTO', 'ISS'], n)
+    mass = rng.normal(6000, 2500, n)
+    mass[rng.random(n) < 0.1] = np.nan
+    legs = pd.array(rng.random(n) < 0.8, dtype='boolean')
+    legs[rng.random(n) < 0.05] = pd.NA
+    return apply_schema(pd.DataFrame({
+        'flight_number': np.arange(1, n + 1),
+        'Date': pd.date_range('2015-01-01', periods=n, freq='7D', tz='UTC'),
+        'BoosterVersion': [f"Mission {i}" for i in range(n)],
+        'PayloadMass': mass,
+        'Orbit': orbit,
+        'LaunchSite': rng.choice(['s1', 's2'], n),
+        'Outcome': rng.random(n) < 0.7,
+        'Flights': rng.integers(1, 6, n),
+        'GridFins': rng.random(n) < 0.8,
+        'Reused': rng.random(n) < 0.5,
+        'Legs': legs,
+        'Core': [f"core-{i % 40}" for i in range(n)],
+        'class': ((np.nan_to_num(mass) < 7000) & (orbit != 'GTO')).astype(int)
+    }), ARTIFACT_SCHEMAS['wrangled_data'])
+
+MODELS = [
+    (DecisionTreeClassifier(max_depth=6, random_state=0), 'none'),
+    (RandomForestClassifier(n_estimators=25, random_state=0), 'none'),
+    (LogisticRegression(max_iter=1000), 'standard'),
+    (SGDClassifier(loss='log_loss', random_state=0), 'maxabs')
+]
+
+@pytest.mark.parametrize('model, scaler', MODELS, ids=lambda m: type(m).__name__ if not isinstance(m, str) else m)
+def test_compiled_model_matches_the_pipeline_exactly(launches, model, scaler):
+    X, y = prepare_training_data(launches)
+    if isinstance(model, (LogisticRegression, SGDClassifier)):
+        X['PayloadMass'] = X['PayloadMass'].fillna(X['PayloadMass'].mean())  # Linear models reject NaN
+    pipeline = build_pipeline(model, scaler=scaler).fit(X, y)
+    compiled = compile_model(pipeline)
+
+    X_new = X.copy()
+    X_new.loc[X_new.index[:5], 'Orbit'] = np.nan  # Missing and unseen categories encode as all zeros
+    X_new['LaunchSite'] = X_new['LaunchSite'].cat.add_categories(['s9'])
+    X_new.loc[X_new.index[5:10], 'LaunchSite'] = 's9'
+    for batch in (X_new.head(50), pd.concat([X_new] * 5)):  # Small and large batches take different paths
+        np.testing.assert_array_equal(compiled.predict_proba(batch), pipeline.predict_proba(batch))
+        np.testing.assert_array_equal(compiled.predict(batch), pipeline.predict(batch))
+
+def test_single_launch_dicts(launches):
+    X, y = prepare_training_data(launches)
+    pipeline = build_pipeline(RandomForestClassifier(n_estimators=10, random_state=0), scaler='none').fit(X, y)
+    compiled = compile_model(pipeline)
+    for i in range(30):
+        row = {k: None if v is pd.NA or v != v else v for k, v in X.iloc[i].items()}
+        np.testing.assert_array_equal(compiled.predict_proba(row), pipeline.predict_proba(X.iloc[[i]]))
+
+def test_save_and_load(launches, tmp_path):
+    X, y = prepare_training_data(launches.dropna(subset=['PayloadMass']))
+    pipeline = build_pipeline(LogisticRegression(max_iter=1000)).fit(X, y)
+    path = str(tmp_path / 'compiled.npz')
+    compile_model(pipeline).save(path)
+    loaded = load_compiled(path)
+    np.testing.assert_array_equal(loaded.predict_proba(X), pipeline.predict_proba(X))
+    assert list(loaded.feature_names_in_) == list(X.columns)
+
+    with pytest.raises(ValueError, match='NaN'):  # As LogisticRegression itself raises
+        loaded.predict_proba(prepare_training_data(launches)[0])
+
+def test_compiled_model_scores_files(launches, tmp_path):
+    X, y = prepare_training_data(launches)
+    pipeline = build_pipeline(DecisionTreeClassifier(random_state=0), scaler='none').fit(X, y)
+    model_path, input_path = str(tmp_path / 'compiled.npz'), str(tmp_path / 'launches.parquet')
+    compile_model(pipeline).save(model_path)
+    launches.to_parquet(input_path)
+    predict_file(model_path, input_path, str(tmp_path / 'scored.parquet'), chunk_size=100)
+    scored = pd.read_parquet(tmp_path / 'scored.parquet')
+    np.testing.assert_array_equal(scored['probability'], pipeline.predict_proba(X)[:, 1])
+
+def test_unsupported_models_are_rejected(launches):
+    X, y = prepare_training_data(launches)
+    with pytest.raises(ValueError, match='SVC'):
+        compile_model(build_pipeline(SVC(kernel='linear')).fit(X, y))
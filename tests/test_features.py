@@ -7,7 +7,12 @@ import os
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.features import create_features, split_and_scale_data
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression
+from src.features import (CategoricalEncoder, create_features, history_features, load_history_state,
+                          lookup_history_features, save_history_state, split_and_scale_data)
+from src.train import save_model
+from src.utils import load_encoder, load_model
 
 @pytest.fixture
 def sample_clean_dataframe():
@@ -40,6 +45,11 @@ def test_create_features(sample_clean_dataframe):
     # Test 3: The number of rows should remain unchanged
     assert len(features_df) == len(sample_clean_dataframe)
 
+    # Test 4: Indicator columns stay sparse, storing only the ones
+    assert features_df['Orbit_LEO'].dtype == pd.SparseDtype(np.uint8, 0)
+    assert features_df['Orbit_LEO'].sparse.density == 2 / 3
+    assert features_df['PayloadMass'].tolist() == [500, 8000, 500]
+
 def test_split_and_scale_data(sample_clean_dataframe):
     """Tests the data splitting and scaling logic."""
     features_df = create_features(sample_clean_dataframe)
@@ -59,4 +69,97 @@ def test_split_and_scale_data(sample_clean_dataframe):
     assert np.all(np.isclose(X_train.mean(axis=0), 0))
 
     # Test 3: Check if the scaled training data has a standard deviation close to 1
-    assert np.all(np.isclose(X_train.std(axis=0), 1))
\ No newline at end of file
+    assert np.all(np.isclose(X_train.std(axis=0), 1))
+
+def test_encoder_frozen_vocabulary(sample_clean_dataframe):
+    """Tests that batches with missing or unseen categories encode to the training columns."""
+    encoder = CategoricalEncoder().fit(sample_clean_dataframe.drop(columns='class'))
+    names = list(encoder.get_feature_names_out())
+    assert names[:2] == ['PayloadMass', 'Flights']
+    assert 'Reused_True' in names and 'Orbit_GTO' in names
+
+    batch = pd.DataFrame({'Orbit': ['ISS', None], 'LaunchSite': ['VAFB', 'VAFB'], 'GridFins': [True, True],
+                          'Reused': [True, False], 'Legs': [False, True], 'PayloadMass': [1.5, 2.0], 'Flights': [3, 1]})
+    matrix = encoder.transform(batch)
+    assert sp.isspmatrix_csr(matrix)
+    assert matrix.shape == (2, len(names))
+    row = dict(zip(names, matrix.toarray()[0]))
+    assert row['PayloadMass'] == 1.5 and row['Flights'] == 3
+    assert row['Orbit_GTO'] == 0 and row['Orbit_LEO'] == 0  # Unseen 'ISS' is all zeros
+    assert row['LaunchSite_VAFB'] == 1 and row['Reused_True'] == 1 and row['Legs_False'] == 1
+
+    with pytest.raises(ValueError):
+        CategoricalEncoder(handle_unknown='error').fit(sample_clean_dataframe).transform(batch)
+
+    dense = CategoricalEncoder(sparse_output=False).fit(sample_clean_dataframe.drop(columns='class')).transform(batch)
+    assert isinstance(dense, np.ndarray)
+    np.testing.assert_array_equal(dense, matrix.toarray())
+
+def test_create_features_with_fitted_encoder(sample_clean_dataframe):
+    """Tests that encoding a single-row batch with the training encoder keeps every training column."""
+    encoder = CategoricalEncoder(remainder='drop')
+    train_features = create_features(sample_clean_dataframe, encoder)
+    batch_features = create_features(sample_clean_dataframe.iloc[[1]], encoder)
+    assert list(batch_features.columns) == list(train_features.columns)
+    # Row selection upcasts sparse uint8 columns to int64 in pandas, so compare in the batch's dtypes
+    pd.testing.assert_frame_equal(batch_features, train_features.iloc[[1]].astype(batch_features.dtypes))
+
+def test_encoder_saved_alongside_model(sample_clean_dataframe, tmp_path):
+    X = sample_clean_dataframe.drop(columns='class')
+    encoder = CategoricalEncoder().fit(X)
+    model = LogisticRegression().fit(encoder.transform(X), sample_clean_dataframe['class'])
+    save_model(model, str(tmp_path), 'model.joblib', encoder=encoder)
+
+    loaded_model = load_model(str(tmp_path / 'model.joblib'))
+    loaded_encoder = load_encoder(str(tmp_path / 'model.joblib'))
+    np.testing.assert_array_equal(loaded_model.predict(loaded_encoder.transform(X)), model.predict(encoder.transform(X)))
+
+@pytest.fixture
+def launch_history():
+    """Wrangled launches with repeated sites and cores, one of them undated."""
+    return pd.DataFrame({
+        'flight_number': [1, 2, 3, 4, 5, 6],
+        'Date': pd.to_datetime(['2020-01-01', '2020-01-11', '2020-01-05', '2020-02-01', '2020-02-03', None], utc=True),
+        'LaunchSite': ['CCAFS', 'CCAFS', 'VAFB', 'CCAFS', 'VAFB', 'CCAFS'],
+        'BoosterVersion': ['F9', 'F9', 'F9', 'FH', 'F9', 'F9'],
+        'Core': ['c1', 'c2', 'c1', 'c1', None, 'c2'],
+        'class': [1, 0, 1, 1, 0, 1]
+    }, index=[10, 11, 12, 13, 14, 15])
+
+def test_history_features_use_only_earlier_launches(launch_history):
+    features, state = history_features(launch_history)
+
+    # Launch order is 1, 3, 2, 4, 5 by date, then the undated launch 6
+    assert features['SitePriorSuccessRate'].tolist() == [0.5, 2 / 3, 0.5, 2 / 4, 2 / 3, 3 / 5]
+    # Keyed on the core, not on BoosterVersion; a launch without a core gets the prior
+    assert features['BoosterPriorSuccessRate'].tolist() == [0.5, 0.5, 2 / 3, 3 / 4, 0.5, 1 / 3]
+    assert features['DaysSinceSiteLaunch'].tolist() == [-1, 10, -1, 21, 29, -1]
+    assert features['CoreFlightCount'].tolist() == [1, 1, 2, 3, 1, 2]
+    assert state['cores'] == {'c1': [3, 3], 'c2': [1, 0]}  # The undated launch does not update the state
+    assert state['last_launch'].startswith('2020-02-03')
+
+def test_history_features_append_matches_full_pass(launch_history, tmp_path):
+    """Tests that appending new launches to a saved state gives the same features as one full pass."""
+    dated = launch_history.dropna(subset=['Date']).sort_values('Date')
+    expected, expected_state = history_features(dated)
+
+    first, state = history_features(dated.iloc[:3])
+    save_history_state(state, str(tmp_path / 'state.json'))
+    rest, final_state = history_features(dated.iloc[3:], load_history_state(str(tmp_path / 'state.json')))
+    pd.testing.assert_frame_equal(pd.concat([first, rest]), expected)
+    assert final_state == expected_state
+
+    with pytest.raises(ValueError):
+        history_features(dated.iloc[:1], final_state)  # Earlier than the stored history
+
+def test_lookup_history_features_match_appending(launch_history):
+    """A launch to be scored gets the features it would get if it were appended to the history."""
+    dated = launch_history.dropna(subset=['Date']).sort_values('Date')
+    _, state = history_features(dated.iloc[:4])
+    upcoming = dated.iloc[4:].assign(Core=['c1'])
+    appended, _ = history_features(upcoming, state)
+    pd.testing.assert_frame_equal(lookup_history_features(upcoming.drop(columns=['class', 'flight_number']), state),
+                                  appended)
+
+    unknown = pd.DataFrame({'Date': [pd.NaT], 'LaunchSite': ['LC-39A'], 'Core': [None]})
+    assert lookup_history_features(unknown, state).iloc[0].tolist() == [0.5, 0.5, -1.0, 1]
@@ -0,0 +1,130 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import fetch_api
+from src.fetch_api import get_sync_watermark, merge_launch_records, sync_spacex_launch_data
+from src.reference_store import ReferenceStore
+from src.storage import load_parquet, save_parquet
+
+@pytest.fixture
+def paged_api(monkeypatch):
+    """Serves launches 3-5 through a fake paginated query endpoint, two per page."""
+    launches = [
+        {'id': f'l{n}', 'flight_number': n, 'date_utc': f'2020-01-0{n}T00:00:00.000Z'}
+        for n in range(1, 6)
+    ]
+    calls = []
+
+    def fake_request_json(url, method='GET', json_body=None, **kwargs):
+        calls.append(json_body)
+        watermark = json_body['query']['$or'][0]['flight_number']['$gt']
+        docs = [l for l in launches if l['flight_number'] > watermark]
+        page, limit = json_body['options']['page'], json_body['options']['limit']
+        chunk = docs[(page - 1) * limit: page * limit]
+        has_next = page * limit < len(docs)
+        return {'docs': chunk, 'hasNextPage': has_next, 'nextPage': page + 1 if has_next else None}
+
+    monkeypatch.setattr(fetch_api, 'request_json', fake_request_json)
+    return calls
+
+def test_get_sync_watermark():
+    """Tests that the watermark is the newest flight number and date."""
+    df = pd.DataFrame({'flight_number': [1, 3, 2],
+                       'date_utc': ['2020-01-01', '2020-01-03', '2020-01-02']})
+    assert get_sync_watermark(df) == {'flight_number': 3, 'date_utc': '2020-01-03', 'pending_ids': []}
+    assert get_sync_watermark(None) == {'flight_number': None, 'date_utc': None, 'pending_ids': []}
+
+def test_sync_watermark_skips_unsettled_launches():
+    """Tests that upcoming launches stay out of the watermark and, with unsettled ones, are pending."""
+    df = pd.DataFrame({'id': ['a', 'b', 'c'], 'flight_number': [1, 2, 3],
+                       'date_utc': ['2020-01-01', '2020-01-02', '2099-01-01'],
+                       'upcoming': [False, False, True], 'success': [True, None, None]})
+    assert get_sync_watermark(df) == {'flight_number': 2, 'date_utc': '2020-01-02', 'pending_ids': ['b', 'c']}
+
+def test_merge_launch_records_deduplicates():
+    """Tests that refreshed launches replace their stored copy."""
+    existing = pd.DataFrame({'id': ['a', 'b'], 'flight_number': [1, 2], 'success': [True, None]})
+    new = pd.DataFrame({'id': ['b', 'c'], 'flight_number': [2, 3], 'success': [False, True]})
+    merged = merge_launch_records(existing, new)
+
+    assert merged['id'].tolist() == ['a', 'b', 'c']
+    assert merged.loc[1, 'success'] == False
+
+def test_sync_fetches_only_new_launches(tmp_path, paged_api):
+    """Tests that sync pages through only the launches newer than the store."""
+    store = str(tmp_path / 'launches.parquet')
+    existing = pd.DataFrame({'id': ['l1', 'l2'], 'flight_number': [1, 2],
+                             'date_utc': ['2020-01-01T00:00:00.000Z', '2020-01-02T00:00:00.000Z'],
+                             'cores': [[{'core': 'c1'}], [{'core': 'c2'}]]})
+    save_parquet(existing, store, date_column='date_utc')
+
+    new = sync_spacex_launch_data(store, page_size=2)
+
+    # Test 1: Only flights 3-5 were fetched, over two pages
+    assert new['flight_number'].tolist() == [3, 4, 5]
+    assert len(paged_api) == 2
+
+    # Test 2: The raw store now holds the merged history, nested columns included
+    stored = load_parquet(store).sort_values('flight_number')
+    assert stored['flight_number'].tolist() == [1, 2, 3, 4, 5]
+    assert stored['cores'].iloc[0] == [{'core': 'c1'}]
+
+    # Test 3: A second sync finds nothing new and does not rewrite the store
+    again = sync_spacex_launch_data(store, page_size=2)
+    assert again.empty
+    assert len(paged_api) == 3
+
+def test_sync_settles_pending_launches(tmp_path, monkeypatch):
+    """Tests that launches stored as upcoming or without an outcome are fetched again until they settle."""
+    store = str(tmp_path / 'launches.parquet')
+    api = {
+        'l1': {'id': 'l1', 'flight_number': 1, 'date_utc': '2020-01-01T00:00:00.000Z', 'upcoming': False, 'success': True},
+        'l2': {'id': 'l2', 'flight_number': 2, 'date_utc': '2020-01-02T00:00:00.000Z', 'upcoming': False, 'success': None},
+        'l3': {'id': 'l3', 'flight_number': 3, 'date_utc': '2020-06-01T00:00:00.000Z', 'upcoming': True, 'success': None}
+    }
+    save_parquet(pd.DataFrame(list(api.values())), store, date_column='date_utc')
+    fetch_api.save_sync_state(get_sync_watermark(pd.DataFrame(list(api.values()))), store)
+
+    def matches(doc, condition):
+        (field, test), = condition.items()
+        return doc[field] > test['$gt'] if '$gt' in test else doc[field] in test['$in']
+
+    def fake_request_json(url, method='GET', json_body=None, **kwargs):
+        docs = [d for d in api.values() if any(matches(d, c) for c in json_body['query']['$or'])]
+        return {'docs': docs, 'hasNextPage': False}
+
+    monkeypatch.setattr(fetch_api, 'request_json', fake_request_json)
+    # l2 gets its outcome; l3 flies earlier than scheduled, before the newest flown launch's date
+    api['l2'] = dict(api['l2'], success=False)
+    api['l3'] = dict(api['l3'], date_utc='2020-01-03T00:00:00.000Z', upcoming=False, success=True)
+    api['l4'] = {'id': 'l4', 'flight_number': 4, 'date_utc': '2020-01-04T00:00:00.000Z', 'upcoming': False,
+                 'success': True}
+
+    new = sync_spacex_launch_data(store)
+    assert sorted(new['id']) == ['l2', 'l3', 'l4']
+    stored = load_parquet(store).set_index('id')
+    assert stored.loc['l2', 'success'] == False
+    assert stored.loc['l3', 'success'] == True
+    assert fetch_api.load_sync_state(store) == {'flight_number': 4, 'date_utc': '2020-01-04T00:00:00.000Z',
+                                                'pending_ids': []}
+
+def test_full_download_fills_the_reference_store(tmp_path):
+    """Tests that a full download resolves the launches and stores the reference data it fetched."""
+    responses = {
+        'launches': [{'id': 'l1', 'flight_number': 1, 'payloads': ['p1'], 'cores': [{'core': 'c1'}]}],
+        'payloads': [{'id': 'p1', 'mass_kg': 500, 'orbit': 'LEO'}],
+        'launchpads': [],
+        'cores': [{'id': 'c1', 'serial': 'B1049', 'block': 5, 'reuse_count': 3}],
+        'rockets': []
+    }
+    with ReferenceStore(str(tmp_path / 'reference.db')) as store:
+        launches = fetch_api.fetch_spacex_launch_data(store=store, fetch=lambda url: responses[url.rsplit('/', 1)[-1]])
+        assert launches.loc[0, 'core_serial'] == 'B1049'
+        assert store.lookup('payloads', ['p1']).loc[0, 'mass_kg'] == 500
+        assert store.lookup('cores', ['c1']).loc[0, 'serial'] == 'B1049'
+        assert store.refresh(fetch=lambda url: pytest.fail("fresh collections were fetched again")) == []
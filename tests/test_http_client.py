@@ -0,0 +1,96 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.http_client import get_session, request_json, clear_memory_cache
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves a fixed JSON document with an ETag and honours If-None-Match."""
+    body = json.dumps([{'id': 'p1', 'mass_kg': 20}]).encode('utf-8')
+    etag = '"v1"'
+    hits = []
+
+    def do_GET(self):
+        StubHandler.hits.append(self.headers.get('If-None-Match'))
+        if self.path == '/broken':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub_server():
+    """Runs the stub API on a free local port for the duration of a test."""
+    StubHandler.hits = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    clear_memory_cache()
+
+def test_request_json_revalidates_with_etag(stub_server, tmp_path):
+    """Tests that a stale entry is revalidated and a 304 reuses the cached payload."""
+    url = f"{stub_server}/payloads"
+
+    first = request_json(url, cache_dir=str(tmp_path))
+    clear_memory_cache()  # Force the second call to read the on-disk entry
+    second = request_json(url, cache_dir=str(tmp_path))
+
+    # Test 1: Both calls return the same decoded payload
+    assert first == second == [{'id': 'p1', 'mass_kg': 20}]
+
+    # Test 2: The second request was conditional on the stored ETag
+    assert StubHandler.hits == [None, '"v1"']
+
+def test_request_json_fresh_hit_skips_network(stub_server, tmp_path):
+    """Tests that entries within max_age are served without any request."""
+    url = f"{stub_server}/payloads"
+    request_json(url, cache_dir=str(tmp_path), max_age=60)
+    request_json(url, cache_dir=str(tmp_path), max_age=60)
+
+    assert len(StubHandler.hits) == 1
+
+def test_request_json_raises_without_cache(stub_server, tmp_path):
+    """Tests that HTTP errors propagate when there is nothing cached."""
+    with pytest.raises(requests.exceptions.HTTPError):
+        request_json(f"{stub_server}/broken", cache_dir=str(tmp_path))
+
+def test_request_json_warns_when_serving_a_stale_copy(stub_server, tmp_path):
+    """Tests that a failed revalidation falls back to the cached payload with a warning."""
+    class FailingSession:
+        def request(self, *args, **kwargs):
+            raise requests.exceptions.ConnectionError('offline')
+
+    url = f"{stub_server}/payloads"
+    request_json(url, cache_dir=str(tmp_path))
+    with pytest.warns(UserWarning, match='stale cached copy'):
+        assert request_json(url, cache_dir=str(tmp_path), session=FailingSession()) == [{'id': 'p1', 'mass_kg': 20}]
+
+def test_each_thread_gets_its_own_session():
+    """Tests that pooled threads do not share a session, and each thread reuses its own."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        sessions = list(pool.map(lambda _: get_session(), range(2)))
+    assert get_session() is get_session()
+    assert get_session() not in sessions
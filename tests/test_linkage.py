@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.linkage import fill_from_wiki, link_launches, parse_wiki_fields
+from src.wrangle import clean_api_data
+
+@pytest.fixture
+def api_launches():
+    """Cleaned API launches before imputation, covering each linkage pass."""
+    return pd.DataFrame({
+        'flight_number': [18, 86, 87, 111, 112, 200],
+        'Date': pd.to_datetime(['2015-01-10T09:47:00Z', '2020-01-07T02:19:00Z', '2020-01-07T23:00:00Z',
+                                '2021-03-04T08:24:00Z', '2021-06-06T04:26:00Z', '2022-01-01T00:00:00Z'], utc=True),
+        'BoosterVersion': ['CRS-5', 'Starlink-2 (v1.0)', 'GPS III SV03', 'Starlink-17', 'SXM-8', 'Unlisted'],
+        'PayloadMass': [np.nan, 15600.0, np.nan, np.nan, np.nan, np.nan],
+        'Orbit': [None, None, 'MEO', None, None, None],
+        'Outcome': [None, True, None, None, None, None],
+        'core_serial': [None, None, None, 'B1049', None, None]
+    }, index=[10, 11, 12, 13, 14, 15])
+
+@pytest.fixture
+def wiki_rows():
+    """Scraped Wikipedia rows for the same launches, in the page's header spelling."""
+    return pd.DataFrame({
+        'Flight No.': ['13', '76', '77', '102', '103'],
+        'Date and time (UTC)': ['10 January 2015 09:47', '7 January 2020 02:19', '7 January 2020 23:00',
+                                '4 March 2021 08:24', '5 June 2021 04:26'],
+        'Version, Booster': ['F9 v1.1 B1012', 'F9 B5 B1049.4', 'F9 B5 B1060.1', 'F9 B5 B1049.8', 'F9 B5 B1061.3'],
+        'Launch site': ['CCAFS SLC-40'] * 5,
+        'Payload': ['SpaceX CRS-5', 'Starlink 2 v1.0 (60 satellites)', 'GPS III-3 (SV03)', 'Starlink Group 17', 'SXM-8'],
+        'Payload mass': ['2,395 kg (5,280 lb)', '15,600 kg', '4,311 kg', '~15,600 kg', '7,000 kg'],
+        'Orbit': ['LEO (ISS)', 'LEO', 'MEO', 'LEO', 'GTO'],
+        'Customer': ['NASA', 'SpaceX', 'USSF', 'SpaceX', 'Sirius XM'],
+        'Launch outcome': ['Success'] * 5,
+        'Booster landing': ['Failure (drone ship)', 'Success (drone ship)', 'No attempt', 'Success (drone ship)',
+                            'Success (drone ship)']
+    })
+
+def test_link_launches_passes_and_coverage(api_launches, wiki_rows):
+    matches, report = link_launches(api_launches, wiki_rows)
+    linked = dict(zip(matches['api_row'], matches['wiki_row']))
+    passes = dict(zip(matches['api_row'], matches['pass']))
+
+    assert linked == {10: 0, 11: 1, 12: 2, 13: 3, 14: 4}
+    assert passes[13] == 'date_booster'
+    assert passes[10] == 'date'
+    assert passes[14] == 'adjacent_date'  # Logged a day apart
+    assert report['matched'] == 5
+    assert report['api_coverage'] == pytest.approx(5 / 6)
+    assert report['wiki_coverage'] == 1.0
+
+def test_parse_wiki_fields(wiki_rows):
+    parsed = parse_wiki_fields(wiki_rows)
+    assert parsed['PayloadMass'].tolist() == [2395.0, 15600.0, 4311.0, 15600.0, 7000.0]
+    assert parsed['Orbit'].tolist() == ['ISS', 'LEO', 'MEO', 'LEO', 'GTO']
+    assert parsed['Outcome'].tolist() == [False, True, None, True, True]
+
+def test_fill_from_wiki_only_fills_gaps(api_launches, wiki_rows):
+    filled, report = fill_from_wiki(api_launches, wiki_rows, verbose=False)
+
+    assert filled.loc[10, 'PayloadMass'] == 2395.0
+    assert filled.loc[10, 'Orbit'] == 'ISS'
+    assert filled.loc[10, 'Outcome'] == False
+    assert filled.loc[11, 'PayloadMass'] == 15600.0  # Present in the API, kept
+    assert filled.loc[12, 'Orbit'] == 'MEO'
+    assert pd.isna(filled.loc[12, 'Outcome'])  # No landing attempt on Wikipedia either
+    assert pd.isna(filled.loc[15, 'PayloadMass'])  # Unmatched
+    assert report['filled'] == {'PayloadMass': 4, 'Orbit': 4, 'Outcome': 3}
+
+def test_oversized_blocks_are_skipped():
+    """Tests that a block too large to compare is reported rather than compared pair by pair."""
+    n = 20
+    api = pd.DataFrame({'flight_number': range(n), 'Date': pd.Timestamp('2020-01-01', tz='UTC'),
+                        'BoosterVersion': [f"Mission {i}" for i in range(n)]})
+    wiki = pd.DataFrame({'Flight No.': [str(i) for i in range(n)], 'Date and time (UTC)': '1 January 2020',
+                         'Version, Booster': 'F9', 'Payload': [f"Mission {i}" for i in range(n)]})
+    matches, report = link_launches(api, wiki)
+    assert matches.empty
+    assert report['oversized_blocks'] == 1
+
+def test_clean_api_data_fills_from_wiki(wiki_rows):
+    raw = pd.DataFrame({
+        'flight_number': [18],
+        'name': ['CRS-5'],
+        'date_utc': ['2015-01-10T09:47:00.000Z'],
+        'launchpad': ['lp1'],
+        'payloads': [[{'mass_kg': None, 'orbit': None}]],
+        'cores': [[{'flight': 1, 'gridfins': True, 'legs': True, 'reused': False, 'landing_success': None}]]
+    })
+    cleaned = clean_api_data(raw, wiki=wiki_rows)
+    assert cleaned.loc[0, 'PayloadMass'] == 2395.0
+    assert cleaned.loc[0, 'Orbit'] == 'ISS'
+    assert cleaned.loc[0, 'class'] == 0
+    assert 'core_serial' not in cleaned.columns
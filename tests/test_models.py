@@ -1,5 +1,6 @@
 import pytest
 import numpy as np
+import time
 from sklearn.linear_model import LogisticRegression
 import sys
 import os
@@ -7,7 +8,11 @@ import os
 # Add the project root to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.eval import evaluate_model
+from sklearn.metrics import (accuracy_score, confusion_matrix, f1_score, matthews_corrcoef, precision_score,
+                             recall_score, roc_auc_score)
+from sklearn.tree import DecisionTreeClassifier
+from src.eval import (bootstrap_intervals, bootstrap_metrics, compare_predictions, confusion_matrices,
+                      evaluate_model, evaluate_models, mcnemar_tests, paired_tests, roc_auc, update_comparison_doc)
 
 def test_evaluate_model():
     """A simple smoke test for the evaluate_model function."""
@@ -81,4 +86,108 @@ def test_load_config(create_test_config):
     # Test 2: Check if the content is loaded correctly from the temp file
     assert config['data_paths']['raw'] == 'data/raw'
     assert config['project_settings']['target_column'] == 'class'
-    assert config['project_settings']['random_state'] == 42
\ No newline at end of file
+    assert config['project_settings']['random_state'] == 42
+
+def test_confusion_matrices_match_sklearn():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 500)
+    y_pred = rng.integers(0, 2, (4, 500))
+    matrices = confusion_matrices(y_true, y_pred)
+    for predictions, matrix in zip(y_pred, matrices):
+        np.testing.assert_array_equal(matrix, confusion_matrix(y_true, predictions, labels=[0, 1]))
+
+def test_compare_predictions_matches_sklearn_metrics():
+    rng = np.random.default_rng(1)
+    y_true = rng.integers(0, 2, 300)
+    scores = {f"model {i}": np.round(rng.random(300) * 0.6 + y_true * 0.3 * i, 1) for i in range(3)}  # Ties
+    predictions = {name: (score > 0.5).astype(int) for name, score in scores.items()}
+    table = compare_predictions(y_true, predictions, scores)
+    for name in scores:
+        row, y_pred = table.loc[name], predictions[name]
+        assert row['Accuracy'] == pytest.approx(accuracy_score(y_true, y_pred))
+        assert row['Precision'] == pytest.approx(precision_score(y_true, y_pred, zero_division=0))
+        assert row['Recall'] == pytest.approx(recall_score(y_true, y_pred))
+        assert row['F1-Score'] == pytest.approx(f1_score(y_true, y_pred))
+        assert row['Specificity'] == pytest.approx(recall_score(y_true, y_pred, pos_label=0))
+        assert row['MCC'] == pytest.approx(matthews_corrcoef(y_true, y_pred))
+        assert row['ROC-AUC'] == pytest.approx(roc_auc_score(y_true, scores[name]))
+
+def test_degenerate_predictions_score_zero_not_nan():
+    table = compare_predictions([0, 1, 1, 0], {'never': [0, 0, 0, 0]})
+    assert table.loc['never', 'Precision'] == 0.0
+    assert table.loc['never', 'MCC'] == 0.0
+    assert np.isnan(table.loc['never', 'ROC-AUC'])  # No scores given
+    assert np.isnan(roc_auc([1, 1, 1], [0.2, 0.5, 0.9])).all()  # A single class
+
+def test_evaluate_models_and_comparison_doc(tmp_path):
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(200, 3))
+    y = (X[:, 0] + 0.5 * rng.normal(size=200) > 0).astype(int)
+    models = {'Logistic Regression': LogisticRegression().fit(X, y),
+              'Decision Tree': DecisionTreeClassifier(max_depth=2, random_state=0).fit(X, y)}
+    table = evaluate_models(models, X, y)
+    assert list(table.index) == list(models)
+    assert table.loc['Decision Tree', 'F1-Score'] == pytest.approx(evaluate_model(models['Decision Tree'], X, y)['F1-Score'])
+
+    doc = tmp_path / 'model_comparison.md'
+    doc.write_text("# Comparison\n\n## Evaluation Metrics\n\nIntro.\n\n| Model | Accuracy |\n| --- | --- |\n"
+                   "| **Old** | 0.5 |\n|\n\n## Analysis\n\nHand-written notes.\n")
+    update_comparison_doc(table, str(doc))
+    text = doc.read_text()
+    assert '**Old**' not in text and '| **Logistic Regression** |' in text and 'ROC-AUC' in text
+    assert 'Intro.' in text and text.endswith('## Analysis\n\nHand-written notes.\n')
+
+def test_bootstrap_resamples_match_compare_predictions():
+    rng = np.random.default_rng(3)
+    y_true = rng.integers(0, 2, 60)
+    scores = {f"model {i}": rng.random(60) * 0.7 + y_true * 0.3 for i in range(2)}
+    predictions = {name: (score > 0.5).astype(int) for name, score in scores.items()}
+    distributions = bootstrap_metrics(y_true, predictions, scores, n_resamples=5, random_state=7)
+    indices = np.random.default_rng(7).integers(0, 60, (5, 60))  # The resamples bootstrap_metrics draws
+    for r, index in enumerate(indices):
+        table = compare_predictions(y_true[index], {n: p[index] for n, p in predictions.items()},
+                                    {n: s[index] for n, s in scores.items()})
+        for metric, values in distributions.items():
+            np.testing.assert_allclose(values[:, r], table[metric].to_numpy())
+
+def test_bootstrap_intervals_cover_the_estimate():
+    rng = np.random.default_rng(4)
+    y_true = rng.integers(0, 2, 90)
+    predictions = {f"model {i}": np.where(rng.random(90) < 0.8, y_true, 1 - y_true) for i in range(4)}
+    intervals = bootstrap_intervals(y_true, predictions, n_resamples=2000)
+    assert len(intervals) == 4 * 7
+    assert intervals.xs('ROC-AUC', level='Metric')['CI Lower'].isna().all()  # No scores given
+    intervals = intervals.dropna()
+    assert (intervals['CI Lower'] <= intervals['Estimate']).all()
+    assert (intervals['Estimate'] <= intervals['CI Upper']).all()
+
+def test_mcnemar_counts_disagreements():
+    y_true = np.array([1, 1, 1, 0, 0, 0, 1, 0])
+    predictions = {'a': np.array([1, 1, 1, 0, 0, 0, 0, 1]),
+                   'b': np.array([0, 1, 0, 0, 1, 0, 1, 0]),
+                   'c': np.array([1, 1, 1, 0, 0, 0, 0, 1])}
+    table = mcnemar_tests(y_true, predictions).set_index(['Model A', 'Model B'])
+    assert table.loc[('a', 'b'), ['Only A Right', 'Only B Right']].tolist() == [3, 2]
+    assert table.loc[('a', 'b'), 'McNemar p'] == pytest.approx(1.0)  # 2 * P(X <= 2), X ~ Binomial(5, 1/2)
+    assert table.loc[('a', 'c'), 'McNemar p'] == 1.0  # Identical models
+
+def test_paired_tests_separate_a_better_model():
+    rng = np.random.default_rng(5)
+    y_true = rng.integers(0, 2, 200)
+    predictions = {'good': np.where(rng.random(200) < 0.95, y_true, 1 - y_true),
+                   'poor': np.where(rng.random(200) < 0.6, y_true, 1 - y_true),
+                   'poor again': np.where(rng.random(200) < 0.6, y_true, 1 - y_true)}
+    table = paired_tests(y_true, predictions, metric='Accuracy', n_resamples=2000).set_index(['Model A', 'Model B'])
+    better = table.loc[('good', 'poor')]
+    assert better['Accuracy Difference'] > 0 and better['CI Lower'] > 0
+    assert better['Bootstrap p'] < 0.01 and better['McNemar p'] < 0.01
+    assert table.loc[('poor', 'poor again'), 'Bootstrap p'] > 0.05
+
+def test_bootstrap_of_four_models_is_fast():
+    rng = np.random.default_rng(6)
+    y_true = rng.integers(0, 2, 90)
+    scores = {f"model {i}": rng.random(90) * 0.6 + y_true * 0.4 for i in range(4)}
+    predictions = {name: (score > 0.5).astype(int) for name, score in scores.items()}
+    start = time.perf_counter()
+    bootstrap_metrics(y_true, predictions, scores, n_resamples=10_000)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import pytest
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.pipeline import module_sources, run_pipeline
+
+@pytest.fixture
+def pipeline_config(tmp_path):
+    """A two-stage pipeline writing its artifacts under tmp_path."""
+    return {
+        'data_paths': {'raw': str(tmp_path / 'raw'), 'interim': str(tmp_path / 'interim')},
+        'data_files': {'raw_api_data': 'api.json', 'wrangled_data': 'clean.csv'},
+        'artifacts': {'raw_api_data': {'stage': 'raw'}, 'wrangled_data': {'stage': 'interim'}},
+        'pipeline': {
+            'state_file': str(tmp_path / 'state.json'),
+            'stages': {
+                'fetch_api': {'module': 'src.fetch_api', 'outputs': ['raw_api_data'], 'config': ['data_files']},
+                'wrangle': {'module': 'src.wrangle', 'inputs': ['raw_api_data'], 'outputs': ['wrangled_data'],
+                            'config': ['data_files']}
+            }
+        }
+    }
+
+class FakeRunner:
+    """Records which modules ran and writes their outputs."""
+
+    def __init__(self, tmp_path):
+        self.tmp_path = tmp_path
+        self.calls = []
+        self.api_payload = 'v1'
+
+    def __call__(self, module, args):
+        self.calls.append(module)
+        if module == 'src.fetch_api':
+            path = self.tmp_path / 'raw' / 'api.parquet'
+            payload = self.api_payload
+        else:
+            path = self.tmp_path / 'interim' / 'clean.parquet'
+            payload = (self.tmp_path / 'raw' / 'api.parquet' / 'part-0').read_text() + ' cleaned'
+        path.mkdir(parents=True, exist_ok=True)
+        (path / 'part-0').write_text(payload)
+
+def test_module_sources_follow_src_imports():
+    sources = module_sources('src.wrangle')
+    assert os.path.join('src', 'wrangle.py') in sources
+    assert os.path.join('src', 'linkage.py') in sources
+    assert os.path.join('src', 'scrape_wiki.py') in sources  # Imported by linkage
+
+def test_unchanged_stages_are_cache_hits(pipeline_config, tmp_path):
+    runner = FakeRunner(tmp_path)
+    assert run_pipeline(config=pipeline_config, runner=runner) == {'fetch_api': 'miss', 'wrangle': 'miss'}
+    assert run_pipeline(config=pipeline_config, runner=runner) == {'fetch_api': 'hit', 'wrangle': 'hit'}
+    assert runner.calls == ['src.fetch_api', 'src.wrangle']
+
+    assert run_pipeline(['wrangle'], force=True, config=pipeline_config, runner=runner) == {'wrangle': 'miss'}
+
+def test_changed_inputs_config_and_outputs_rerun(pipeline_config, tmp_path):
+    runner = FakeRunner(tmp_path)
+    run_pipeline(config=pipeline_config, runner=runner)
+
+    # Upstream rewritten with identical content (new mtime): still a hit
+    runner('src.fetch_api', [])
+    assert run_pipeline(config=pipeline_config, runner=runner) == {'fetch_api': 'hit', 'wrangle': 'hit'}
+
+    # New upstream content invalidates the downstream stage
+    runner.api_payload = 'v2'
+    runner('src.fetch_api', [])
+    runner.calls.clear()
+    assert run_pipeline(['wrangle'], config=pipeline_config, runner=runner) == {'wrangle': 'miss'}
+    assert runner.calls == ['src.wrangle']
+
+    # A change to a stage's config section
+    pipeline_config['data_files']['extra'] = 'x'
+    assert run_pipeline(['wrangle'], config=pipeline_config, runner=runner) == {'wrangle': 'miss'}
+
+    # A deleted output
+    (tmp_path / 'interim' / 'clean.parquet' / 'part-0').unlink()
+    assert run_pipeline(['wrangle'], config=pipeline_config, runner=runner) == {'wrangle': 'miss'}
+
+    state = json.loads((tmp_path / 'state.json').read_text())
+    assert set(state['stages']) == {'fetch_api', 'wrangle'}
+
+def test_changed_input_files_rerun(pipeline_config, tmp_path):
+    """Refreshed reference data invalidates the stage that reads it."""
+    reference_db = tmp_path / 'reference.db'
+    reference_db.write_text('payloads v1')
+    pipeline_config['pipeline']['stages']['wrangle']['files'] = [str(reference_db)]
+    runner = FakeRunner(tmp_path)
+    run_pipeline(config=pipeline_config, runner=runner)
+    assert run_pipeline(['wrangle'], config=pipeline_config, runner=runner) == {'wrangle': 'hit'}
+
+    reference_db.write_text('payloads v2')
+    assert run_pipeline(['wrangle'], config=pipeline_config, runner=runner) == {'wrangle': 'miss'}
+
+def test_stages_writing_plain_files(pipeline_config, tmp_path):
+    """Stages such as train write files that are not artifacts; those are checked like outputs."""
+    model_file = tmp_path / 'models' / 'best_model.pkl'
+
+    def runner(module, args):
+        model_file.parent.mkdir(exist_ok=True)
+        model_file.write_text('model')
+
+    pipeline_config['pipeline']['stages'] = {
+        'train': {'module': 'src.train', 'output_files': [str(model_file)], 'config': ['data_files']}}
+    assert run_pipeline(config=pipeline_config, runner=runner) == {'train': 'miss'}
+    assert run_pipeline(config=pipeline_config, runner=runner) == {'train': 'hit'}
+    model_file.write_text('edited by hand')
+    assert run_pipeline(config=pipeline_config, runner=runner) == {'train': 'miss'}
+
+def test_max_age_and_unknown_stages(pipeline_config, tmp_path):
+    runner = FakeRunner(tmp_path)
+    pipeline_config['pipeline']['stages']['fetch_api']['max_age'] = 0
+    run_pipeline(config=pipeline_config, runner=runner)
+    assert run_pipeline(['fetch_api'], config=pipeline_config, runner=runner) == {'fetch_api': 'miss'}
+
+    with pytest.raises(ValueError):
+        run_pipeline(['report'], config=pipeline_config, runner=runner)
@@ -0,0 +1,113 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+from src.features import history_features, lookup_history_features
+from src.predict import feature_columns, iter_input_chunks, predict_file, score_chunk
+from src.storage import ARTIFACT_SCHEMAS, apply_schema
+from src.train import build_pipeline, prepare_training_data
+
+@pytest.fixture
+def launches():
+    rng = np.random.default_rng(2)
+    n = 250
+    orbit = rng.choice(['LEO', 'GTO', 'ISS'], n)
+    mass = rng.normal(6000, 2500, n)
+    return pd.DataFrame({
+        'flight_number': np.arange(1, n + 1),
+        'Date': pd.date_range('2015-01-01', periods=n, freq='7D', tz='UTC'),
+        'BoosterVersion': [f"Mission {i}" for i in range(n)],
+        'PayloadMass': mass,
+        'Orbit': orbit,
+        'LaunchSite': rng.choice(['s1', 's2'], n),
+        'Outcome': rng.random(n) < 0.7,
+        'Flights': rng.integers(1, 6, n),
+        'GridFins': rng.random(n) < 0.8,
+        'Reused': rng.random(n) < 0.5,
+        'Legs': rng.random(n) < 0.8,
+        'Core': [f"core-{i % 40}" for i in range(n)],
+        'class': ((mass < 7000) & (orbit != 'GTO')).astype(int)
+    })
+
+@pytest.fixture
+def model_path(launches, tmp_path):
+    X, y = prepare_training_data(launches)
+    pipeline = build_pipeline(RandomForestClassifier(n_estimators=10, random_state=0), scaler='none').fit(X, y)
+    path = str(tmp_path / 'model.joblib')
+    joblib.dump(pipeline, path)
+    return path
+
+def test_score_chunk_matches_the_pipeline(launches):
+    X, y = prepare_training_data(launches)
+    pipeline = build_pipeline(LogisticRegression(max_iter=1000)).fit(X, y)
+    scored = score_chunk(pipeline, launches, feature_columns(pipeline))
+    assert list(scored.columns) == ['flight_number', 'BoosterVersion', 'Date', 'probability', 'prediction']
+    np.testing.assert_allclose(scored['probability'], pipeline.predict_proba(X)[:, 1])
+    np.testing.assert_array_equal(scored['prediction'], pipeline.predict(X))
+
+def test_score_chunk_without_predict_proba(launches):
+    X, y = prepare_training_data(launches)
+    pipeline = build_pipeline(SVC(kernel='linear')).fit(X, y)
+    scored = score_chunk(pipeline, launches, feature_columns(pipeline))
+    assert scored['probability'].isna().all()
+    np.testing.assert_array_equal(scored['prediction'], pipeline.predict(X))
+
+def test_missing_feature_columns_are_reported(launches, model_path):
+    model = joblib.load(model_path)
+    with pytest.raises(ValueError, match='Orbit'):
+        score_chunk(model, launches.drop(columns=['Orbit']), feature_columns(model))
+
+def test_chunks_only_read_the_requested_columns(launches, tmp_path):
+    path = str(tmp_path / 'launches.parquet')
+    launches.to_parquet(path)
+    chunks = list(iter_input_chunks(path, ['flight_number', 'Orbit'], chunk_size=100))
+    assert [len(c) for c in chunks] == [100, 100, 50]
+    assert list(chunks[0].columns) == ['flight_number', 'Orbit']
+    assert chunks[2].index[0] == 200
+
+@pytest.mark.parametrize('input_name, output_name', [('launches.csv', 'scored.csv'),
+                                                     ('launches.parquet', 'scored.parquet')])
+def test_predict_file_in_chunks_matches_one_pass(launches, model_path, tmp_path, input_name, output_name):
+    input_path, output_path = str(tmp_path / input_name), str(tmp_path / output_name)
+    if input_name.endswith('.csv'):
+        launches.to_csv(input_path, index=False)
+    else:
+        launches.to_parquet(input_path)
+
+    assert predict_file(model_path, input_path, output_path, chunk_size=60) == len(launches)
+    scored = pd.read_csv(output_path) if output_name.endswith('.csv') else pd.read_parquet(output_path)
+    expected = joblib.load(model_path).predict_proba(prepare_training_data(launches)[0])[:, 1]
+    np.testing.assert_array_equal(scored['flight_number'], launches['flight_number'])
+    np.testing.assert_allclose(scored['probability'], expected)
+    assert not os.path.exists(f"{output_path}.tmp")
+
+def test_process_pool_keeps_the_input_order(launches, model_path, tmp_path):
+    input_path = str(tmp_path / 'launches.parquet')
+    launches.to_parquet(input_path)
+    predict_file(model_path, input_path, str(tmp_path / 'one.parquet'), chunk_size=40, workers=1)
+    predict_file(model_path, input_path, str(tmp_path / 'two.parquet'), chunk_size=40, workers=2)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / 'one.parquet'), pd.read_parquet(tmp_path / 'two.parquet'))
+
+def test_history_features_are_looked_up_for_new_launches(launches, tmp_path):
+    """A model trained with history features scores launches that only carry the wrangled columns."""
+    seen, upcoming = launches.iloc[:200], launches.iloc[200:]
+    history, state = history_features(seen)
+    X, y = prepare_training_data(seen.join(history))
+    model = build_pipeline(LogisticRegression(max_iter=1000)).fit(X, y)
+    model_path, input_path = str(tmp_path / 'model.joblib'), str(tmp_path / 'upcoming.parquet')
+    joblib.dump(model, model_path)
+    upcoming.to_parquet(input_path)
+
+    predict_file(model_path, input_path, str(tmp_path / 'scored.parquet'), chunk_size=20, history_state=state)
+    upcoming = apply_schema(upcoming, ARTIFACT_SCHEMAS['wrangled_data'])  # As the file is read
+    expected = model.predict_proba(prepare_training_data(upcoming.join(lookup_history_features(upcoming, state)))[0])
+    np.testing.assert_allclose(pd.read_parquet(tmp_path / 'scored.parquet')['probability'], expected[:, 1])
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.reference_store import ReferenceStore
+from src.wrangle import clean_api_data, clean_api_data_apply
+
+PAYLOADS = [{'id': 'p1', 'mass_kg': 500, 'orbit': 'LEO'}, {'id': 'p2', 'mass_kg': 8000, 'orbit': 'GTO'}]
+
+@pytest.fixture
+def store(tmp_path):
+    """A reference store on a temporary SQLite file, pre-loaded with two payloads."""
+    with ReferenceStore(str(tmp_path / 'reference.db')) as store:
+        store.replace('payloads', PAYLOADS)
+        yield store
+
+def test_lookup_aligns_with_input(store):
+    """Tests that bulk lookups keep the input order, duplicates and nulls."""
+    ids = pd.Series(['p2', None, 'p1', 'p2', 'missing'], index=[10, 11, 12, 13, 14])
+    result = store.lookup('payloads', ids, ['mass_kg', 'orbit'])
+
+    assert result.index.tolist() == [10, 11, 12, 13, 14]
+    assert result['orbit'].tolist()[0] == 'GTO'
+    assert result['mass_kg'].tolist()[2:4] == [500, 8000]
+    assert result.iloc[[1, 4]].isna().all().all()
+
+def test_refresh_respects_ttl(store):
+    """Tests that fresh collections are not re-downloaded and stale ones are."""
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return PAYLOADS[:1]
+
+    assert store.refresh(['payloads'], fetch=fetch) == []
+    assert store.refresh(['payloads'], ttl=0, fetch=fetch) == ['payloads']
+    assert len(calls) == 1
+    assert store.lookup('payloads', ['p2'])['mass_kg'].isna().all()
+
+def test_refresh_failure_on_empty_collection_raises(store):
+    """Tests that a failed first load is reported instead of returning nothing."""
+    def failing_fetch(url):
+        raise ConnectionError("offline")
+
+    with pytest.raises(RuntimeError):
+        store.refresh(['cores'], fetch=failing_fetch)
+    # Stored payloads survive a failed refresh
+    assert store.refresh(['payloads'], ttl=0, fetch=failing_fetch) == []
+    assert store.lookup('payloads', ['p1'])['mass_kg'].tolist() == [500]
+
+def test_clean_api_data_uses_store(store):
+    """Tests that clean_api_data resolves payload IDs through the store offline."""
+    raw = pd.DataFrame({
+        'flight_number': [1, 2],
+        'name': ['A', 'B'],
+        'date_utc': ['2020-01-01T00:00:00.000Z', '2020-02-01T00:00:00.000Z'],
+        'launchpad': ['lp1', 'lp1'],
+        'payloads': [['p2'], ['p1', 'p2']],
+        'cores': [[{'landing_success': True}], [{'landing_success': False}]]
+    })
+    cleaned = clean_api_data(raw, store=store)
+
+    assert cleaned['PayloadMass'].tolist() == [8000, 500]
+    assert cleaned['Orbit'].tolist() == ['GTO', 'LEO']
+    pd.testing.assert_frame_equal(cleaned, clean_api_data_apply(raw, store=store))
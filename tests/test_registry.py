@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.linear_model import LogisticRegression
+from src.registry import ModelRegistry
+from src.train import build_pipeline
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    n = 60
+    X = pd.DataFrame({
+        'PayloadMass': rng.normal(6000, 2000, n),
+        'Flights': rng.integers(1, 5, n),
+        'Orbit': rng.choice(['LEO', 'GTO'], n),
+        'LaunchSite': rng.choice(['s1', 's2'], n),
+        'GridFins': rng.random(n) < 0.8,
+        'Reused': rng.random(n) < 0.5,
+        'Legs': rng.random(n) < 0.8
+    })
+    return X, (X['PayloadMass'] < 6000).astype(int).to_numpy()
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / 'registry'))
+
+def fitted(training_data, C=1.0):
+    return build_pipeline(LogisticRegression(C=C)).fit(*training_data)
+
+def test_register_versions_and_aliases(registry, training_data):
+    X, y = training_data
+    assert registry.register(fitted(training_data), 'landing', {'F1-Score': 0.8}, X, y) == 1
+    assert registry.register(fitted(training_data, C=0.1), 'landing', {'F1-Score': 0.9}, X, y) == 2
+
+    assert registry.versions('landing') == [1, 2]
+    assert registry.aliases('landing') == {'latest': 2, 'production': 1}  # First version becomes production
+    assert registry.resolve('landing', 'v0002') == registry.resolve('landing', '2') == 2
+
+    registry.set_alias('landing', 'production', 'latest')
+    assert registry.resolve('landing', 'production') == 2
+    with pytest.raises(KeyError):
+        registry.resolve('landing', 'staging')
+    with pytest.raises(KeyError):
+        registry.resolve('landing', 7)
+
+def test_metadata(registry, training_data):
+    X, y = training_data
+    registry.register(fitted(training_data, C=np.float64(0.5)), 'landing',
+                      {'F1-Score': np.float64(0.9), 'Fits': np.int64(20), 'incremental': np.bool_(True)}, X, y,
+                      trained_through=pd.Timestamp('2020-01-07 02:19', tz='UTC'), trained_flights=np.array([3, 1]))
+    metadata = registry.metadata('landing', 'production')
+    assert metadata['estimator'] == 'LogisticRegression'
+    # NumPy scalars keep their numeric types in the JSON
+    assert metadata['metrics'] == {'F1-Score': 0.9, 'Fits': 20, 'incremental': True}
+    assert metadata['feature_columns'] == list(X.columns)
+    assert metadata['params']['model__C'] == 0.5 and isinstance(metadata['params']['model__C'], float)
+    assert metadata['data_fingerprint'] and metadata['n_train_rows'] == len(X)
+    assert metadata['trained_through'] == '2020-01-07T02:19:00+00:00'
+    assert metadata['trained_flights'] == [1, 3]
+
+def test_load_is_memory_mapped(registry, training_data):
+    X, y = training_data
+    pipeline = fitted(training_data)
+    registry.register(pipeline, 'landing', X=X, y=y)
+
+    loaded = registry.load('landing')
+    assert isinstance(loaded.named_steps['model'].coef_, np.memmap)
+    assert isinstance(loaded.named_steps['scaler'].mean_, np.memmap)
+    np.testing.assert_array_equal(loaded.predict(X), pipeline.predict(X))
+    assert not isinstance(registry.load('landing', mmap=False).named_steps['model'].coef_, np.memmap)
+
+def test_aliases_reread_only_when_changed(registry, training_data, monkeypatch):
+    registry.register(fitted(training_data), 'landing')
+    registry.register(fitted(training_data), 'landing')
+    registry.aliases('landing')
+
+    reads = []
+    real_open = open
+    monkeypatch.setattr('builtins.open', lambda *a, **k: reads.append(a[0]) or real_open(*a, **k))
+    for _ in range(100):
+        registry.resolve('landing', 'production')
+    assert reads == []
+
+    other = ModelRegistry(registry.root)
+    monkeypatch.undo()
+    other.set_alias('landing', 'production', 2)
+    assert registry.resolve('landing', 'production') == 2
+
+def test_interrupted_registration_leaves_no_version(registry, training_data, monkeypatch):
+    registry.register(fitted(training_data), 'landing')
+
+    def fail(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr('src.registry.joblib.dump', fail)
+    with pytest.raises(KeyboardInterrupt):
+        registry.register(fitted(training_data), 'landing')
+    assert registry.versions('landing') == [1]
+    assert sorted(os.listdir(os.path.join(registry.root, 'landing'))) == ['aliases.json', 'v0001']
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.svm import SVC
+from src.features import split_data
+from src.registry import ModelRegistry
+from src.retrain import incremental_update, split_by_date, supports_incremental_update, validation_gate
+from src.train import build_pipeline, prepare_training_data, training_window
+
+@pytest.fixture
+def launches():
+    """Launches in date order whose landings depend on payload mass and orbit."""
+    rng = np.random.default_rng(1)
+    n = 200
+    orbit = rng.choice(['LEO', 'GTO', 'ISS'], n)
+    mass = rng.normal(6000, 2500, n)
+    return pd.DataFrame({
+        'flight_number': np.arange(1, n + 1),
+        'Date': pd.date_range('2015-01-01', periods=n, freq='7D', tz='UTC'),
+        'BoosterVersion': [f"Mission {i}" for i in range(n)],
+        'PayloadMass': mass,
+        'Orbit': orbit,
+        'LaunchSite': rng.choice(['s1', 's2'], n),
+        'Outcome': rng.random(n) < 0.7,
+        'Flights': rng.integers(1, 6, n),
+        'GridFins': rng.random(n) < 0.8,
+        'Reused': rng.random(n) < 0.5,
+        'Legs': rng.random(n) < 0.8,
+        'Core': [f"core-{i % 40}" for i in range(n)],
+        'class': ((mass < 7000) & (orbit != 'GTO')).astype(int)
+    })
+
+# The latest launch the production model was trained on, 40 launches before the last one
+TRAINED_THROUGH = '2018-01-18T00:00:00+00:00'
+
+@pytest.fixture
+def split(launches):
+    seen, new, holdout = split_by_date(launches, '2017-06-01', 40, TRAINED_THROUGH)
+    return tuple(prepare_training_data(part) for part in (seen, new, holdout))
+
+def test_split_by_date(launches):
+    seen, new, holdout = split_by_date(launches.sample(frac=1, random_state=0), '2017-06-01', 40, TRAINED_THROUGH)
+    assert len(seen) + len(new) + len(holdout) == len(launches)
+    assert seen['Date'].max() < pd.Timestamp('2017-06-01', tz='UTC') <= new['Date'].min()
+    assert new['Date'].max() < holdout['Date'].min()
+    assert len(holdout) == 40
+
+def test_only_launches_newer_than_the_production_model_are_held_out(launches):
+    """Launches the production model may have trained on never validate the update built on it."""
+    _, new, holdout = split_by_date(launches, '2017-06-01', 40, '2018-09-01')
+    assert holdout['Date'].min() > pd.Timestamp('2018-09-01', tz='UTC')
+    assert len(holdout) == (launches['Date'] > pd.Timestamp('2018-09-01', tz='UTC')).sum() < 40
+    assert len(new) + len(holdout) == (launches['Date'] >= pd.Timestamp('2017-06-01', tz='UTC')).sum()
+
+    _, _, unknown = split_by_date(launches, '2017-06-01', 40, None)
+    assert unknown.empty
+
+def test_launches_left_out_of_the_training_split_are_held_out(launches):
+    _, _, holdout = split_by_date(launches, '2017-06-01', 40, '2019-10-31', trained_flights=range(1, 200, 2))
+    assert len(holdout) == 40
+    assert (holdout['flight_number'] % 2 == 0).all()
+
+def test_first_update_after_train_is_validated(launches, tmp_path):
+    """The model src.train registers leaves its test split to validate the first update built on it."""
+    X, y = prepare_training_data(launches)
+    X_train, _, y_train, _ = split_data(X, y, 0.2, 42)
+    registry = ModelRegistry(str(tmp_path))
+    production = build_pipeline(RandomForestClassifier(n_estimators=20, random_state=0), scaler='none')
+    registry.register(production.fit(X_train, y_train), 'landing', X=X_train, y=y_train,
+                      **training_window(launches, X_train))
+
+    metadata = registry.metadata('landing', 'production')
+    seen, new, holdout = split_by_date(launches, '2018-06-01', 30, metadata['trained_through'],
+                                       metadata['trained_flights'])
+    assert len(holdout) == 30
+    assert not holdout['flight_number'].isin(X_train['flight_number']).any()
+
+    (X_seen, y_seen), (X_new, y_new), (X_holdout, y_holdout) = (prepare_training_data(part)
+                                                               for part in (seen, new, holdout))
+    updated = incremental_update(registry.load('landing', 'production', mmap=False), X_new, y_new, X_seen, y_seen, 10)
+    retrained = clone(production).fit(pd.concat([X_seen, X_new]), np.concatenate([y_seen, y_new]))
+    gate = validation_gate(updated, retrained, X_holdout, y_holdout)
+    assert gate['updated'] is not None and gate['retrained'] is not None
+
+def test_forest_grows_new_trees_and_keeps_old_ones(split):
+    (X_seen, y_seen), (X_new, y_new), _ = split
+    pipeline = build_pipeline(RandomForestClassifier(n_estimators=20, random_state=0), scaler='none')
+    pipeline.fit(X_seen, y_seen)
+    old_trees = pipeline.named_steps['model'].estimators_
+
+    updated = incremental_update(pipeline, X_new, y_new, X_seen, y_seen, new_trees=10)
+    trees = updated.named_steps['model'].estimators_
+    assert len(trees) == 30 and len(old_trees) == 20  # The production pipeline is untouched
+    assert all(a.tree_.node_count == b.tree_.node_count for a, b in zip(old_trees, trees[:20]))
+    assert updated.named_steps['model'].warm_start is False
+
+    capped = incremental_update(pipeline, X_new, y_new, X_seen, y_seen, new_trees=10, max_trees=25)
+    assert len(capped.named_steps['model'].estimators_) == 25
+    assert capped.predict(X_new).shape == y_new.shape
+
+def test_partial_fit_model_updates_scaler_moments(split):
+    (X_seen, y_seen), (X_new, y_new), _ = split
+    pipeline = build_pipeline(SGDClassifier(loss='log_loss', random_state=0)).fit(X_seen, y_seen)
+    updated = incremental_update(pipeline, X_new, y_new)
+
+    scaler = updated.named_steps['scaler']
+    assert scaler.n_samples_seen_ == len(X_seen) + len(X_new)
+    encoded = pipeline.named_steps['encoder'].transform(pd.concat([X_seen, X_new]))
+    np.testing.assert_allclose(scaler.mean_, encoded.mean(axis=0))
+    assert not np.array_equal(updated.named_steps['model'].coef_, pipeline.named_steps['model'].coef_)
+    assert pipeline.named_steps['scaler'].n_samples_seen_ == len(X_seen)
+
+def test_unsupported_model_raises(split):
+    (X_seen, y_seen), (X_new, y_new), _ = split
+    pipeline = build_pipeline(SVC()).fit(X_seen, y_seen)
+    assert not supports_incremental_update(pipeline)
+    with pytest.raises(ValueError):
+        incremental_update(pipeline, X_new, y_new)
+
+def test_validation_gate(split):
+    (X_seen, y_seen), (X_new, y_new), (X_holdout, y_holdout) = split
+    X_all, y_all = pd.concat([X_seen, X_new]), np.concatenate([y_seen, y_new])
+    retrained = build_pipeline(RandomForestClassifier(n_estimators=20, random_state=0), scaler='none').fit(X_all, y_all)
+    stale = build_pipeline(RandomForestClassifier(n_estimators=20, random_state=0), scaler='none')
+    stale.fit(X_seen.iloc[:5], np.array([0, 1, 0, 1, 0]))
+
+    assert validation_gate(retrained, retrained, X_holdout, y_holdout)['passed']
+    gate = validation_gate(stale, retrained, X_holdout, y_holdout, tolerance=0.0)
+    assert gate['updated'] < gate['retrained'] and not gate['passed']
+
+    # Nothing to validate on: the gate fails closed
+    closed = validation_gate(retrained, retrained, X_holdout.iloc[:0], y_holdout[:0])
+    assert closed['passed'] is False and closed['updated'] is None
@@ -0,0 +1,93 @@
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.scrape_wiki import extract_launch_tables, scrape_launch_data
+from src.storage import WIKI_COLUMNS
+
+SAMPLE_PAGE = """
+<html><body>
+<table class="infobox"><tr><th>Rocket</th><td>Falcon 9</td></tr></table>
+<table class="wikitable">
+  <tbody>
+  <tr><th>Flight<br>No.</th><th>Date</th><th>Launch site</th><th>Payload<sup class="reference">[a]</sup></th><th>Orbit</th></tr>
+  <tr><th rowspan="2">1</th><td>4 June 2010</td><td rowspan="5">CCAFS SLC-40</td><td>Dragon Qualification Unit<sup class="reference">[12]</sup></td><td>LEO</td></tr>
+  <tr><td colspan="3">First flight of Falcon 9 v1.0.</td></tr>
+  <tr><th rowspan="2">2</th><td>8 December 2010</td><td>Dragon</td><td rowspan="1">LEO</td></tr>
+  <tr><td colspan="3">Maiden flight of Dragon.<style>.x{}</style></td></tr>
+  <tr><th>3</th><td>22 May 2012</td><td colspan="2">COTS Demo Flight 2</td></tr>
+  </tbody>
+</table>
+</body></html>
+"""
+
+def test_extract_launch_tables_layout():
+    """Tests header detection, rowspan/colspan layout and footnote-row handling."""
+    df = extract_launch_tables(SAMPLE_PAGE)
+
+    # Test 1: Only the launch table is extracted, with clean header names
+    assert df.columns.tolist() == ['Flight No.', 'Date', 'Launch site', 'Payload', 'Orbit']
+
+    # Test 2: Description rows are skipped
+    assert df['Flight No.'].tolist() == ['1', '2', '3']
+
+    # Test 3: The launch site rowspan is carried across the description rows
+    assert df['Launch site'].tolist() == ['CCAFS SLC-40'] * 3
+
+    # Test 4: Footnote markers are stripped and colspans are repeated
+    assert df.loc[0, 'Payload'] == 'Dragon Qualification Unit'
+    assert df.loc[2, 'Payload'] == df.loc[2, 'Orbit'] == 'COTS Demo Flight 2'
+
+def test_extract_matches_read_html_on_plain_cells():
+    """Tests that the extractor agrees with pandas.read_html where both apply."""
+    page = """<table><tr><th>Flight No.</th><th>Orbit</th></tr>
+              <tr><td>1</td><td rowspan="2">LEO</td></tr><tr><td>2</td></tr></table>"""
+    ours = extract_launch_tables(page)
+    theirs = pd.read_html(pd.io.common.StringIO(page))[0].astype(str)
+    assert ours.values.tolist() == theirs.values.tolist()
+
+def test_scrape_launch_data_reads_snapshot(tmp_path):
+    """Tests that a local HTML snapshot is used instead of the network."""
+    snapshot = tmp_path / 'page.html'
+    snapshot.write_text(SAMPLE_PAGE, encoding='utf-8')
+
+    df = scrape_launch_data(wiki_url='http://invalid.invalid/', snapshot_path=str(snapshot))
+    assert len(df) == 3
+    assert sorted(df.columns) == sorted(WIKI_COLUMNS)  # The same columns as scrape_launch_pages
+
+def test_scrape_launch_pages_reparses_only_changed_pages(tmp_path, monkeypatch):
+    """Tests concurrent multi-page scraping with the per-page content-hash cache."""
+    from src import scrape_wiki
+
+    pages = {
+        'http://wiki/2010': SAMPLE_PAGE,
+        'http://wiki/2020': "<table><tr><th>Flight No.</th><th>Date and time (UTC)</th><th>Version, booster</th></tr>"
+                            "<tr><th>100</th><td>1 January 2020</td><td>F9 B5</td></tr></table>"
+    }
+    parsed = []
+    original_extract = scrape_wiki.extract_launch_tables
+    monkeypatch.setattr(scrape_wiki, 'request_content', lambda url, **kwargs: pages[url].encode('utf-8'))
+    monkeypatch.setattr(scrape_wiki, 'extract_launch_tables', lambda html: parsed.append(html) or original_extract(html))
+
+    first = scrape_wiki.scrape_launch_pages(list(pages), cache_dir=str(tmp_path), max_workers=2)
+
+    # Test 1: Both pages are combined in page order with a consistent schema
+    assert first['Flight No.'].tolist() == ['1', '2', '3', '100']
+    assert first.loc[3, 'Version, Booster'] == 'F9 B5'
+    assert first['Orbit'].isna().tolist() == [False, False, False, True]
+    assert first['SourcePage'].tolist()[-1] == 'http://wiki/2020'
+
+    # Test 2: Unchanged pages come from the cache; only the edited page is re-parsed
+    pages['http://wiki/2020'] = pages['http://wiki/2020'].replace('F9 B5', 'F9 B5 B1049')
+    second = scrape_wiki.scrape_launch_pages(list(pages), cache_dir=str(tmp_path), max_workers=2)
+    assert len(parsed) == 3
+    assert second.loc[3, 'Version, Booster'] == 'F9 B5 B1049'
+
+    # Test 3: A new parser version re-parses every page
+    monkeypatch.setattr(scrape_wiki, 'parser_version', lambda: 'changed')
+    scrape_wiki.scrape_launch_pages(list(pages), cache_dir=str(tmp_path), max_workers=2)
+    assert len(parsed) == 5
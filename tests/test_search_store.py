@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.datasets import make_classification
+from sklearn.model_selection import GridSearchCV, ParameterGrid
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+import src.search_store as search_store
+from src.search_store import ResumableSearchCV, SearchResultStore, candidate_key, search_key
+from src.train import build_search
+
+GRID = {'max_depth': [2, 4], 'min_samples_leaf': [1, 5]}
+
+@pytest.fixture
+def data():
+    return make_classification(n_samples=90, n_features=5, random_state=0)
+
+@pytest.fixture
+def store(tmp_path):
+    with SearchResultStore(str(tmp_path / 'results.db')) as store:
+        yield store
+
+def search(store, grid=GRID):
+    return ResumableSearchCV(DecisionTreeClassifier(random_state=0), list(ParameterGrid(grid)), store, cv=3)
+
+def test_store_round_trip(store):
+    store.record('k', 'Tree', '{"a": 1}', 0, 0.5, 0.01)
+    store.record('k', 'Tree', '{"a": 1}', 1, np.nan, 0.01)
+    store.record('other', 'Tree', '{"a": 1}', 0, 0.9, 0.01)
+    completed = store.completed('k')
+    assert completed[('{"a": 1}', 0)] == 0.5
+    assert np.isnan(completed[('{"a": 1}', 1)])
+    assert len(store.results('k')) == 2 and len(store.results()) == 3
+
+def test_matches_grid_search(store, data):
+    """Scores and the chosen candidate are the same as GridSearchCV's on the same folds."""
+    X, y = data
+    resumable = search(store).fit(X, y)
+    reference = GridSearchCV(DecisionTreeClassifier(random_state=0), GRID, cv=3, scoring='f1').fit(X, y)
+    np.testing.assert_allclose(resumable.cv_results_['mean_test_score'], reference.cv_results_['mean_test_score'])
+    assert resumable.best_params_ == reference.best_params_
+    assert resumable.best_score_ == pytest.approx(reference.best_score_)
+    assert len(store.results()) == 4 * 3
+
+def test_rerun_and_widened_grid_only_fit_new_points(store, data, capsys):
+    X, y = data
+    search(store).fit(X, y)
+    search(store).fit(X, y)
+    assert "12 fits reused, 0 to run" in capsys.readouterr().out
+
+    wider = dict(GRID, max_depth=[2, 4, 6])
+    search(store, wider).fit(X, y)
+    assert "12 fits reused, 6 to run" in capsys.readouterr().out
+    assert len(store.results()) == 6 * 3
+
+def test_interrupted_search_resumes(store, data, capsys, monkeypatch):
+    """Fits finished before an interruption are kept and not repeated."""
+    X, y = data
+    fit_and_score = search_store._fit_and_score
+    calls = []
+
+    def interrupt_after_five(*args):
+        if len(calls) == 5:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return fit_and_score(*args)
+
+    monkeypatch.setattr(search_store, '_fit_and_score', interrupt_after_five)
+    with pytest.raises(KeyboardInterrupt):
+        ResumableSearchCV(DecisionTreeClassifier(random_state=0), list(ParameterGrid(GRID)), store, cv=3,
+                          n_jobs=1).fit(X, y)
+    assert len(store.results()) == 5
+
+    monkeypatch.setattr(search_store, '_fit_and_score', fit_and_score)
+    resumed = search(store).fit(X, y)
+    assert "5 fits reused, 7 to run" in capsys.readouterr().out
+    assert resumed.best_params_ == search(store).fit(X, y).best_params_
+
+def test_only_deterministic_fit_failures_are_stored(store, data, monkeypatch):
+    """An invalid candidate is stored as NaN; a transient error stores nothing, so the fit is retried."""
+    X, y = data
+    invalid = ResumableSearchCV(DecisionTreeClassifier(), [{'max_depth': 2}, {'max_depth': -1}], store, cv=3, n_jobs=1)
+    assert invalid.fit(X, y).best_params_ == {'max_depth': 2}
+    assert store.results()['score'].isna().sum() == 3
+
+    def out_of_memory(*args, **kwargs):
+        raise MemoryError
+
+    monkeypatch.setattr(DecisionTreeClassifier, 'fit', out_of_memory)
+    with pytest.raises(MemoryError):
+        ResumableSearchCV(DecisionTreeClassifier(), [{'max_depth': 3}], store, cv=3, n_jobs=1).fit(X, y)
+    assert len(store.results()) == 6
+
+def test_candidate_parameter_values_are_cloned(store, data):
+    """Estimators in the grid, such as scalers, are never fitted in place."""
+    X, y = data
+    scaler = StandardScaler()
+    pipeline = Pipeline([('scaler', 'passthrough'), ('model', DecisionTreeClassifier(random_state=0))])
+    fitted = ResumableSearchCV(pipeline, [{'scaler': scaler}], store, cv=3, n_jobs=1).fit(X, y)
+    assert not hasattr(scaler, 'mean_')
+    assert fitted.best_estimator_.named_steps['scaler'] is not scaler
+
+def test_search_key_depends_on_data_and_estimator(data):
+    X, y = data
+    folds = [(np.arange(0, 60), np.arange(60, 90))]
+    base = search_key(DecisionTreeClassifier(), X, y, folds, 'f1')
+    assert base == search_key(DecisionTreeClassifier(), X.copy(), y, folds, 'f1')
+    assert base != search_key(DecisionTreeClassifier(), X[::-1], y, folds, 'f1')
+    assert base != search_key(DecisionTreeClassifier(criterion='entropy'), X, y, folds, 'f1')
+    assert base != search_key(DecisionTreeClassifier(), X, y, folds, 'accuracy')
+    assert candidate_key({'b': 1, 'a': 2}) == candidate_key({'a': 2, 'b': 1})
+
+def test_build_search_uses_store_for_grid_and_random(store):
+    model = DecisionTreeClassifier()
+    assert isinstance(build_search(model, GRID, store=store), ResumableSearchCV)
+    sampled = build_search(model, GRID, {'strategy': 'random', 'n_iter': 3, 'random_state': 0}, store=store)
+    assert len(sampled.candidates) == 3
+    assert not isinstance(build_search(model, GRID, {'strategy': 'halving'}, store=store), ResumableSearchCV)
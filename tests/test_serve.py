@@ -0,0 +1,186 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sklearn.linear_model import LogisticRegression
+from src.features import HISTORY_FEATURES, history_features, lookup_history_features, save_history_state
+from src.serve import LatencyRecorder, MicroBatcher, create_app
+from src.storage import ARTIFACT_SCHEMAS, apply_schema
+from src.train import build_pipeline, prepare_training_data
+
+CONFIG = {'serving': {'host': '127.0.0.1', 'port': 8060, 'max_batch_size': 64, 'max_wait_ms': 2.0,
+                      'request_timeout_s': 10.0}}
+
+@pytest.fixture
+def launches():
+    """Wrangled launches, in the dtypes the service casts requests to."""
+    rng = np.random.default_rng(3)
+    n = 200
+    orbit = rng.choice(['LEO', 'GTO', 'ISS'], n)
+    mass = rng.normal(6000, 2500, n)
+    return apply_schema(pd.DataFrame({
+        'flight_number': np.arange(1, n + 1),
+        'Date': pd.date_range('2015-01-01', periods=n, freq='7D', tz='UTC'),
+        'BoosterVersion': [f"Mission {i}" for i in range(n)],
+        'PayloadMass': mass,
+        'Orbit': orbit,
+        'LaunchSite': rng.choice(['s1', 's2'], n),
+        'Outcome': rng.random(n) < 0.7,
+        'Flights': rng.integers(1, 6, n),
+        'GridFins': rng.random(n) < 0.8,
+        'Reused': rng.random(n) < 0.5,
+        'Legs': rng.random(n) < 0.8,
+        'Core': [f"core-{i % 40}" for i in range(n)],
+        'class': ((mass < 7000) & (orbit != 'GTO')).astype(int)
+    }), ARTIFACT_SCHEMAS['wrangled_data'])
+
+@pytest.fixture
+def model(launches):
+    X, y = prepare_training_data(launches)
+    return build_pipeline(LogisticRegression(max_iter=1000)).fit(X, y)
+
+def as_requests(X):
+    """Launches as JSON-ready dicts, the way clients send them."""
+    return [{k: (v.item() if hasattr(v, 'item') else v) for k, v in row.items()} for row in X.to_dict('records')]
+
+def test_batcher_coalesces_concurrent_requests():
+    calls = []
+    def score_batch(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(score_batch, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(20)]
+    assert [f.result(timeout=5) for f in futures] == [i * 2 for i in range(20)]
+    batcher.close()
+    assert calls == [8, 8, 4]
+
+def test_batcher_without_a_window_scores_each_request_alone():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=8, max_wait_ms=0)
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == list(range(5))
+    batcher.close()
+    assert list(batcher.batch_sizes) == [1] * 5
+
+def test_batcher_fails_only_the_bad_requests_of_a_failing_batch():
+    def score_batch(items):
+        if any(item < 0 for item in items):
+            raise ValueError('bad launch')
+        return items
+    batcher = MicroBatcher(score_batch, max_wait_ms=20)
+    futures = [batcher.submit(i) for i in [1, -1, 2]]
+    assert futures[0].result(timeout=5) == 1
+    assert futures[2].result(timeout=5) == 2
+    with pytest.raises(ValueError, match='bad launch'):
+        futures[1].result(timeout=5)
+    batcher.close()
+
+def test_latency_percentiles():
+    recorder = LatencyRecorder(window=100)
+    assert recorder.summary()['p50_ms'] is None
+    for ms in range(1, 201):
+        recorder.record(ms / 1000)
+    summary = recorder.summary()
+    assert summary['requests'] == 200
+    assert summary['p50_ms'] == pytest.approx(150.5)  # Only the latest 100 requests
+    assert summary['p99_ms'] == pytest.approx(199.01)
+
+def test_predict_matches_the_pipeline(launches, model):
+    X, _ = prepare_training_data(launches)
+    client = create_app(model, config=CONFIG).test_client()
+    rows = as_requests(X.head(20))
+
+    single = client.post('/predict', json=rows[0])
+    assert single.status_code == 200
+    assert single.get_json()['probability'] == pytest.approx(model.predict_proba(X.head(1))[0, 1])
+
+    batch = client.post('/predict', json=rows).get_json()
+    np.testing.assert_allclose([r['probability'] for r in batch], model.predict_proba(X.head(20))[:, 1])
+    assert [r['prediction'] for r in batch] == model.predict(X.head(20)).tolist()
+
+def test_concurrent_requests_are_batched_and_counted(launches, model):
+    X, _ = prepare_training_data(launches)
+    app = create_app(model, max_wait_ms=50, config=CONFIG)
+    rows = as_requests(X.head(16))
+    responses = [None] * len(rows)
+
+    def call(i):
+        responses[i] = app.test_client().post('/predict', json=rows[i]).get_json()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    np.testing.assert_allclose([r['probability'] for r in responses], model.predict_proba(X.head(16))[:, 1])
+
+    metrics = app.test_client().get('/metrics').get_json()
+    assert metrics['requests'] == 16
+    assert metrics['batches'] < 16 and metrics['mean_batch_size'] > 1
+    assert metrics['p50_ms'] <= metrics['p99_ms']
+
+def test_missing_columns_are_rejected(launches, model):
+    X, _ = prepare_training_data(launches)
+    client = create_app(model, config=CONFIG).test_client()
+    row = as_requests(X.head(1))[0]
+    del row['Orbit']
+    response = client.post('/predict', json=row)
+    assert response.status_code == 400
+    assert 'Orbit' in response.get_json()['error']
+    assert client.post('/predict', data='not json').status_code == 400
+
+def test_a_bad_request_does_not_fail_a_concurrent_good_one(launches, model):
+    X, _ = prepare_training_data(launches)
+    client = create_app(model, max_wait_ms=50, config=CONFIG).test_client()
+    good, bad = as_requests(X.head(2))
+    bad['Flights'] = 200  # Out of Int8 range
+    responses = {}
+    def send(name, row):
+        responses[name] = client.post('/predict', json=row)
+    threads = [threading.Thread(target=send, args=item) for item in [('good', good), ('bad', bad)]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert responses['good'].status_code == 200
+    assert responses['bad'].status_code == 400
+    assert client.post('/predict', json=dict(good, PayloadMass='heavy')).status_code == 400
+
+def test_a_stuck_batch_times_out(launches, model):
+    X, _ = prepare_training_data(launches)
+    config = {'serving': dict(CONFIG['serving'], request_timeout_s=0.05)}
+    app = create_app(model, config=config)
+    app.config['batcher'].score_batch = lambda items: time.sleep(0.5) or [None] * len(items)
+    response = app.test_client().post('/predict', json=as_requests(X.head(1))[0])
+    assert response.status_code == 503
+
+def test_metrics_reset(launches, model):
+    X, _ = prepare_training_data(launches)
+    client = create_app(model, config=CONFIG).test_client()
+    client.post('/predict', json=as_requests(X.head(1))[0])
+    assert client.get('/metrics', query_string={'reset': 1}).get_json()['requests'] == 1
+    assert client.get('/metrics').get_json() == {'requests': 0, 'p50_ms': None, 'p99_ms': None,
+                                                 'batches': 0, 'mean_batch_size': None}
+
+def test_history_features_come_from_the_stored_state(launches, tmp_path):
+    """Clients send the wrangled columns; the service looks up the history features by Date, site and core."""
+    seen, upcoming = launches.iloc[:150], launches.iloc[150:160]
+    history, state = history_features(seen)
+    X, y = prepare_training_data(seen.join(history))
+    model = build_pipeline(LogisticRegression(max_iter=1000)).fit(X, y)
+    config = dict(CONFIG, data_paths={'interim': str(tmp_path)}, data_files={'history_state': 'history.json'})
+    save_history_state(state, str(tmp_path / 'history.json'))
+
+    rows = [dict(row, Date=row['Date'].isoformat()) for row in as_requests(upcoming.drop(columns='class'))]
+    assert not set(HISTORY_FEATURES) & set(rows[0])
+    response = create_app(model, config=config).test_client().post('/predict', json=rows)
+    assert response.status_code == 200
+    expected = model.predict_proba(prepare_training_data(upcoming.join(lookup_history_features(upcoming, state)))[0])
+    np.testing.assert_allclose([r['probability'] for r in response.get_json()], expected[:, 1])
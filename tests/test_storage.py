@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+import yaml
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage import (ARTIFACT_SCHEMAS, PARTITION_COLUMN, artifact_path, compact_artifact, load_artifact,
+                         load_parquet, memory_footprint, save_artifact, save_parquet)
+
+@pytest.fixture
+def wrangled_dataframe():
+    """A small wrangled launch frame spanning three years."""
+    return pd.DataFrame({
+        'flight_number': [1, 2, 3, 4],
+        'Date': pd.to_datetime(['2010-06-04', '2012-05-22', '2012-10-08', '2013-09-29'], utc=True),
+        'BoosterVersion': ['F9 v1.0', 'F9 v1.0', 'F9 v1.0', 'F9 v1.1'],
+        'PayloadMass': [0.0, 525.0, 400.0, 500.0],
+        'Orbit': ['LEO', 'LEO', 'ISS', 'PO'],
+        'LaunchSite': ['CCAFS', 'CCAFS', 'CCAFS', 'VAFB'],
+        'Outcome': [False, False, False, False],
+        'Flights': [1, 1, 1, 1],
+        'Core': ['B0003', 'B0005', 'B0006', 'B1003'],
+        'GridFins': [False, False, False, False],
+        'Reused': [False, False, False, False],
+        'Legs': [False, False, False, False],
+        'class': [0, 0, 0, 0]
+    })
+
+@pytest.fixture
+def test_config(tmp_path):
+    """A config whose data paths point into a temporary directory."""
+    with open(os.path.join(os.path.dirname(__file__), '..', 'config', 'config.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['data_paths'] = {stage: str(tmp_path / stage) for stage in config['data_paths']}
+    return config
+
+def test_artifact_round_trip_with_schema(wrangled_dataframe, test_config):
+    """Tests that an artifact is partitioned by year and reloaded with its declared dtypes."""
+    save_artifact(wrangled_dataframe, 'wrangled_data', config=test_config)
+    path = artifact_path('wrangled_data', test_config)
+
+    # Test 1: One partition directory per launch year
+    assert sorted(os.listdir(path)) == ['_schema.json'] + [f"{PARTITION_COLUMN}={y}" for y in (2010, 2012, 2013)]
+
+    # Test 2: The reloaded frame matches, with declared dtypes and no partition column
+    loaded = load_artifact('wrangled_data', config=test_config).sort_values('flight_number').reset_index(drop=True)
+    assert loaded.columns.tolist() == wrangled_dataframe.columns.tolist()
+    assert loaded.dtypes.astype(str).to_dict() == {column: str(dtype) for column, dtype in ARTIFACT_SCHEMAS['wrangled_data'].items()}
+    assert loaded['PayloadMass'].tolist() == wrangled_dataframe['PayloadMass'].tolist()
+    assert loaded['Orbit'].tolist() == wrangled_dataframe['Orbit'].tolist()
+
+def test_load_projection_and_pushdown(wrangled_dataframe, tmp_path):
+    """Tests column projection, year filtering and row predicates on load."""
+    path = str(tmp_path / 'launches.parquet')
+    save_parquet(wrangled_dataframe, path, date_column='Date')
+
+    subset = load_parquet(path, columns=['flight_number', 'Orbit'], years=[2012])
+    assert subset.columns.tolist() == ['flight_number', 'Orbit']
+    assert sorted(subset['flight_number']) == [2, 3]
+
+    iss = load_parquet(path, columns=['flight_number'], filters=[('Orbit', '=', 'ISS')])
+    assert iss['flight_number'].tolist() == [3]
+
+def test_partitions_only_keeps_other_years(wrangled_dataframe, tmp_path):
+    """Tests that a partial write replaces only the years it contains."""
+    path = str(tmp_path / 'launches.parquet')
+    save_parquet(wrangled_dataframe, path, date_column='Date')
+
+    update = wrangled_dataframe[wrangled_dataframe['flight_number'] == 4].assign(Orbit='SSO')
+    save_parquet(update, path, date_column='Date', partitions_only=True)
+
+    loaded = load_parquet(path).sort_values('flight_number')
+    assert loaded['Orbit'].tolist() == ['LEO', 'LEO', 'ISS', 'SSO']
+
+def test_compact_artifact_shrinks_wrangled_frame(wrangled_dataframe, capsys):
+    """Tests that the compact schema keeps the values, allows missing flags and reports a smaller footprint."""
+    wide = pd.concat([wrangled_dataframe] * 250, ignore_index=True)
+    wide['Outcome'] = wide['Outcome'].astype(object).where(wide.index % 3 > 0, None)
+    compact = compact_artifact(wide, 'wrangled_data')
+
+    assert memory_footprint(compact) < memory_footprint(wide) / 2
+    assert compact['Outcome'].isna().sum() == (wide.index % 3 == 0).sum()
+    assert compact['Orbit'].astype(str).tolist() == wide['Orbit'].tolist()
+    assert 'MiB in memory' in capsys.readouterr().out
+
+    with pytest.raises(TypeError):
+        compact_artifact(wide.assign(Flights=300), 'wrangled_data', verbose=False)  # Would overflow Int8
+
+def test_partitions_from_different_batches_read_together(tmp_path):
+    """Tests that partial writes whose batches type or lack a column differently keep one readable schema."""
+    path = str(tmp_path / 'launches.parquet')
+    first = pd.DataFrame({'id': ['a'], 'date_utc': ['2010-06-04'], 'details': [None], 'success': [True]})
+    save_parquet(first, path, date_column='date_utc')
+    second = pd.DataFrame({'id': ['b'], 'date_utc': ['2012-05-22'], 'details': ['Landed'], 'fairings': [{'reused': True}]})
+    save_parquet(second, path, date_column='date_utc', partitions_only=True)
+
+    loaded = load_parquet(path).sort_values('id').reset_index(drop=True)
+    assert set(loaded.columns) == {'id', 'date_utc', 'details', 'success', 'fairings'}
+    assert loaded['details'].tolist()[1] == 'Landed'
+    assert loaded['fairings'].tolist()[1] == {'reused': True}
+    assert pd.isna(loaded['success'][1])
+    assert load_parquet(path, years=[2010])['details'].isna().all()
@@ -0,0 +1,76 @@
+import io
+import json
+import pandas as pd
+import pytest
+import sys
+import os
+
+# Add the project root to the Python path to allow importing from `src`
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.stream_ingest import iter_json_array, read_ndjson_chunks, stream_launches, write_ndjson
+from src.wrangle import clean_api_data, clean_api_data_chunked
+
+LAUNCHES = [
+    {'id': f"l{i}", 'flight_number': i, 'name': f"Launch {i}", 'date_utc': f"20{10 + i % 10}-01-01T00:00:00.000Z",
+     'launchpad': 'lp1', 'payloads': [{'mass_kg': 100.0 * i if i % 3 else None, 'orbit': 'LEO'}],
+     'cores': [{'flight': 1, 'gridfins': True, 'legs': True, 'reused': False, 'landing_success': i % 2 == 0}],
+     'links': {'patch': {'small': None}}, 'details': "Ünïcode, [brackets] and {braces}"}
+    for i in range(1, 26)
+]
+
+def byte_pieces(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize('size', [1, 7, 4096])
+def test_iter_json_array_across_chunk_boundaries(size):
+    """Tests that elements split across arbitrary (even mid-character) chunk boundaries are decoded."""
+    data = json.dumps(LAUNCHES + [12345, "text", None], ensure_ascii=False, indent=2).encode('utf-8')
+    assert list(iter_json_array(byte_pieces(data, size))) == LAUNCHES + [12345, "text", None]
+
+def test_iter_json_array_reads_files_and_empty_arrays(tmp_path):
+    path = tmp_path / 'launches.json'
+    path.write_text(json.dumps(LAUNCHES))
+    assert list(iter_json_array(str(path), read_size=100)) == LAUNCHES
+    assert list(iter_json_array(io.BytesIO(b' [ ] '))) == []
+
+@pytest.mark.parametrize('data', [b'{"a": 1}', b'[{"a": 1}, ', b'[{"a": 1} {"b": 2}]', b''])
+def test_iter_json_array_rejects_invalid_input(data):
+    with pytest.raises(ValueError):
+        list(iter_json_array([data]))
+
+def test_stream_and_clean_in_chunks(tmp_path):
+    """Tests a streamed file wrangled chunk by chunk against clean_api_data on the whole response."""
+    source = tmp_path / 'launches.json'
+    source.write_text(json.dumps(LAUNCHES))
+    path = stream_launches(str(source), str(tmp_path / 'raw' / 'launches.ndjson'), chunk_size=4)
+
+    chunks = list(read_ndjson_chunks(path, chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert list(chunks[1].index) == list(range(10, 20))
+    assert 'links.patch.small' in chunks[0].columns  # Flattened like fetch_api's output
+
+    expected = clean_api_data(pd.json_normalize(LAUNCHES))
+    actual = clean_api_data_chunked(read_ndjson_chunks(path, chunk_size=10))
+    pd.testing.assert_frame_equal(actual, expected)
+
+def test_write_ndjson_leaves_no_partial_file(tmp_path):
+    path = tmp_path / 'out.ndjson'
+
+    def failing_records():
+        yield {'a': 1}
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        write_ndjson(failing_records(), str(path))
+    assert os.listdir(tmp_path) == []
+    assert write_ndjson(iter([{'a': 1}, {'b': 2}]), str(path), chunk_size=1) == 2
+    assert path.read_text().splitlines() == ['{"a": 1}', '{"b": 2}']
+
+def test_write_ndjson_keeps_the_open_error(tmp_path, monkeypatch):
+    def failing_open(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr('src.stream_ingest.open', failing_open, raising=False)
+    with pytest.raises(PermissionError):
+        write_ndjson(iter([{'a': 1}]), str(tmp_path / 'out.ndjson'))
@@ -0,0 +1,211 @@
+import pytest
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, RandomizedSearchCV
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from sklearn.preprocessing import MaxAbsScaler
+from src.storage import save_artifact
+from src.train import (FEATURE_COLUMNS, build_pipeline, build_search, compare_models, load_search_log,
+                       load_training_data, make_cv_folds, pipeline_search_space, plan_core_budget,
+                       prepare_training_data, train_models, tune_model)
+from src.utils import load_config
+
+@pytest.fixture
+def data():
+    return make_classification(n_samples=120, n_features=6, random_state=0)
+
+TREE_GRID = {'max_depth': [2, 4, None], 'min_samples_leaf': [1, 2, 4, 8]}
+
+def test_build_search_strategies(data):
+    """Each strategy maps to its scikit-learn search class; grid is the default."""
+    X, y = data
+    model = DecisionTreeClassifier()
+    assert isinstance(build_search(model, TREE_GRID), GridSearchCV)
+    assert isinstance(build_search(model, TREE_GRID, {'strategy': 'halving'}), HalvingGridSearchCV)
+
+    random_search = build_search(model, TREE_GRID, {'strategy': 'random', 'max_fits': 20}, cv=5, y=y)
+    assert isinstance(random_search, RandomizedSearchCV)
+    assert random_search.n_iter == 4  # 20 fits over 5 folds
+
+    with pytest.raises(ValueError):
+        build_search(model, TREE_GRID, {'strategy': 'bayes'})
+
+def test_halving_on_parameter_resource():
+    """A parameter resource leaves the grid and is grown up to its largest grid value."""
+    grid = {'n_estimators': [10, 30], 'max_depth': [2, 4]}
+    search = build_search(RandomForestClassifier(), grid, {'strategy': 'halving', 'resource': 'n_estimators'})
+    assert search.resource == 'n_estimators'
+    assert search.max_resources == 30
+    assert search.param_grid == {'max_depth': [2, 4]}
+    assert grid == {'n_estimators': [10, 30], 'max_depth': [2, 4]}  # The caller's grid is untouched
+
+@pytest.mark.parametrize('search, max_fits', [
+    (None, 12 * 3),
+    ({'strategy': 'random', 'max_fits': 15, 'random_state': 0}, 15),
+    ({'strategy': 'halving', 'factor': 2, 'random_state': 0}, 12 * 3 * 2),
+])
+def test_tune_model_logs_each_search(tmp_path, data, search, max_fits):
+    """The best score, fit count and wall-clock time of every search are appended to the log."""
+    X, y = data
+    log_path = str(tmp_path / 'search_log.jsonl')
+    for _ in range(2):
+        best = tune_model(DecisionTreeClassifier(random_state=0), TREE_GRID, X, y, cv=3,
+                          search=search, name='DecisionTree', log_path=log_path)
+    assert best.predict(X).shape == y.shape
+
+    log = load_search_log(log_path)
+    assert len(log) == 2
+    record = log.iloc[-1]
+    assert record['model'] == 'DecisionTree'
+    assert record['strategy'] == (search or {}).get('strategy', 'grid')
+    assert 0.0 <= record['best_score'] <= 1.0
+    assert 0 < record['fits'] <= max_fits
+    assert record['seconds'] >= 0
+
+def test_load_search_log_missing(tmp_path):
+    assert load_search_log(str(tmp_path / 'missing.jsonl')).empty
+
+@pytest.fixture
+def launches():
+    """Wrangled launches whose landings depend on payload mass and orbit."""
+    rng = np.random.default_rng(0)
+    n = 120
+    orbit = rng.choice(['LEO', 'GTO', 'ISS', 'SSO'], n)
+    mass = rng.normal(6000, 2500, n)
+    return pd.DataFrame({
+        'flight_number': np.arange(1, n + 1),
+        'Date': pd.date_range('2015-01-01', periods=n, freq='14D', tz='UTC'),
+        'BoosterVersion': [f"Mission {i}" for i in range(n)],
+        'PayloadMass': mass,
+        'Orbit': orbit,
+        'LaunchSite': rng.choice(['s1', 's2', 's3'], n),
+        'Outcome': rng.random(n) < 0.7,
+        'Flights': rng.integers(1, 6, n),
+        'GridFins': rng.random(n) < 0.8,
+        'Reused': rng.random(n) < 0.5,
+        'Legs': rng.random(n) < 0.8,
+        'Core': [f"core-{i % 40}" for i in range(n)],
+        'class': ((mass < 7000) & (orbit != 'GTO')).astype(int)
+    })
+
+@pytest.fixture
+def training_config():
+    return {
+        'project_settings': {'random_state': 42},
+        'training': {'models': ['LogisticRegression', 'DecisionTree'], 'cv_folds': 3, 'scoring': 'f1', 'n_jobs': 1}
+    }
+
+SMALL_PARAMS = {
+    'LogisticRegression': {'C': [0.1, 1.0]},
+    'DecisionTree': TREE_GRID,
+    'preprocessing': {'LogisticRegression': {'scaler': ['standard', 'maxabs']}, 'DecisionTree': {'scaler': ['none']}},
+    'search': {'DecisionTree': {'strategy': 'random', 'max_fits': 6, 'random_state': 0}}
+}
+
+def test_plan_core_budget():
+    """Concurrent searches split the core budget instead of each using every core."""
+    assert plan_core_budget(4, 8) == (4, 2)
+    assert plan_core_budget(4, 2) == (2, 1)
+    assert plan_core_budget(2, 1) == (1, 1)
+    workers, jobs = plan_core_budget(4, -1)
+    assert workers * jobs <= os.cpu_count()
+
+def test_make_cv_folds_are_stratified_and_reproducible(data):
+    _, y = data
+    folds = make_cv_folds(y, n_splits=4, random_state=0)
+    assert len(folds) == 4
+    assert sorted(np.concatenate([test for _, test in folds])) == list(range(len(y)))
+    assert all(abs(y[test].mean() - y.mean()) < 0.1 for _, test in folds)
+    assert all((a[1] == b[1]).all() for a, b in zip(folds, make_cv_folds(y, n_splits=4, random_state=0)))
+
+def test_prepare_training_data_drops_identifiers_and_outcome(launches):
+    X, y = prepare_training_data(launches)
+    assert list(y) == launches['class'].tolist()
+    assert not {'class', 'Date', 'BoosterVersion', 'Outcome', 'Core'} & set(X.columns)
+    assert 'Orbit' in X.columns  # Encoded inside the pipeline, not here
+
+def test_load_training_data_reads_only_feature_columns_and_years(tmp_path, launches):
+    config = load_config()
+    config['data_paths'] = {stage: str(tmp_path / stage) for stage in config['data_paths']}
+    config['training'].update(first_year=2016, last_year=2017)
+    save_artifact(launches, 'wrangled_data', config=config)
+
+    loaded = load_training_data(config)
+    assert loaded.columns.tolist() == FEATURE_COLUMNS + ['class']
+    assert len(loaded) == launches['Date'].dt.year.between(2016, 2017).sum()
+    assert 'Date' in load_training_data(config, columns=['Date']).columns
+
+def test_pipeline_search_space():
+    """Model parameters move under the 'model' step; scalers are tuned by name."""
+    grid, search = pipeline_search_space({'C': [1, 10]}, {'scaler': ['maxabs', 'none']},
+                                         {'strategy': 'halving', 'resource': 'n_estimators'})
+    assert grid['model__C'] == [1, 10]
+    assert isinstance(grid['scaler'][0], MaxAbsScaler) and grid['scaler'][1] == 'passthrough'
+    # Every search gets its own scaler instances, so no fitted state is shared between searches
+    assert grid['scaler'][0] is not pipeline_search_space({}, {'scaler': ['maxabs']})[0]['scaler'][0]
+    assert search['resource'] == 'model__n_estimators'
+    assert pipeline_search_space({}, None, {'strategy': 'halving'})[1] == {'strategy': 'halving'}
+
+def test_pipeline_fits_preprocessing_inside_each_fold(launches):
+    """The encoder only learns the categories of the rows it is fitted on."""
+    X, y = prepare_training_data(launches)
+    train = X['Orbit'] != 'SSO'
+    pipeline = build_pipeline(DecisionTreeClassifier(random_state=0)).fit(X[train], y[train])
+    assert 'SSO' not in pipeline.named_steps['encoder'].vocabulary_['Orbit']
+    assert pipeline.predict(X).shape == y.shape
+
+def test_pipeline_caches_transformer_fits(tmp_path, launches):
+    """Candidates sharing preprocessing reuse the cached encoder and scaler fits."""
+    X, y = prepare_training_data(launches)
+    grid, _ = pipeline_search_space({'C': [0.1, 1.0, 10.0]})
+    pipeline = build_pipeline(LogisticRegression(), memory=str(tmp_path))
+    GridSearchCV(pipeline, grid, cv=make_cv_folds(y, 3, 0)).fit(X, y)
+    # One entry per step and fold, plus the refit, however many candidates there are
+    cached = [d for d in (tmp_path / 'joblib').rglob('*') if d.is_dir() and (d / 'output.pkl').exists()]
+    assert len(cached) == 2 * (3 + 1)
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_train_models(tmp_path, launches, training_config, n_jobs):
+    """Every configured model is tuned, in process or in a pool, and logged once."""
+    X, y = prepare_training_data(launches)
+    training_config['training']['cache_dir'] = str(tmp_path / 'cache')
+    log_path = str(tmp_path / 'search_log.jsonl')
+    trained = train_models(X, y, params=SMALL_PARAMS, config=training_config, n_jobs=n_jobs, log_path=log_path)
+
+    assert list(trained) == ['LogisticRegression', 'DecisionTree']
+    records = {name: record for name, (_, record) in trained.items()}
+    assert records['LogisticRegression']['fits'] == 2 * 2 * 3
+    assert records['DecisionTree']['strategy'] == 'random'
+    assert sorted(load_search_log(log_path)['model']) == ['DecisionTree', 'LogisticRegression']
+    assert all(model.memory is None for model, _ in trained.values())
+
+    comparison = compare_models(trained, X, y)
+    assert set(comparison.index) == set(trained)
+    assert comparison['F1-Score'].is_monotonic_decreasing
+
+def test_train_models_resume_from_results_store(tmp_path, launches, training_config, capsys):
+    """A rerun on the same data reuses every stored grid and random search fit."""
+    X, y = prepare_training_data(launches)
+    training_config['training']['results_store'] = str(tmp_path / 'results.db')
+    first = train_models(X, y, params=SMALL_PARAMS, config=training_config)
+    capsys.readouterr()
+    second = train_models(X, y, params=SMALL_PARAMS, config=training_config)
+    out = capsys.readouterr().out
+    assert "4 candidates x 3 folds: 12 fits reused, 0 to run" in out
+    assert "2 candidates x 3 folds: 6 fits reused, 0 to run" in out
+    assert {n: r['best_score'] for n, (_, r) in first.items()} == {n: r['best_score'] for n, (_, r) in second.items()}
+
+def test_train_models_unknown_model(data, training_config):
+    X, y = data
+    with pytest.raises(ValueError):
+        train_models(X, y, names=['XGBoost'], params=SMALL_PARAMS, config=training_config)
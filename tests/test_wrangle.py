@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import pytest
 import sys
 import os
@@ -6,7 +7,10 @@ import os
 # Add the project root to the Python path to allow importing from `src`
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.wrangle import clean_api_data
+from src.reference_store import ReferenceStore
+from src.storage import save_artifact
+from src.utils import load_config
+from src.wrangle import clean_api_data, clean_api_data_apply, clean_api_data_chunked, wrangle_launches
 
 @pytest.fixture
 def raw_api_dataframe():
@@ -59,9 +63,100 @@ def test_clean_api_data(raw_api_dataframe):
 
     # Test 4: Check if the final columns are as expected
     expected_cols = ['flight_number', 'Date', 'BoosterVersion', 'PayloadMass', 'Orbit',
-                     'LaunchSite', 'Outcome', 'Flights', 'GridFins', 'Reused', 'Legs', 'class']
+                     'LaunchSite', 'Outcome', 'Flights', 'Core', 'GridFins', 'Reused', 'Legs', 'class']
     assert all(col in cleaned_df.columns for col in expected_cols)
     assert len(cleaned_df.columns) == len(expected_cols)
 
     # Test 5: Check number of rows
-    assert len(cleaned_df) == 2
\ No newline at end of file
+    assert len(cleaned_df) == 2
+
+
+def make_synthetic_launches(n, seed=0):
+    """Builds n raw launches covering every shape clean_api_data has to handle."""
+    rng = np.random.default_rng(seed)
+    core_shapes = [
+        lambda i: [{'core': f"core{i % 7}" if i % 4 else {'id': f"core{i % 7}", 'serial': 'B1049'},
+                    'flight': int(i % 5) + 1, 'gridfins': True, 'legs': bool(i % 2), 'reused': i % 3 == 0,
+                    'landing_success': [True, False, None][i % 3]}],
+        lambda i: [{'flight': None, 'landing_success': True}],  # Missing keys
+        lambda i: [],
+        lambda i: None,
+        lambda i: ['not-a-dict'],
+    ]
+    payload_shapes = [
+        lambda i: [f"p{i % 4}"],
+        lambda i: [f"p{i % 4}", 'p0'],
+        lambda i: [{'mass_kg': float(i), 'orbit': 'SSO'}],
+        lambda i: [],
+        lambda i: ['unknown-id'],
+    ]
+    picks = rng.integers(0, 5, size=(n, 2))
+    return pd.DataFrame({
+        'flight_number': np.arange(n),
+        'name': [f"Launch {i}" for i in range(n)],
+        'date_utc': ['2020-01-01T00:00:00.000Z' if i % 7 else None for i in range(n)],
+        'launchpad': [{'id': 'lp1'} if i % 2 else 'lp2' for i in range(n)],
+        'payloads': [payload_shapes[p](i) for i, p in enumerate(picks[:, 0])],
+        'cores': [core_shapes[c](i) for i, c in enumerate(picks[:, 1])]
+    })
+
+def test_clean_api_data_matches_apply_version():
+    """Tests that the vectorized cleaning gives exactly the row-wise output."""
+    raw = make_synthetic_launches(500)
+    payload_map = {'p0': {'mass_kg': 100, 'orbit': 'LEO'}, 'p1': {'mass_kg': None, 'orbit': 'GTO'},
+                   'p2': {'mass_kg': 300.5, 'orbit': None}, 'p3': {'mass_kg': 400, 'orbit': 'ISS'}}
+
+    for subset in (raw, raw.iloc[:3], raw[raw['payloads'].map(len) == 0]):
+        expected = clean_api_data_apply(subset, payload_map=payload_map)
+        actual = clean_api_data(subset, payload_map=payload_map)
+        pd.testing.assert_frame_equal(actual, expected)
+
+def test_clean_api_data_chunked_matches_whole_frame():
+    """Tests that cleaning chunk by chunk fills with the global payload mean and matches the whole-frame output."""
+    raw = make_synthetic_launches(500, seed=1)
+    payload_map = {'p0': {'mass_kg': 100, 'orbit': 'LEO'}, 'p1': {'mass_kg': None, 'orbit': 'GTO'},
+                   'p2': {'mass_kg': 300.5, 'orbit': None}, 'p3': {'mass_kg': 400, 'orbit': 'ISS'}}
+
+    expected = clean_api_data(raw, payload_map=payload_map)
+    chunks = (raw.iloc[start:start + 64] for start in range(0, len(raw), 64))
+    actual = clean_api_data_chunked(chunks, payload_map=payload_map)
+    pd.testing.assert_frame_equal(actual, expected)
+
+def test_wrangle_links_raw_launches_on_the_booster_serial(tmp_path):
+    """The saved raw launches only hold core IDs; wrangle resolves them to serials so linkage can match on them."""
+    config = load_config()
+    config['data_paths'] = {stage: str(tmp_path / stage) for stage in config['data_paths']}
+    raw = pd.DataFrame({
+        'flight_number': [111, 112],
+        'name': ['Alpha', 'Bravo'],
+        'date_utc': ['2021-03-04T08:24:00.000Z', '2021-03-04T20:00:00.000Z'],
+        'launchpad': ['lp1', 'lp1'],
+        'payloads': [['p1'], ['p2']],
+        'cores': [[{'core': 'c1', 'flight': 8, 'gridfins': True, 'legs': True, 'reused': True, 'landing_success': True}],
+                  [{'core': 'c2', 'flight': 1, 'gridfins': True, 'legs': True, 'reused': False, 'landing_success': True}]]
+    })
+    # Same day and unrelated mission names, so only the serial tells the two launches apart
+    wiki = pd.DataFrame({
+        'Flight No.': ['102', '103'],
+        'Date and time (UTC)': ['4 March 2021 20:00', '4 March 2021 08:24'],
+        'Version, Booster': ['F9 B5 B1060.1', 'F9 B5 B1049.8'],
+        'Launch site': ['CCAFS SLC-40'] * 2,
+        'Payload': ['Zulu', 'Yankee'],
+        'Payload mass': ['4,311 kg', '15,600 kg'],
+        'Orbit': ['MEO', 'LEO'],
+        'Customer': ['USSF', 'SpaceX'],
+        'Launch outcome': ['Success'] * 2
+    })
+    save_artifact(raw, 'raw_api_data', config=config)
+    save_artifact(wiki, 'raw_wiki_data', config=config)
+
+    with ReferenceStore(':memory:') as store:
+        store.replace('payloads', [{'id': 'p1', 'mass_kg': None, 'orbit': None},
+                                   {'id': 'p2', 'mass_kg': None, 'orbit': None}])
+        store.replace('cores', [{'id': 'c1', 'serial': 'B1049', 'block': 5, 'reuse_count': 7},
+                                {'id': 'c2', 'serial': 'B1060', 'block': 5, 'reuse_count': 0}])
+        cleaned = wrangle_launches(config, store=store)
+
+    assert cleaned['PayloadMass'].tolist() == [15600.0, 4311.0]
+    assert cleaned['Orbit'].tolist() == ['LEO', 'MEO']
+    assert 'core_serial' not in cleaned.columns